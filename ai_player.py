@@ -0,0 +1,247 @@
+"""
+Probability-density targeting that can replace a player's firing sequence.
+
+    player.set_targeting(ProbabilityTargeting.for_player(player))
+
+The AI knows the opponent fleet's shapes (every player places the same ships)
+and keeps, for each opponent, how often every cell was hit and whether a miss
+showed it to be empty or dead. A placement of a ship with cell health h (P=1,
+Q=2, see ShipType) is possible when none of its cells is known empty, sunk, hit
+more than h times, or known dead after a different number of hits. Each
+possible placement is weighted by BOOST per hit-but-unsunk cell it covers, so
+hunting turns into targeting around hits.
+
+The density of every cell is kept per health value and updated incrementally:
+an observation only changes the placements covering the observed cell, i.e.
+O(sum of (ship cells)^2) work per shot. Choosing a shot is an argmax over a
+flat list of cell scores, which runs at C speed.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from player import Player
+from utils import Position, ShipType, row_label, row_number
+
+BOOST = 64  # Weight multiplier per unsunk hit a placement covers
+
+
+def cell_health(ship_type: str) -> int:
+    return ShipType.Q.value if ship_type == 'Q' else ShipType.P.value
+
+
+class _Shape:
+    """One kind of ship in the fleet and the weight of each of its placements, by top-left cell."""
+    __slots__ = ('width', 'height', 'health', 'count', 'weights')
+
+    def __init__(self, width: int, height: int, health: int, count: int, weights: List[int]):
+        self.width = width
+        self.height = height
+        self.health = health
+        self.count = count  # Ships of this shape not sunk yet
+        self.weights = weights
+
+
+class TargetBoard:
+    """What the AI knows about one opponent's board."""
+
+    def __init__(self, width: int, rows: int, fleet: Sequence[Tuple[str, int, int]]):
+        self.width = width
+        self.rows = rows
+        cell_count = width * rows
+        self.hits = [0] * cell_count
+        self.resolved = [False] * cell_count  # A miss showed the cell is empty or dead
+        self.sunk = [False] * cell_count
+        self.healths = sorted({cell_health(ship_type) for ship_type, _, _ in fleet})
+        self.density: Dict[int, List[int]] = {health: [0] * cell_count for health in self.healths}
+        self.score = [0] * cell_count
+
+        counts: Dict[Tuple[int, int, int], int] = {}
+        for ship_type, ship_width, ship_height in fleet:
+            if ship_width > 0 and ship_height > 0:
+                key = (ship_width, ship_height, cell_health(ship_type))
+                counts[key] = counts.get(key, 0) + 1
+        self.shapes: List[_Shape] = []
+        for (ship_width, ship_height, health), count in counts.items():
+            weights = [0] * cell_count
+            for row in range(rows - ship_height + 1):
+                for col in range(width - ship_width + 1):
+                    weights[row * width + col] = 1
+            shape = _Shape(ship_width, ship_height, health, count, weights)
+            self.shapes.append(shape)
+            density = self.density[health]
+            for anchor, weight in enumerate(weights):
+                if weight:
+                    for cell in self._cells(shape, anchor):
+                        density[cell] += count
+        for cell in range(cell_count):
+            self._rescore(cell)
+
+    @property
+    def ships_left(self) -> int:
+        return sum(shape.count for shape in self.shapes)
+
+    def _cells(self, shape: _Shape, anchor: int):
+        width = self.width
+        for i in range(shape.height):
+            start = anchor + i * width
+            yield from range(start, start + shape.width)
+
+    def _anchors_covering(self, shape: _Shape, cell: int):
+        """Top-left cells of the placements of `shape` that cover `cell` and fit the board."""
+        row, col = divmod(cell, self.width)
+        for top in range(max(0, row - shape.height + 1), min(row, self.rows - shape.height) + 1):
+            for left in range(max(0, col - shape.width + 1), min(col, self.width - shape.width) + 1):
+                yield top * self.width + left
+
+    def _possible(self, shape: _Shape, cell: int) -> bool:
+        """Whether a ship of this shape may cover `cell`, given what is known about it."""
+        hits = self.hits[cell]
+        if self.sunk[cell] or hits > shape.health:
+            return False
+        return not self.resolved[cell] or hits == shape.health
+
+    def _boost(self, shape: _Shape, anchor: int) -> int:
+        weight = 1
+        for cell in self._cells(shape, anchor):
+            if not self._possible(shape, cell):
+                return 0
+            if self.hits[cell]:
+                weight *= BOOST
+        return weight
+
+    def _set_weight(self, shape: _Shape, anchor: int, weight: int, touched: set):
+        delta = (weight - shape.weights[anchor]) * shape.count
+        if not delta:
+            return
+        shape.weights[anchor] = weight
+        density = self.density[shape.health]
+        for cell in self._cells(shape, anchor):
+            density[cell] += delta
+            touched.add(cell)
+
+    def _rescore(self, cell: int):
+        """Chance-like weight that a shot at `cell` hits: placements whose cell would still be alive."""
+        if self.sunk[cell] or self.resolved[cell]:
+            self.score[cell] = 0
+            return
+        hits = self.hits[cell]
+        self.score[cell] = sum(self.density[health][cell] for health in self.healths if health > hits)
+
+    def _reweigh_around(self, cell: int, touched: set):
+        for shape in self.shapes:
+            for anchor in self._anchors_covering(shape, cell):
+                # What is known only ever narrows, so impossible placements stay impossible
+                if shape.weights[anchor]:
+                    self._set_weight(shape, anchor, self._boost(shape, anchor), touched)
+
+    def observe(self, cell: int, hit: bool, sunk: bool):
+        touched = {cell}
+        if hit:
+            self.hits[cell] += 1
+        else:
+            self.resolved[cell] = True
+        self._reweigh_around(cell, touched)
+        if sunk:
+            self._sink(cell, touched)
+        for touched_cell in touched:
+            self._rescore(touched_cell)
+
+    def _sink(self, cell: int, touched: set):
+        """Finds a placement that the shot at `cell` can have just sunk and removes that ship."""
+        for shape in self.shapes:
+            if not shape.count:
+                continue
+            for anchor in self._anchors_covering(shape, cell):
+                if shape.weights[anchor] and all(self.hits[c] >= shape.health for c in self._cells(shape, anchor)):
+                    self._remove_ship(shape, anchor, touched)
+                    return
+
+    def _remove_ship(self, shape: _Shape, anchor: int, touched: set):
+        # One ship fewer of this shape: drop one share of every placement's weight
+        density = self.density[shape.health]
+        for top_left, weight in enumerate(shape.weights):
+            if weight:
+                for cell in self._cells(shape, top_left):
+                    density[cell] -= weight
+                    touched.add(cell)
+        shape.count -= 1
+        # Other ships cannot overlap the sunk one
+        for cell in list(self._cells(shape, anchor)):
+            self.sunk[cell] = True
+            touched.add(cell)
+        for cell in list(self._cells(shape, anchor)):
+            self._reweigh_around(cell, touched)
+
+    def best_cell(self) -> Optional[int]:
+        """Cell with the highest score, or any cell that may still hold a live ship part."""
+        best = max(self.score)
+        if best > 0:
+            return self.score.index(best)
+        for cell, hits in enumerate(self.hits):
+            if not self.sunk[cell] and not self.resolved[cell]:
+                return cell
+        return None
+
+
+class ProbabilityTargeting:
+    """
+    Deque-like firing sequence (`popleft`, `len`) that chooses each shot from a
+    probability density over the target's possible ship placements. The game
+    reports every shot back through `observe`.
+    """
+
+    def __init__(self, width: int, rows: int, fleet: Sequence[Tuple[str, int, int]], shots: Optional[int] = None,
+                 players: Sequence[Player] = ()):
+        self.width = width
+        self.rows = rows
+        self.fleet = list(fleet)
+        self.shots_left = 2 * width * rows if shots is None else shots
+        self.boards: Dict[Optional[str], TargetBoard] = {}
+        self.current: Optional[str] = None  # Opponent the next shot is aimed at; None until known
+        # The game's players by name, to notice when another player eliminates `current`
+        self.players: Dict[str, Player] = {player.name: player for player in players}
+        self._positions = [Position(row_label(row + 1), col + 1) for row in range(rows) for col in range(width)]
+
+    @classmethod
+    def for_player(cls, player: Player, shots: Optional[int] = None,
+                   players: Sequence[Player] = ()) -> 'ProbabilityTargeting':
+        """
+        Targeting for `player`, assuming opponents place the same ships on the same board size.
+        Pass the game's `players` when there are more than two, so it never aims at an eliminated one.
+        """
+        battle_area = player.battle_area
+        fleet = [(ship.ship_type, ship.width, ship.height) for ship in battle_area.ships]
+        return cls(battle_area.width, battle_area.rows, fleet, shots, players)
+
+    def _board(self, name: Optional[str]) -> TargetBoard:
+        board = self.boards.get(name)
+        if board is None:
+            board = self.boards[name] = TargetBoard(self.width, self.rows, self.fleet)
+        return board
+
+    def __len__(self) -> int:
+        return self.shots_left
+
+    def __repr__(self) -> str:
+        return f"ProbabilityTargeting({self.width}x{self.rows}, {self.shots_left} shots left)"
+
+    def popleft(self) -> Position:
+        if self.shots_left <= 0:
+            raise IndexError("pop from an empty firing sequence")
+        self.shots_left -= 1
+        target = self.players.get(self.current)
+        if target is not None and target.ship_count <= 0:
+            self.current = None  # Eliminated by someone else: the next target is not known yet
+        cell = self._board(self.current).best_cell()
+        return self._positions[cell if cell is not None else 0]
+
+    def observe(self, target: str, position: Position, hit: bool, sunk: bool):
+        """Records the outcome of a shot at `target`'s board."""
+        if target not in self.boards and None in self.boards:
+            # Shots aimed before the target was known went to this board
+            self.boards[target] = self.boards.pop(None)
+        board = self._board(target)
+        row, col = row_number(position.x) - 1, position.y - 1
+        if 0 <= row < self.rows and 0 <= col < self.width:
+            board.observe(row * self.width + col, hit, sunk)
+        # The next shot goes to the same opponent until its fleet is gone
+        self.current = target if board.ships_left else None
@@ -0,0 +1,188 @@
+"""
+Vectorized evaluator that plays many fixed-sequence games at once with NumPy.
+
+Every game is a list of configured players (the output of
+`ValidateInput.configure_game`). Boards are stored as an `(N, players, cells)`
+health array and firing sequences as `(N, players, shots)` cell-index arrays.
+Each step either fires one shot or advances the turn in every unfinished game,
+following the same rules as `GameController.start_game`, so the results are
+identical to the scalar engine.
+"""
+from typing import List
+import numpy as np
+
+from game_controller import GameResult
+from player import Player
+from utils import row_label
+
+NO_CELL = -1  # Shot that cannot hit anything (off the board or not a row letter)
+
+
+class BatchGames:
+    """Array state for N games that share the same rules."""
+
+    def __init__(self, games: List[List[Player]]):
+        if not games:
+            raise ValueError("At least one game is required.")
+        self.names = [[player.name for player in players] for players in games]
+        self.game_count = len(games)
+        self.player_count = max(len(players) for players in games)
+        self.rows = max(player.battle_area.rows for players in games for player in players)
+        self.cols = max(player.battle_area.width + 1 for players in games for player in players)
+        ship_slots = max(1, max(len(player.battle_area.ships) for players in games for player in players))
+        shot_slots = max(1, max(len(player.firing_sequence) for players in games for player in players))
+
+        self.row_offsets = {row_label(row + 1): row * self.cols for row in range(self.rows)}
+
+        shape = (self.game_count, self.player_count)
+        cell_count = self.rows * self.cols
+        self.health = np.zeros(shape + (cell_count,), dtype=np.uint8)
+        self.ship_of = np.zeros(shape + (cell_count,), dtype=np.int32)
+        self.ship_cells_left = np.zeros(shape + (ship_slots,), dtype=np.int32)
+        self.ship_count = np.zeros(shape, dtype=np.int64)
+        self.sequences = np.full(shape + (shot_slots,), NO_CELL, dtype=np.int64)
+        self.sequence_length = np.zeros(shape, dtype=np.int64)
+
+        # Gather every board and sequence into flat index lists, then fill the arrays at once
+        cell_slots, cell_health, cell_ships = [], [], []
+        ship_slots_used, ship_sizes = [], []
+        shot_slots_used, shot_cells = [], []
+        player_slots, ship_counts, sequence_lengths = [], [], []
+        row_offsets, cols = self.row_offsets, self.cols
+        for n, players in enumerate(games):
+            for p, player in enumerate(players):
+                player_slot = n * self.player_count + p
+                player_slots.append(player_slot)
+                ship_counts.append(player.ship_count)
+                sequence_lengths.append(len(player.firing_sequence))
+
+                battle_area = player.battle_area
+                ship_index = {}
+                base = player_slot * ship_slots
+                for i, ship in enumerate(battle_area.ships):
+                    ship_index[id(ship)] = i
+                    ship_slots_used.append(base + i)
+                    ship_sizes.append(ship.size)
+                base = player_slot * cell_count
+                for x, y, health, ship in battle_area.cells():
+                    cell_slots.append(base + row_offsets[x] + y)
+                    cell_health.append(health)
+                    cell_ships.append(ship_index[id(ship)])
+
+                base = player_slot * shot_slots
+                for i, target in enumerate(player.firing_sequence):
+                    offset = row_offsets.get(target.x)
+                    y = target.y
+                    if offset is not None and 0 <= y < cols:
+                        shot_slots_used.append(base + i)
+                        shot_cells.append(offset + y)
+
+        self.health.reshape(-1)[cell_slots] = cell_health
+        self.ship_of.reshape(-1)[cell_slots] = cell_ships
+        self.ship_cells_left.reshape(-1)[ship_slots_used] = ship_sizes
+        self.sequences.reshape(-1)[shot_slots_used] = shot_cells
+        self.ship_count.reshape(-1)[player_slots] = ship_counts
+        self.sequence_length.reshape(-1)[player_slots] = sequence_lengths
+
+    def run(self) -> List[GameResult]:
+        """Plays every game to completion and returns one GameResult per game."""
+        N, P = self.game_count, self.player_count
+        games = np.arange(N)
+        players = np.arange(P)
+        target_offsets = np.arange(1, P)
+
+        health = self.health.copy()
+        ship_cells_left = self.ship_cells_left.copy()
+        ship_count = self.ship_count.copy()
+        pointer = np.zeros((N, P), dtype=np.int64)
+
+        shots = np.zeros((N, P), dtype=np.int64)
+        hits = np.zeros((N, P), dtype=np.int64)
+        sunk = np.zeros((N, P), dtype=np.int64)
+        turns = np.zeros(N, dtype=np.int64)
+
+        current = np.full(N, -1, dtype=np.int64)
+        in_turn = np.zeros(N, dtype=bool)
+        done = np.zeros(N, dtype=bool)
+        # Players taking part in the current round; empty so the first step opens a round
+        round_players = np.zeros((N, P), dtype=bool)
+
+        while not done.all():
+            # Advance to the next player of the round, or close the round
+            advancing = games[~done & ~in_turn]
+            if advancing.size:
+                later = round_players[advancing] & (players[None, :] > current[advancing, None])
+                has_next = later.any(axis=1)
+
+                moving = advancing[has_next]
+                next_player = later[has_next].argmax(axis=1)
+                current[moving] = next_player
+                armed = pointer[moving, next_player] < self.sequence_length[moving, next_player]
+                in_turn[moving[armed]] = True
+                turns[moving[armed]] += 1
+
+                closing = advancing[~has_next]
+                live = ship_count[closing] > 0
+                armed_live = live & (pointer[closing] < self.sequence_length[closing])
+                game_on = (live.sum(axis=1) > 1) & armed_live.any(axis=1)
+                done[closing[~game_on]] = True
+                restarting = closing[game_on]
+                round_players[restarting] = live[game_on]
+                current[restarting] = -1
+
+            # Fire one shot for every player that is mid-turn
+            firing = games[in_turn & ~done]
+            if not firing.size:
+                continue
+            shooter = current[firing]
+            shot_index = pointer[firing, shooter]
+            out_of_shots = shot_index >= self.sequence_length[firing, shooter]
+            in_turn[firing[out_of_shots]] = False
+            firing, shooter, shot_index = firing[~out_of_shots], shooter[~out_of_shots], shot_index[~out_of_shots]
+            if not firing.size:
+                continue
+            pointer[firing, shooter] += 1
+
+            candidates = (shooter[:, None] + target_offsets[None, :]) % P
+            alive = ship_count[firing[:, None], candidates] > 0
+            has_target = alive.any(axis=1)
+            in_turn[firing[~has_target]] = False
+            firing, shooter, shot_index = firing[has_target], shooter[has_target], shot_index[has_target]
+            target = candidates[has_target, alive[has_target].argmax(axis=1)]
+
+            shots[firing, shooter] += 1
+            cell = self.sequences[firing, shooter, shot_index]
+            on_board = cell != NO_CELL
+            safe_cell = np.where(on_board, cell, 0)
+            cell_health = health[firing, target, safe_cell]
+            hit = on_board & (cell_health > 0)
+            in_turn[firing[~hit]] = False
+
+            firing, shooter, target, cell = firing[hit], shooter[hit], target[hit], cell[hit]
+            hits[firing, shooter] += 1
+            health[firing, target, cell] -= 1
+            cleared = health[firing, target, cell] == 0
+            firing, shooter, target, cell = firing[cleared], shooter[cleared], target[cleared], cell[cleared]
+            ship = self.ship_of[firing, target, cell]
+            ship_cells_left[firing, target, ship] -= 1
+            destroyed = ship_cells_left[firing, target, ship] == 0
+            ship_count[firing[destroyed], target[destroyed]] -= 1
+            sunk[firing[destroyed], shooter[destroyed]] += 1
+
+        live = ship_count > 0
+        results = []
+        for n, names in enumerate(self.names):
+            live_players = np.flatnonzero(live[n])
+            results.append(GameResult(
+                winner=names[live_players[0]] if live_players.size == 1 else None,
+                shots={name: int(shots[n, p]) for p, name in enumerate(names)},
+                hits={name: int(hits[n, p]) for p, name in enumerate(names)},
+                ships_sunk={name: int(sunk[n, p]) for p, name in enumerate(names)},
+                turns=int(turns[n]),
+            ))
+        return results
+
+
+def simulate_batch(games: List[List[Player]]) -> List[GameResult]:
+    """Plays N configured games with the vectorized engine."""
+    return BatchGames(games).run()
@@ -1,4 +1,4 @@
-from utils import ShipType, Position, InputValidationError
+from utils import ShipType, Position, InputValidationError, row_label, row_number
 from ship import ShipCell
 
 
@@ -6,18 +6,22 @@ class BattleArea:
     def __init__(self, width, height):
         self.width:int = width
         self.height:str = height
+        self.rows:int = row_number(height.upper())  # Rows are labelled A..Z, AA, AB, ...
         self.grid = {}  # Grid represented as a dictionary
+        self.ships = []  # Ships in placement order
 
     def _is_out_of_bounds(self, x: str, y: int) -> bool:
-        return ord(x) > ord(self.height) or (y > self.width)
+        return not 1 <= row_number(x) <= self.rows or (y > self.width)
 
     def place_ship(self, width, height, position, ship):
         """Places the ship in the grid with specified width, height, and position."""
         ship_cell_health = ShipType.Q.value if ship.ship_type == 'Q' else ShipType.P.value
+        start_x = position.x.upper()
+        start_row = row_number(start_x)
 
         for i in range(height):
+            new_x = row_label(start_row + i) if start_row else start_x
             for j in range(width):
-                new_x = chr(ord(position.x.upper()) + i)
                 new_y = int(position.y + j)
 
                 if self._is_out_of_bounds(new_x, new_y):
@@ -33,3 +37,12 @@ class BattleArea:
                     self.grid[new_position.x] = {}
 
                 self.grid[new_position.x][new_position.y] = ship_cell
+
+        self.ships.append(ship)
+
+    def cells(self):
+        """Yields (row, column, health, ship) for every cell that can still be hit."""
+        for x, row in self.grid.items():
+            for y, ship_cell in row.items():
+                if ship_cell:
+                    yield x, y, ship_cell.health, ship_cell.ship
@@ -1,15 +1,28 @@
+import time
 import turtle
 from typing import Dict, List, Optional
-from utils import Position
+from utils import Position, row_label, row_number
 from ship import Ship
 
+MAX_FPS = 30
+
 class BattleshipUI:
-    def __init__(self, players: List[str], grid_size: tuple):
+    """
+    Turtle renderer. Draw calls are queued and only executed by `flush`, which
+    redraws the screen at most `max_fps` times per second.
+    """
+
+    def __init__(self, players: List[str], grid_size: tuple, max_fps: float = MAX_FPS):
         """Initialize the UI with player count and grid dimensions."""
         self.width, self.height = grid_size
         self.cell_size = 40  # Size of each grid cell in pixels
         self.players = players
         self.player_count = len(players)
+        self.frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self._last_frame = 0.0
+        self._pending = []  # Queued (draw function, args) operations
+        self._pending_message = None  # Only the latest message is ever shown
+        self._dirty = False  # Drawn since the last screen update
         
         # Calculate total width needed for all grids with padding
         total_width = self.player_count * (self.width * self.cell_size + 50)
@@ -20,7 +33,12 @@ class BattleshipUI:
         self.screen.setup(total_width + 100, 600)
         self.screen.tracer(0)  # Turn off animation for faster drawing
         
-        # Create drawing turtle
+        # Grid lines and labels are drawn once by their own turtle and never redrawn
+        self.grid_pen = turtle.Turtle()
+        self.grid_pen.hideturtle()
+        self.grid_pen.speed(0)
+
+        # Create drawing turtle for ships and shots
         self.pen = turtle.Turtle()
         self.pen.hideturtle()
         self.pen.speed(0)
@@ -64,39 +82,39 @@ class BattleshipUI:
 
     def _draw_grid(self, origin_x: float, origin_y: float):
         """Draw a single grid with coordinates."""
-        self.pen.penup()
-        self.pen.color(self.colors['grid'])
+        self.grid_pen.penup()
+        self.grid_pen.color(self.colors['grid'])
 
         # Draw horizontal lines
         for i in range(self.height + 1):
-            self.pen.goto(origin_x - (self.width * self.cell_size / 2),
+            self.grid_pen.goto(origin_x - (self.width * self.cell_size / 2),
                           origin_y - (i * self.cell_size))
-            self.pen.pendown()
-            self.pen.forward(self.width * self.cell_size)
-            self.pen.penup()
+            self.grid_pen.pendown()
+            self.grid_pen.forward(self.width * self.cell_size)
+            self.grid_pen.penup()
 
         # Draw vertical lines
         for i in range(self.width + 1):
-            self.pen.goto(origin_x - (self.width * self.cell_size / 2) + (i * self.cell_size),
+            self.grid_pen.goto(origin_x - (self.width * self.cell_size / 2) + (i * self.cell_size),
                           origin_y)
-            self.pen.setheading(-90)
-            self.pen.pendown()
-            self.pen.forward(self.height * self.cell_size)
-            self.pen.penup()
+            self.grid_pen.setheading(-90)
+            self.grid_pen.pendown()
+            self.grid_pen.forward(self.height * self.cell_size)
+            self.grid_pen.penup()
         
-        self.pen.setheading(0)  # Reset direction
+        self.grid_pen.setheading(0)  # Reset direction
 
         # Draw column numbers
         for i in range(self.width):
-            self.pen.goto(origin_x - (self.width * self.cell_size / 2) + (i * self.cell_size) + self.cell_size / 2,
+            self.grid_pen.goto(origin_x - (self.width * self.cell_size / 2) + (i * self.cell_size) + self.cell_size / 2,
                           origin_y - (self.height * self.cell_size) - 25)
-            self.pen.write(str(i + 1), align="center", font=("Arial", 8, "normal"))
+            self.grid_pen.write(str(i + 1), align="center", font=("Arial", 8, "normal"))
 
         # Draw row letters
         for i in range(self.height):
-            self.pen.goto(origin_x - (self.width * self.cell_size / 2) - 20,
+            self.grid_pen.goto(origin_x - (self.width * self.cell_size / 2) - 20,
                           origin_y - (i * self.cell_size) - self.cell_size / 2)
-            self.pen.write(chr(65 + i), align="center", font=("Arial", 8, "normal"))
+            self.grid_pen.write(row_label(i + 1), align="center", font=("Arial", 8, "normal"))
 
     def _draw_initial_grids(self):
         """Draw all player grids with their names."""
@@ -104,12 +122,32 @@ class BattleshipUI:
             self._draw_grid(origin_x, origin_y)
             
             # Draw player name
-            self.pen.goto(origin_x, origin_y - (self.height * self.cell_size) - 50)
-            self.pen.color(self.colors['text'])
-            self.pen.write(self.players[i], align="center", font=("Arial", 12, "bold"))
+            self.grid_pen.goto(origin_x, origin_y - (self.height * self.cell_size) - 50)
+            self.grid_pen.color(self.colors['text'])
+            self.grid_pen.write(self.players[i], align="center", font=("Arial", 12, "bold"))
+
+    def flush(self, force: bool = False):
+        """Execute queued draw operations and update the screen, at most once per frame."""
+        pending, self._pending = self._pending, []
+        for draw, args in pending:
+            draw(*args)
+        if self._pending_message:
+            self._display_message(*self._pending_message)
+            self._pending_message = None
+        self._dirty = self._dirty or bool(pending)
+
+        now = time.monotonic()
+        if self._dirty and (force or now - self._last_frame >= self.frame_interval):
+            self.screen.update()
+            self._last_frame = now
+            self._dirty = False
 
     # def draw_ship(self, player_index: int, position: Position, width: int, height: int, ship_type: str):
     def draw_ship(self, player_index: int, ship:Ship):
+        """Queue a ship to be drawn on the grid with the appropriate color."""
+        self._pending.append((self._draw_ship, (player_index, ship)))
+
+    def _draw_ship(self, player_index: int, ship:Ship):
         """Place a ship on the grid with the appropriate color."""
         origin_x, origin_y = self.grid_origins[player_index]
         color = self.colors[f'{ship.ship_type}']
@@ -119,7 +157,7 @@ class BattleshipUI:
         
         # Calculate actual position
         start_x = origin_x - (self.width * self.cell_size / 2) + ((ship.position.y - 1) * self.cell_size)
-        start_y = origin_y - ((ord(ship.position.x) - ord('A')) * self.cell_size)
+        start_y = origin_y - ((row_number(ship.position.x.upper()) - 1) * self.cell_size)
         
         # Draw ship
         self.pen.penup()
@@ -132,13 +170,16 @@ class BattleshipUI:
             self.pen.forward(ship.height * self.cell_size)
             self.pen.right(90)
         self.pen.end_fill()
-        self.screen.update()
 
     def mark_hit(self, player_index: int, position: Position):
+        """Queue a hit marker."""
+        self._pending.append((self._mark_hit, (player_index, position)))
+
+    def _mark_hit(self, player_index: int, position: Position):
         """Mark a hit on the grid with a red X."""
         origin_x, origin_y = self.grid_origins[player_index]
         x = origin_x - (self.width * self.cell_size / 2) + ((position.y - 1) * self.cell_size) + self.cell_size/2
-        y = origin_y - ((ord(position.x) - ord('A')) * self.cell_size) - self.cell_size/2
+        y = origin_y - ((row_number(position.x) - 1) * self.cell_size) - self.cell_size/2
         
         self.pen.color(self.colors['hit'])
         self.pen.penup()
@@ -149,32 +190,48 @@ class BattleshipUI:
         self.pen.goto(x - 10, y - 10)
         self.pen.pendown()
         self.pen.goto(x + 10, y + 10)
-        self.screen.update()
 
     def mark_miss(self, player_index: int, position: Position):
+        """Queue a miss marker."""
+        self._pending.append((self._mark_miss, (player_index, position)))
+
+    def _mark_miss(self, player_index: int, position: Position):
         """Mark a miss on the grid with a gray dot."""
         origin_x, origin_y = self.grid_origins[player_index]
         x = origin_x - (self.width * self.cell_size / 2) + ((position.y - 1) * self.cell_size) + self.cell_size/2
-        y = origin_y - ((ord(position.x) - ord('A')) * self.cell_size) - self.cell_size/2
+        y = origin_y - ((row_number(position.x) - 1) * self.cell_size) - self.cell_size/2
         
         self.pen.color(self.colors['miss'])
         self.pen.penup()
         self.pen.goto(x, y)
         self.pen.dot(10)
-        self.screen.update()
+
+    def clear_marks(self):
+        """Queue erasing every ship and shot marker, leaving the grids in place."""
+        self._pending.clear()
+        self._pending.append((self.pen.clear, ()))
 
     def close(self):
         """Close the turtle window."""
         self.screen.bye()
 
+    def wait_for_close(self):
+        """Keep the window open until it is clicked."""
+        self.flush(force=True)
+        self.screen.exitonclick()
+
     def display_message(self, message: str, message_type: str = 'text'):
+        """Queue a message for the top of the screen, replacing any message not yet shown."""
+        self._pending_message = (message, message_type)
+
+    def _display_message(self, message: str, message_type: str = 'text'):
         """Display a message at the top of the screen."""
+        self._dirty = True
         self.message_pen.clear()
         self.message_pen.penup()
         self.message_pen.color(self.colors[message_type])
         self.message_pen.goto(0, 250)  # Position above the grids
         self.message_pen.write(message, align="center", font=("Arial", 24, "bold"))
-        self.screen.update()
 
     def announce_winner(self, player_name: str):
         """Display the winner announcement."""
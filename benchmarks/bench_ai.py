@@ -0,0 +1,53 @@
+"""
+Measures ProbabilityTargeting: time per move and shots needed to win, in
+AI-vs-AI games on square boards where both players place the same fleet.
+
+Run from the repository root:
+    python -m benchmarks.bench_ai
+"""
+import random
+import time
+
+from ai_player import ProbabilityTargeting
+from game_controller import simulate_game
+from player import Player
+from utils import InputValidationError, Position, row_label
+
+FLEET = (('Q', 1, 1), ('P', 2, 1), ('P', 3, 1), ('Q', 1, 2), ('P', 1, 4))
+
+
+def ai_players(size: int, seed: int):
+    rng = random.Random(seed)
+    players = []
+    for i in range(2):
+        player = Player(f'Player-{i + 1}')
+        player.set_battle_area(size, row_label(size))
+        for ship_type, width, height in FLEET:
+            while True:
+                position = Position(row_label(rng.randint(1, size - height + 1)), rng.randint(1, size - width + 1))
+                try:
+                    player.place_ships(width, height, position, ship_type)
+                    break
+                except InputValidationError:
+                    pass
+        player.set_ship_count(len(FLEET))
+        player.set_targeting(ProbabilityTargeting.for_player(player))
+        players.append(player)
+    return players
+
+
+def main():
+    print(f"{'board':>10} {'games':>6} {'shots/game':>11} {'us/move':>9} {'games/s':>9}")
+    for size, games in ((10, 200), (30, 20), (100, 2)):
+        shots = 0
+        start = time.perf_counter()
+        for seed in range(games):
+            result = simulate_game(ai_players(size, seed))
+            shots += sum(result.shots.values())
+        elapsed = time.perf_counter() - start
+        print(f"{size:>5}x{size:<4} {games:>6} {shots / games:>11.1f} {elapsed / shots * 1e6:>9.1f} "
+              f"{games / elapsed:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares the BattleArea backends for placement and firing, and measures
+SparseBattleArea on a 10^4 x 10^4 board.
+
+Run from the repository root:
+    python -m benchmarks.bench_battle_area
+"""
+import random
+import time
+from battle_area import BattleArea
+from packed_battle_area import PackedBattleArea
+from sparse_battle_area import SparseBattleArea
+from game_controller import GameController
+from player import Player
+from ship import Ship
+from utils import InputValidationError, Position, row_label
+
+BACKENDS = (BattleArea, PackedBattleArea, SparseBattleArea)
+
+SHIP_WIDTH = 5
+
+
+def fleet(size: int):
+    """Dense fleet of 1 x SHIP_WIDTH ships, alternating Q and P, covering a square board."""
+    ships = []
+    for row in range(1, size + 1):
+        for col in range(1, size - SHIP_WIDTH + 2, SHIP_WIDTH):
+            ship_type = 'Q' if (row + col) % 2 else 'P'
+            ships.append((ship_type, Position(row_label(row), col)))
+    return ships
+
+
+def place_fleet(area_class, size: int):
+    battle_area = area_class(size, row_label(size))
+    for ship_type, position in fleet(size):
+        battle_area.place_ship(SHIP_WIDTH, 1, position, Ship(ship_type, SHIP_WIDTH, 1, position))
+    return battle_area
+
+
+def targets(size: int):
+    """Every cell twice, so Q cells are sunk too."""
+    cells = [Position(row_label(row), col) for row in range(1, size + 1) for col in range(1, size + 1)]
+    return cells + cells
+
+
+def fire_at_all(battle_area, shots):
+    player = Player('Target')
+    player.battle_area = battle_area
+    check_hit = GameController().check_hit
+    start = time.perf_counter()
+    for target in shots:
+        check_hit(target, player)
+    return time.perf_counter() - start
+
+
+def measure(func, *args, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def huge_board(size: int = 10000, ship_count: int = 5000, shot_count: int = 200000, seed: int = 1):
+    """Random fleet and random shots on a SparseBattleArea too large for a dense grid."""
+    rng = random.Random(seed)
+    battle_area = SparseBattleArea(size, row_label(size))
+    start = time.perf_counter()
+    placed = 0
+    while placed < ship_count:
+        width, height = rng.randint(1, 5), rng.randint(1, 5)
+        position = Position(row_label(rng.randint(1, size - height + 1)), rng.randint(1, size - width + 1))
+        try:
+            battle_area.place_ship(width, height, position, Ship(rng.choice('PQ'), width, height, position))
+            placed += 1
+        except InputValidationError:
+            pass
+    place_time = time.perf_counter() - start
+
+    shots = [Position(row_label(rng.randint(1, size)), rng.randint(1, size)) for _ in range(shot_count)]
+    fire_time = fire_at_all(battle_area, shots)
+    print(f"{size}x{size} SparseBattleArea: {ship_count} ships placed in {place_time * 1000:.1f} ms, "
+          f"{shot_count / fire_time:,.0f} shots/s")
+
+
+def main():
+    print(f"{'board':>10} {'backend':>18} {'place (ms)':>12} {'fire (ms)':>12} {'shots/s':>12}")
+    for size in (10, 100, 1000):
+        shots = targets(size)
+        for area_class in BACKENDS:
+            repeat = 3 if size < 1000 else 1
+            place_time = measure(place_fleet, area_class, size, repeat=repeat)
+            fire_time = min(fire_at_all(place_fleet(area_class, size), shots) for _ in range(repeat))
+            print(f"{size:>5}x{size:<4} {area_class.__name__:>18} "
+                  f"{place_time * 1000:>12.2f} {fire_time * 1000:>12.2f} {len(shots) / fire_time:>12,.0f}")
+    huge_board()
+
+
+if __name__ == '__main__':
+    main()
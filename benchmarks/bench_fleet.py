@@ -0,0 +1,78 @@
+"""
+Measures random fleets per second from FleetGenerator against retrying
+place_ship at random positions until it stops raising, as boards fill up. The
+retries use PackedBattleArea, which rejects a ship before writing any of its
+cells: a rejected attempt on the dict BattleArea leaves cells behind.
+
+Run from the repository root:
+    python -m benchmarks.bench_fleet
+"""
+import random
+import time
+
+from fleet_generator import FleetGenerator
+from packed_battle_area import PackedBattleArea
+from player import Player
+from ship import Ship
+from utils import InputValidationError, Position, row_label
+
+SIZE = 10
+SHAPES = (('Q', 2, 2), ('P', 3, 1), ('P', 1, 3), ('Q', 2, 1))
+
+
+def fleet(fill: float):
+    """Ships cycling through SHAPES until they cover about `fill` of the board."""
+    shapes, cells = [], 0
+    while cells + 4 <= fill * SIZE * SIZE:
+        shape = SHAPES[len(shapes) % len(SHAPES)]
+        shapes.append(shape)
+        cells += shape[1] * shape[2]
+    return shapes
+
+
+def retry_fleet(rng: random.Random, shapes) -> Player:
+    """The old way: random positions for each ship until the battle area accepts one."""
+    while True:
+        player = Player('Player-1')
+        player.set_battle_area(SIZE, row_label(SIZE), PackedBattleArea)
+        try:
+            for ship_type, width, height in shapes:
+                for _ in range(10_000):
+                    position = Position(row_label(rng.randint(1, SIZE)), rng.randint(1, SIZE))
+                    try:
+                        player.battle_area.place_ship(width, height, position, Ship(ship_type, width, height, position))
+                        break
+                    except InputValidationError:
+                        continue
+                else:
+                    raise InputValidationError("No room left")  # Dead end: start the fleet again
+            player.set_ship_count(len(shapes))
+            return player
+        except InputValidationError:
+            continue
+
+
+def rate(func, seconds: float = 0.5) -> float:
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'fill':>5} {'ships':>5} {'retry/s':>9} {'anchors/s':>10} {'players/s':>10} {'uniform/s':>10}")
+    for fill in (0.2, 0.4, 0.6, 0.75):
+        shapes = fleet(fill)
+        rng = random.Random(1)
+        fast = FleetGenerator(SIZE, row_label(SIZE), shapes, seed=1, uniform=False)
+        exact = FleetGenerator(SIZE, row_label(SIZE), shapes, seed=1)
+        retry = f"{rate(lambda: retry_fleet(rng, shapes)):>9,.0f}"
+        # Past this fill whole-fleet uniformity rejects almost every draw
+        uniform = f"{rate(exact.sample):>10,.0f}" if fill <= 0.4 else f"{'-':>10}"
+        print(f"{fill:>5.0%} {len(shapes):>5} {retry} {rate(fast.sample):>10,.0f} "
+              f"{rate(lambda: fast.player('Player-1')):>10,.0f} {uniform}")
+
+
+if __name__ == '__main__':
+    main()
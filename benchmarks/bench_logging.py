@@ -0,0 +1,61 @@
+"""
+Measures the per-shot cost of logging in fire_missile for each logging setup.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging
+"""
+import logging
+import os
+import tempfile
+import time
+
+from battle_area import BattleArea
+from game_controller import GameController
+from logger import configure_logging, stop_writer
+from player import Player
+
+from benchmarks.bench_battle_area import place_fleet, targets
+
+BOARD_SIZE = 100
+
+
+def per_shot_ns(log_events: bool) -> float:
+    """Fires at every cell of a dense fleet twice and returns ns per fire_missile call."""
+    controller = GameController.headless()
+    controller.log_events = log_events
+    shooter, target = Player('Shooter'), Player('Target')
+    target.battle_area = place_fleet(BattleArea, BOARD_SIZE)
+    target.set_ship_count(len(target.battle_area.ships))
+    shots = targets(BOARD_SIZE)
+    start = time.perf_counter_ns()
+    for position in shots:
+        controller.fire_missile(shooter, position, target)
+    return (time.perf_counter_ns() - start) / len(shots)
+
+
+def main():
+    setups = (
+        ('no logging', False, None),
+        ('level WARNING', True, dict(mode='sync', level=logging.WARNING)),
+        ('sync text', True, dict(mode='sync')),
+        ('sync json', True, dict(mode='sync', structured=True)),
+        ('queue text', True, dict(mode='queue')),
+        ('queue json', True, dict(mode='queue', structured=True)),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, 'bench.log')
+        results = []
+        for name, log_events, options in setups:
+            if options:
+                configure_logging(filename=log_file, console=False, **options)
+            results.append((name, per_shot_ns(log_events)))
+            stop_writer()
+        configure_logging(filename=None, console=False)
+
+    print(f"{'setup':>14} {'ns/shot':>10}")
+    for name, ns in results:
+        print(f"{name:>14} {ns:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
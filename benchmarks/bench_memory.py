@@ -0,0 +1,106 @@
+"""
+Measures memory per occupied cell and per queued shot with tracemalloc.
+
+The "legacy" rows rebuild the previous layout (Position and ShipCell with an
+instance __dict__, one Position object per shot) for comparison.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory
+"""
+import random
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+
+from battle_area import BattleArea
+from input_validator import ValidateInput
+from packed_battle_area import PackedBattleArea
+from sparse_battle_area import SparseBattleArea
+from ship import Ship
+from utils import Position, row_label, row_number
+
+BOARD_SIZE = 100
+SHIP_WIDTH = 5
+SHOT_COUNT = 200000
+
+
+@dataclass
+class LegacyPosition:
+    x: str
+    y: int
+
+
+class LegacyShipCell:
+    def __init__(self, ship, health, position):
+        self.ship = ship
+        self.health = health
+        self.position = position
+
+
+class LegacyBattleArea(BattleArea):
+    """BattleArea filled with the old, dict-backed cell objects."""
+
+    def place_ship(self, width, height, position, ship):
+        for i in range(height):
+            x = row_label(row_number(position.x) + i)
+            for j in range(width):
+                self.grid.setdefault(x, {})[position.y + j] = LegacyShipCell(ship, 1, LegacyPosition(x, position.y + j))
+        self.ships.append(ship)
+
+
+def allocated(build):
+    """Bytes still allocated by the object `build` returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def fill(area_class):
+    battle_area = area_class(BOARD_SIZE, row_label(BOARD_SIZE))
+    for row in range(1, BOARD_SIZE + 1):
+        for col in range(1, BOARD_SIZE - SHIP_WIDTH + 2, SHIP_WIDTH):
+            position = Position(row_label(row), col)
+            battle_area.place_ship(SHIP_WIDTH, 1, position, Ship('P', SHIP_WIDTH, 1, position))
+    return battle_area
+
+
+def shot_tokens(seed: int = 1):
+    rng = random.Random(seed)
+    return [f"{row_label(rng.randint(1, BOARD_SIZE))}{rng.randint(1, BOARD_SIZE)}" for _ in range(SHOT_COUNT)]
+
+
+def legacy_shots(tokens):
+    """One new position object per shot, as before interning."""
+    shots = deque()
+    for token in tokens:
+        row_length = ValidateInput._split_coordinates(token)
+        shots.append(LegacyPosition(token[:row_length], int(token[row_length:])))
+    return shots
+
+
+def interned_shots(tokens):
+    validator = ValidateInput()
+    return deque(validator.get_coordinates_pos(token) for token in tokens)
+
+
+def main():
+    cells = BOARD_SIZE * BOARD_SIZE
+    print(f"Occupied cells on a {BOARD_SIZE}x{BOARD_SIZE} board ({cells} cells):")
+    for name, area_class in (('legacy dict grid', LegacyBattleArea), ('BattleArea', BattleArea),
+                             ('PackedBattleArea', PackedBattleArea), ('SparseBattleArea', SparseBattleArea)):
+        size = allocated(lambda: fill(area_class))
+        print(f"  {name:>18}: {size / cells:8.1f} bytes/cell")
+
+    tokens = shot_tokens()
+    print(f"Firing sequence of {SHOT_COUNT} shots:")
+    for name, build in (('legacy positions', legacy_shots), ('interned positions', interned_shots)):
+        size = allocated(lambda: build(tokens))
+        print(f"  {name:>18}: {size / SHOT_COUNT:8.1f} bytes/shot")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Measures how headless games scale with the number of players.
+
+Run from the repository root:
+    python -m benchmarks.bench_players
+"""
+import random
+import time
+from game_controller import simulate_game
+from player import Player
+from utils import Position, row_label
+
+BOARD_SIZE = 10
+SHOTS_PER_PLAYER = 50
+
+
+def make_players(count: int, seed: int = 1):
+    """Players on 10x10 boards with two ships each and random firing sequences."""
+    rng = random.Random(seed)
+    players = []
+    for i in range(count):
+        player = Player(f'Player-{i + 1}')
+        player.set_battle_area(BOARD_SIZE, row_label(BOARD_SIZE))
+        player.place_ships(2, 1, Position(row_label(rng.randint(1, 5)), rng.randint(1, 9)), 'Q')
+        player.place_ships(1, 2, Position(row_label(rng.randint(6, 9)), rng.randint(1, 10)), 'P')
+        player.set_ship_count(2)
+        player.set_firing_sequence([Position(row_label(rng.randint(1, BOARD_SIZE)), rng.randint(1, BOARD_SIZE))
+                                    for _ in range(SHOTS_PER_PLAYER)])
+        players.append(player)
+    return players
+
+
+def main():
+    print(f"{'players':>8} {'turns':>10} {'shots':>10} {'time (s)':>10} {'us/shot':>10}")
+    for count in (10, 100, 1000, 10000):
+        players = make_players(count)
+        start = time.perf_counter()
+        result = simulate_game(players)
+        elapsed = time.perf_counter() - start
+        shots = sum(result.shots.values())
+        print(f"{count:>8} {result.turns:>10} {shots:>10} {elapsed:>10.3f} {elapsed / shots * 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
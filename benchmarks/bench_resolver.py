@@ -0,0 +1,55 @@
+"""
+Compares resolve_game with simulate_game on the same games, with firing
+sequences as parsed from input (packed) and as lists of Positions, and checks
+that both give the same results.
+
+Run from the repository root:
+    python -m benchmarks.bench_resolver
+"""
+import time
+
+from firing_tokens import parse_firing_sequence
+from game_controller import simulate_game
+from outcome_resolver import resolve_game
+
+from benchmarks.suite import random_players
+
+CASES = (  # (board size, players, ships, shots per player, games)
+    (10, 2, 5, 100, 200),
+    (10, 4, 5, 100, 200),
+    (100, 2, 50, 2000, 20),
+    (100, 2, 5, 100_000, 3),
+    (1000, 2, 20, 100_000, 3),
+)
+
+
+def games(size, player_count, ships, shots, count, packed):
+    result = []
+    for seed in range(count):
+        players = random_players(size, player_count, ships, shots, seed)
+        if packed:
+            for player in players:
+                player.set_firing_sequence(parse_firing_sequence(' '.join(map(str, player.firing_sequence))))
+        result.append(players)
+    return result
+
+
+def timed(func, game_list):
+    start = time.perf_counter()
+    results = [func(players) for players in game_list]
+    return results, (time.perf_counter() - start) / len(game_list) * 1e3
+
+
+def main():
+    print(f"{'board':>9} {'players':>7} {'shots':>7} {'sequences':>9} {'resolve ms':>11} {'simulate ms':>12} {'speedup':>8}")
+    for size, player_count, ships, shots, count in CASES:
+        for packed in (True, False):
+            resolved, resolve_ms = timed(resolve_game, games(size, player_count, ships, shots, count, packed))
+            simulated, simulate_ms = timed(simulate_game, games(size, player_count, ships, shots, count, packed))
+            assert resolved == simulated
+            print(f"{size:>4}x{size:<4} {player_count:>7} {shots:>7} {'packed' if packed else 'list':>9} "
+                  f"{resolve_ms:>11.2f} {simulate_ms:>12.2f} {simulate_ms / resolve_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Measures SearchState: apply/undo pairs per second and clones per second,
+against deep-copying the players, the only way to restore a BattleArea
+before it.
+
+Run from the repository root:
+    python -m benchmarks.bench_search
+"""
+import copy
+import random
+import time
+
+from search_state import SearchState
+
+from benchmarks.suite import random_players
+
+PAIRS = 200_000
+
+
+def rate(func, count: int) -> float:
+    start = time.perf_counter()
+    func(count)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'board':>10} {'apply+undo/s':>14} {'clones/s':>10} {'deepcopies/s':>13}")
+    for size in (10, 100, 1000):
+        players = random_players(size, 2, max(5, size // 2), 0)
+        state = SearchState.from_players(players)
+        rng = random.Random(1)
+        # Cells with ships, so that most shots are hits that change the board
+        cells = state.live_cells(1) + [rng.randrange(len(state.health[1])) for _ in range(100)]
+        shots = [rng.choice(cells) for _ in range(1024)]
+
+        def apply_undo(count):
+            apply_index, undo = state.apply_index, state.undo
+            for i in range(count):
+                apply_index(shots[i & 1023])
+                undo()
+
+        def clone(count):
+            for _ in range(count):
+                state.clone()
+
+        def deepcopy(count):
+            for _ in range(count):
+                copy.deepcopy(players)
+
+        clone_count = max(10, 2_000_000 // (size * size))
+        print(f"{size:>5}x{size:<4} {rate(apply_undo, PAIRS):>14,.0f} {rate(clone, clone_count):>10,.0f} "
+              f"{rate(deepcopy, max(2, clone_count // 100)):>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
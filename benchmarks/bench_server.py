@@ -0,0 +1,81 @@
+"""
+Plays many concurrent games against a GameServer running in another process.
+
+Reports games per second and the round trip of a ping sent while the other
+games are in flight, for growing numbers of concurrent games.
+
+Run from the repository root:
+    python -m benchmarks.bench_server
+"""
+import asyncio
+import json
+import multiprocessing
+import time
+
+from game_server import GameServer, play_remote_game
+
+from benchmarks.suite import random_players
+
+BOARD_SIZE = 10
+
+
+def serve(port_queue):
+    async def run():
+        listener = await GameServer().start_tcp()
+        port_queue.put(listener.sockets[0].getsockname()[1])
+        await listener.serve_forever()
+    asyncio.run(run())
+
+
+async def ping(reader, writer) -> float:
+    start = time.perf_counter()
+    writer.write(json.dumps({'op': 'ping'}).encode() + b'\n')
+    await writer.drain()
+    await reader.readline()
+    return time.perf_counter() - start
+
+
+async def client(port: int, seed: int, round_trips: list):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    await play_remote_game(reader, writer, random_players(BOARD_SIZE, 2, 3, 50, seed))
+    writer.close()
+
+
+async def prober(port: int, round_trips: list, stop: asyncio.Event):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while not stop.is_set():
+        round_trips.append(await ping(reader, writer))
+        await asyncio.sleep(0.005)
+    writer.close()
+
+
+async def run(port: int, game_count: int):
+    round_trips = []
+    stop = asyncio.Event()
+    probe = asyncio.ensure_future(prober(port, round_trips, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, seed, round_trips) for seed in range(game_count)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    round_trips.sort()
+    p50 = round_trips[len(round_trips) // 2]
+    p99 = round_trips[min(len(round_trips) - 1, int(len(round_trips) * 0.99))]
+    print(f"{game_count:>8} {game_count / elapsed:>10.0f} {p50 * 1000:>10.2f} {p99 * 1000:>10.2f}")
+
+
+def main():
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue,), daemon=True)
+    server.start()
+    port = port_queue.get()
+    print(f"{'games':>8} {'games/s':>10} {'ping p50 (ms)':>10} {'ping p99 (ms)':>10}")
+    try:
+        for game_count in (10, 100, 1000, 5000):
+            asyncio.run(run(port, game_count))
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures startup cost: the time to import the main modules in a fresh
+interpreter, and the wall time of a headless `main.py` run on a small game.
+Also reports whether the import pulled in turtle/tkinter or opened game.log.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPEAT = 15
+MODULES = ('game_controller', 'tournament', 'win_probability', 'main')
+GAME = """5 E
+2
+Q 1 1 A1 B2
+P 2 1 D4 C3
+A1 B2 B2 B3
+A1 B2 B3 A1 D1 E1 D4 D4 D5 D5
+"""
+PROBE = ("import sys, os, {module}; "
+         "print(int('turtle' in sys.modules), int('tkinter' in sys.modules), int(os.path.exists('game.log')))")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wall_time(args, stdin: str = '', cwd: str = ROOT) -> float:
+    """Median wall time of running `args` in a fresh interpreter, in milliseconds."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run(args, input=stdin, text=True, capture_output=True, cwd=cwd, env=env, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    baseline = wall_time([sys.executable, '-c', 'pass'])
+    print(f"{'command':<30} {'ms':>8} {'over bare python':>17} {'turtle':>7} {'tkinter':>8} {'game.log':>9}")
+    print(f"{'python -c pass':<30} {baseline:>8.1f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for module in MODULES:
+            elapsed = wall_time([sys.executable, '-c', f'import {module}'], cwd=directory)
+            probe = subprocess.run([sys.executable, '-c', PROBE.format(module=module)], capture_output=True,
+                                   text=True, cwd=directory, env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+            turtle, tkinter, log_file = probe.stdout.split()
+            if os.path.exists(os.path.join(directory, 'game.log')):
+                os.remove(os.path.join(directory, 'game.log'))
+            print(f"{'import ' + module:<30} {elapsed:>8.1f} {elapsed - baseline:>17.1f} "
+                  f"{turtle:>7} {tkinter:>8} {log_file:>9}")
+        elapsed = wall_time([sys.executable, os.path.join(ROOT, 'main.py'), '--headless'], GAME, cwd=directory)
+        print(f"{'main.py --headless':<30} {elapsed:>8.1f} {elapsed - baseline:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
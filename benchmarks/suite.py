@@ -0,0 +1,261 @@
+"""
+Benchmark suite for the hot paths: parsing, placement, firing and full games.
+
+Run from the repository root:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.1
+
+Every case is set up outside the timer and reported as operations per second
+(best of `--repeat` runs). With `--compare`, a case is flagged as a regression
+when its throughput is more than `--threshold` below the baseline, and the
+command exits with status 1.
+"""
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from battle_area import BattleArea
+from firing_tokens import parse_firing_sequence
+from game_controller import GameController, simulate_game
+from input_validator import ValidateInput
+from packed_battle_area import PackedBattleArea
+from sparse_battle_area import SparseBattleArea
+from player import Player
+from utils import Position, row_label
+
+from benchmarks.bench_battle_area import place_fleet, targets
+
+BACKENDS = (BattleArea, PackedBattleArea, SparseBattleArea)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.1
+INPUT_WIDTH = 100
+
+
+@dataclass
+class Case:
+    """
+    A named benchmark. `setup` runs untimed before every timed run and returns
+    (timed function, operations it performs), so each run starts from fresh state.
+    """
+    name: str
+    setup: Callable[[], Tuple[Callable[[], object], int]]
+
+
+def game_text(ship_count: int, player_count: int = 2, seed: int = 1) -> str:
+    """Input for one game with `ship_count` 1x1 ships per player and as many shots each."""
+    rng = random.Random(seed)
+    rows = max(1, -(-ship_count // INPUT_WIDTH))
+    cells = [f"{row_label(row)}{col}" for row in range(1, rows + 1) for col in range(1, INPUT_WIDTH + 1)]
+    layouts = [rng.sample(cells, ship_count) for _ in range(player_count)]
+    lines = [f"{INPUT_WIDTH} {row_label(rows)}", str(ship_count)]
+    lines += [" ".join([rng.choice('PQ'), '1', '1'] + [layout[i] for layout in layouts])
+              for i in range(ship_count)]
+    lines += [" ".join(rng.choice(cells) for _ in range(ship_count)) for _ in range(player_count)]
+    return "\n".join(lines)
+
+
+def random_players(size: int, player_count: int, ship_count: int, shots: int, seed: int = 1) -> List[Player]:
+    """Players on `size` x `size` boards with random 1x1..3x1 fleets and random firing sequences."""
+    rng = random.Random(seed)
+    players = []
+    for i in range(player_count):
+        player = Player(f'Player-{i + 1}')
+        player.set_battle_area(size, row_label(size))
+        occupied = set()
+        placed = 0
+        while placed < ship_count:
+            width = rng.randint(1, min(3, size))
+            row, col = rng.randint(1, size), rng.randint(1, size - width + 1)
+            cells = {(row, col + j) for j in range(width)}
+            if cells & occupied:
+                continue
+            occupied |= cells
+            player.place_ships(width, 1, Position(row_label(row), col), rng.choice('PQ'))
+            placed += 1
+        player.set_ship_count(ship_count)
+        player.set_firing_sequence([Position(row_label(rng.randint(1, size)), rng.randint(1, size))
+                                    for _ in range(shots)])
+        players.append(player)
+    return players
+
+
+def configure_case(ship_count: int) -> Case:
+    def setup():
+        text = game_text(ship_count)
+
+        def run():
+            validator = ValidateInput()
+            validator.set_players(['Player-1', 'Player-2'])
+            validator.get_valid_input(text)
+            validator.configure_game()
+        return run, ship_count
+    return Case(f"configure_game/ships={ship_count}", setup)
+
+
+def firing_sequence_case(shot_count: int) -> Case:
+    rng = random.Random(1)
+    text = ' '.join(f"{row_label(rng.randint(1, INPUT_WIDTH))}{rng.randint(1, INPUT_WIDTH)}"
+                    for _ in range(shot_count))
+
+    def setup():
+        return (lambda: parse_firing_sequence(text)), shot_count
+    return Case(f"parse_firing_sequence/shots={shot_count}", setup)
+
+
+def place_case(area_class, size: int) -> Case:
+    def setup():
+        # One ship per SHIP_WIDTH cells of every row, see bench_battle_area.fleet
+        return (lambda: place_fleet(area_class, size)), size * (size // 5)
+    return Case(f"place_ship/{area_class.__name__}/{size}", setup)
+
+
+def check_hit_case(area_class, size: int) -> Case:
+    shots = targets(size)
+
+    def setup():
+        player = Player('Target')
+        player.battle_area = place_fleet(area_class, size)
+        check_hit = GameController().check_hit
+
+        def run():
+            for target in shots:
+                check_hit(target, player)
+        return run, len(shots)
+    return Case(f"check_hit/{area_class.__name__}/{size}", setup)
+
+
+def fire_missile_case(size: int) -> Case:
+    shots = targets(size)
+
+    def setup():
+        controller = GameController.headless()
+        shooter, target = Player('Shooter'), Player('Target')
+        target.battle_area = place_fleet(BattleArea, size)
+        target.set_ship_count(len(target.battle_area.ships))
+
+        def run():
+            for position in shots:
+                controller.fire_missile(shooter, position, target)
+        return run, len(shots)
+    return Case(f"fire_missile/{size}", setup)
+
+
+def game_case(size: int, player_count: int) -> Case:
+    ship_count, shot_count = 5, size * size // 2
+
+    def setup():
+        players = random_players(size, player_count, ship_count, shot_count)
+        return (lambda: simulate_game(players)), 1  # Reported as games per second
+    return Case(f"game/{size}x{size}/players={player_count}", setup)
+
+
+def default_cases(quick: bool = False) -> List[Case]:
+    sizes = (10, 50) if quick else (10, 100)
+    cases = [configure_case(count) for count in ((10, 100) if quick else (10, 100, 1000))]
+    cases.append(firing_sequence_case(10_000 if quick else 1_000_000))
+    cases += [place_case(area_class, size) for size in sizes for area_class in BACKENDS]
+    cases += [check_hit_case(area_class, size) for size in sizes for area_class in BACKENDS]
+    cases += [fire_missile_case(size) for size in sizes]
+    cases += [game_case(size, players) for size in sizes for players in ((2, 10) if quick else (2, 10, 100))]
+    return cases
+
+
+def run_case(case: Case, repeat: int = DEFAULT_REPEAT) -> Dict[str, float]:
+    best = float('inf')
+    for _ in range(repeat):
+        func, operations = case.setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return {'seconds': best, 'operations': operations,
+            'ops_per_second': operations / best if best else float('inf')}
+
+
+def run_suite(cases: List[Case], repeat: int = DEFAULT_REPEAT, pattern: Optional[str] = None,
+              verbose: bool = True) -> Dict:
+    """Runs the cases whose name matches `pattern` and returns the JSON-ready report."""
+    results = {}
+    for case in cases:
+        if pattern and not re.search(pattern, case.name):
+            continue
+        results[case.name] = run_case(case, repeat)
+        if verbose:
+            print(f"{case.name:<42} {results[case.name]['ops_per_second']:>14,.0f} ops/s")
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+    """
+    Returns (case name, relative change in ops/s) for every case present in both
+    reports that slowed down by more than `threshold`.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if not previous or not previous['ops_per_second']:
+            continue
+        change = result['ops_per_second'] / previous['ops_per_second'] - 1
+        if change < -threshold:
+            regressions.append((name, change))
+    return regressions
+
+
+def format_comparison(current: Dict, baseline: Dict) -> str:
+    lines = [f"{'case':<42} {'baseline':>14} {'current':>14} {'change':>8}"]
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if not previous:
+            lines.append(f"{name:<42} {'-':>14} {result['ops_per_second']:>14,.0f} {'new':>8}")
+            continue
+        if previous['ops_per_second']:
+            change = f"{result['ops_per_second'] / previous['ops_per_second'] - 1:>+8.1%}"
+        else:
+            change = f"{'n/a':>8}"  # The baseline run of this case failed or was cut short
+        lines.append(f"{name:<42} {previous['ops_per_second']:>14,.0f} "
+                     f"{result['ops_per_second']:>14,.0f} {change}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the battleship benchmark suite")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression (default: 0.1)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Runs per case; the best is kept")
+    parser.add_argument('--filter', dest='pattern', help="Only run cases whose name matches this regex")
+    parser.add_argument('--quick', action='store_true', help="Smaller inputs, for a fast smoke run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run_suite(default_cases(args.quick), args.repeat, args.pattern)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(format_comparison(report, baseline))
+    regressions = compare(report, baseline, args.threshold)
+    for name, change in regressions:
+        print(f"REGRESSION {name}: {change:+.1%}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Single-pass tokenizer for firing sequences.
+
+A sequence line is read in chunks of about CHUNK_SIZE characters cut at
+whitespace, and each token is validated and converted to one 64-bit integer:
+
+    code = row_number * COLUMN_LIMIT + column
+
+so a million shots take 8 MB in an array instead of a list and a deque of
+references to Position objects, and parsing never holds more than one chunk of
+token strings. Distinct tokens are validated once: their codes are cached, and
+repeated tokens are converted at C speed.
+
+Tokens without a canonical upper-case row (lower-case rows, which always miss)
+or with very large numbers are kept as Positions in a side table and stored as
+negative codes pointing into it.
+"""
+import re
+from array import array
+from collections import deque
+from itertools import repeat
+from operator import add, attrgetter
+from typing import Iterable, Iterator, List, Optional
+
+from utils import InputValidationError, Position, row_label, row_number, throw_error
+
+COLUMN_LIMIT = 1 << 32
+ROW_LIMIT = 1 << 30  # Keeps every code within a signed 64-bit integer
+CACHE_SIZE = 1 << 16  # Distinct tokens and shots remembered while parsing and decoding
+CHUNK_SIZE = 1 << 20
+WINDOW_SIZE = 4096  # Shots decoded ahead of popleft
+MISS_ROW = -ROW_LIMIT * COLUMN_LIMIT  # Row code given to shots outside the board rows by sequence_codes
+
+TOKEN = re.compile(r'([^\W\d_]+)(\d+)')
+
+
+class _Codes(dict):
+    """Token -> code, validating each distinct token the first time it is seen."""
+
+    def __init__(self, extra: List[Position]):
+        super().__init__()
+        self.extra = extra
+
+    def __missing__(self, token: str) -> int:
+        match = TOKEN.fullmatch(token)
+        if match is None:
+            raise InputValidationError(token)
+        label, digits = match.groups()
+        row, col = row_number(label), int(digits)
+        if 0 < row < ROW_LIMIT and col < COLUMN_LIMIT:
+            code = row * COLUMN_LIMIT + col
+            if len(self) < CACHE_SIZE:
+                self[token] = code
+            return code
+        self.extra.append(Position(label, col))
+        return -len(self.extra)
+
+
+class _Positions(dict):
+    """Code -> Position, so repeated shots share one Position."""
+
+    def __init__(self, extra: List[Position]):
+        super().__init__()
+        self.extra = extra
+
+    def __missing__(self, code: int) -> Position:
+        if code < 0:
+            return self.extra[-code - 1]
+        row, col = divmod(code, COLUMN_LIMIT)
+        position = Position(row_label(row), col)
+        if len(self) < CACHE_SIZE:
+            self[code] = position
+        return position
+
+
+class PackedFiringSequence:
+    """
+    Deque-like firing sequence (`popleft`, `len`, iteration, `append`) over
+    packed shot codes. Shots are decoded WINDOW_SIZE at a time.
+    """
+    __slots__ = ('codes', 'head', 'extra', 'positions', 'window')
+
+    def __init__(self, codes: Optional[array] = None, extra: Optional[List[Position]] = None):
+        self.codes = codes if codes is not None else array('q')
+        self.head = 0  # Index in `codes` of the first shot not decoded yet
+        self.extra = extra if extra is not None else []
+        self.positions = _Positions(self.extra)
+        self.window = deque()  # Decoded shots that come before codes[head:]
+
+    def _refill(self):
+        end = min(self.head + WINDOW_SIZE, len(self.codes))
+        self.window.extend(map(self.positions.__getitem__, self.codes[self.head:end]))
+        self.head = end
+
+    def popleft(self) -> Position:
+        if not self.window:
+            self._refill()
+        return self.window.popleft()
+
+    def append(self, position: Position):
+        row = row_number(position.x)
+        if 0 < row < ROW_LIMIT and 0 <= position.y < COLUMN_LIMIT:
+            self.codes.append(row * COLUMN_LIMIT + position.y)
+        else:
+            self.extra.append(position)
+            self.codes.append(-len(self.extra))
+
+    def extend(self, positions: Iterable[Position]):
+        for position in positions:
+            self.append(position)
+
+    def __len__(self) -> int:
+        return len(self.window) + len(self.codes) - self.head
+
+    def __iter__(self) -> Iterator[Position]:
+        yield from self.window
+        yield from map(self.positions.__getitem__, self.codes[self.head:])
+
+    def __repr__(self) -> str:
+        return f"PackedFiringSequence({len(self)} shots)"
+
+
+def _chunks(text: str, size: int) -> Iterator[tuple]:
+    """Yields (offset, chunk) slices of `text` of about `size` characters, cut at whitespace."""
+    start = 0
+    while start < len(text):
+        end = start + size
+        while end < len(text) and not text[end].isspace():
+            end += 1
+        yield start, text[start:end]
+        start = end
+
+
+def parse_firing_sequence(text: str, line: Optional[int] = None,
+                          chunk_size: int = CHUNK_SIZE) -> PackedFiringSequence:
+    """
+    Validates and packs a whitespace-separated firing sequence in one pass.
+    An invalid token is reported with its 1-based token number and character offset.
+    """
+    sequence = PackedFiringSequence()
+    codes = _Codes(sequence.extra)
+    count = 0  # Tokens in earlier chunks
+    for offset, chunk in _chunks(text, chunk_size):
+        tokens = chunk.split()
+        try:
+            sequence.codes.extend(map(codes.__getitem__, tokens))
+        except InputValidationError as e:
+            token = str(e)
+            index = tokens.index(token)
+            position = offset + next(match.start() for match in re.finditer(r'\S+', chunk)
+                                     if match.group() == token)
+            throw_error(f"Invalid position '{token}' (token {count + index + 1}, offset {position}). "
+                        f"Expected format: A1 B2 B3 ...", line)
+        count += len(tokens)
+    return sequence
+
+
+def sequence_codes(sequence, rows: int) -> array:
+    """
+    Codes of the shots left in any firing sequence, as cell codes of a board with `rows` rows.
+    Shots outside those rows (or with lower-case rows) get negative codes, which are never cells.
+    """
+    if isinstance(sequence, PackedFiringSequence) and not sequence.window:
+        # Already coded; its negative codes are lower-case rows or huge numbers, which never hit
+        return sequence.codes[sequence.head:]
+    row_codes = {row_label(row): row * COLUMN_LIMIT for row in range(1, rows + 1)}
+    columns = list(map(attrgetter('y'), sequence))
+    if columns and not (0 <= min(columns) and max(columns) < COLUMN_LIMIT):
+        # A column this far out would run into the next row's codes: code such shots one by one
+        return array('q', (row_codes.get(target.x, MISS_ROW) + target.y if 0 <= target.y < COLUMN_LIMIT
+                           else MISS_ROW for target in sequence))
+    return array('q', map(add, map(row_codes.get, map(attrgetter('x'), sequence), repeat(MISS_ROW)), columns))
@@ -0,0 +1,148 @@
+"""
+Seeded random placement of valid fleets, without trial and error on a BattleArea.
+
+    generator = FleetGenerator(10, 'J', [('Q', 2, 1), ('P', 1, 3), ('P', 3, 1)], seed=7)
+    player = generator.player('Player-1')          # Or generator.sample() for (row, column) anchors
+    anchors = generator.sample_array(100_000)      # Flat array('i') of anchors for batch engines
+
+The occupied cells of each board row are one integer bitmask. The anchors left
+for a `w` x `h` ship are found with a few shifts and ANDs: columns free for
+`w` cells in a row, then rows free for `h` rows below. Each ship picks one of
+its free anchors at random, so a placement never fails cell by cell, however
+full the board is.
+
+Picking each ship's anchor in turn favours fleets whose later ships had few
+choices. With `uniform=True` (the default) a drawn fleet is kept with
+probability proportional to the product of the anchor counts it had, which
+makes every valid fleet equally likely. With `uniform=False` every draw is kept.
+"""
+import random
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from battle_area import BattleArea
+from player import Player
+from utils import InputValidationError, Position, ShipType, row_label, row_number
+
+MAX_ATTEMPTS = 100_000  # Draws before giving up on a fleet that (almost) never fits
+
+Shape = Tuple[str, int, int]  # (ship type, width, height)
+
+
+def _runs(masks: List[int], length: int, across: bool = False) -> List[int]:
+    """
+    Keeps the bits that start `length` consecutive set bits in each mask or, with `across`,
+    the bits set in `length` consecutive masks (the result then has `length - 1` fewer masks).
+    """
+    span = 1
+    while span < length:
+        shift = min(span, length - span)
+        if across:
+            masks = [a & b for a, b in zip(masks, masks[shift:])]
+        else:
+            masks = [mask & (mask >> shift) for mask in masks]
+        span += shift
+    return masks
+
+
+class FleetGenerator:
+    """Random valid placements of `shapes` on a `width` x `height` board, reproducible from `seed`."""
+
+    def __init__(self, width: int, height: str, shapes: Sequence[Shape], seed=None, uniform: bool = True):
+        self.width = int(width)
+        self.height = height
+        self.rows = row_number(height.upper())
+        self.shapes = [(ship_type, int(ship_width), int(ship_height))
+                       for ship_type, ship_width, ship_height in shapes]
+        for ship_type, ship_width, ship_height in self.shapes:
+            if ship_type not in ShipType.__members__:
+                raise InputValidationError(f"Invalid ship type '{ship_type}'. Expected P or Q.")
+            if not (1 <= ship_width <= self.width and 1 <= ship_height <= self.rows):
+                raise InputValidationError(f"Ship {ship_type} {ship_width}x{ship_height} does not fit "
+                                           f"a {self.width}x{height} board.")
+        if sum(ship_width * ship_height for _, ship_width, ship_height in self.shapes) > self.width * self.rows:
+            raise InputValidationError(f"Fleet does not fit a {self.width}x{height} board.")
+        self.uniform = uniform
+        self.rng = random.Random(seed)
+        # Largest ships first: they have the fewest anchors left on a crowded board
+        self.order = sorted(range(len(self.shapes)),
+                            key=lambda i: -self.shapes[i][1] * self.shapes[i][2])
+        # Anchors of each ship on an empty board, the most any draw can offer it
+        self.empty_counts = [(self.rows - self.shapes[i][2] + 1) * (self.width - self.shapes[i][1] + 1)
+                             for i in self.order]
+
+    def _anchors(self, occupied: List[int], ship_width: int, ship_height: int) -> List[int]:
+        """Bitmask of the free anchor columns (bit 0 = column 1) of each row a ship can start in."""
+        full = (1 << self.width) - 1
+        free = [~mask & full for mask in occupied]
+        return _runs(_runs(free, ship_width), ship_height, across=True)
+
+    def _draw(self) -> Optional[List[Tuple[int, int]]]:
+        """One fleet, or None if it is rejected or a ship has no free anchor left."""
+        rng = self.rng
+        occupied = [0] * self.rows
+        placement: List[Tuple[int, int]] = [(0, 0)] * len(self.shapes)
+        threshold = rng.random() if self.uniform else 0.0
+        weight = 1.0
+        for i, empty_count in zip(self.order, self.empty_counts):
+            _, ship_width, ship_height = self.shapes[i]
+            anchors = self._anchors(occupied, ship_width, ship_height)
+            counts = [mask.bit_count() for mask in anchors]
+            total = sum(counts)
+            weight *= total / empty_count
+            if not total or weight < threshold:
+                return None
+            k = rng.randrange(total)
+            row = 0
+            while k >= counts[row]:
+                k -= counts[row]
+                row += 1
+            # The k-th set bit of the row's anchors, by bisection on the count of lower bits
+            mask, low, high = anchors[row], 0, self.width
+            while low < high:
+                middle = (low + high) // 2
+                if (mask & ((1 << (middle + 1)) - 1)).bit_count() > k:
+                    high = middle
+                else:
+                    low = middle + 1
+            cells = ((1 << ship_width) - 1) << low
+            for r in range(row, row + ship_height):
+                occupied[r] |= cells
+            placement[i] = (row + 1, low + 1)
+        return placement
+
+    def sample(self) -> List[Tuple[int, int]]:
+        """(row, column) of the top-left cell of each ship, in the order of `shapes`, rows from 1 for A."""
+        for _ in range(MAX_ATTEMPTS):
+            placement = self._draw()
+            if placement is not None:
+                return placement
+        raise InputValidationError(f"No valid placement of the fleet found in {MAX_ATTEMPTS} attempts"
+                                   + (". Pass uniform=False for very crowded boards." if self.uniform else "."))
+
+    def sample_array(self, count: int) -> array:
+        """`count` fleets as one flat array: row, column of each ship of the first fleet, then the next."""
+        anchors = array('i')
+        for _ in range(count):
+            for row, col in self.sample():
+                anchors.append(row)
+                anchors.append(col)
+        return anchors
+
+    def place(self, player: Player, placement: Optional[List[Tuple[int, int]]] = None,
+              area_class=BattleArea) -> Player:
+        """Gives `player` a new battle area holding the fleet, sampled unless `placement` is passed."""
+        if placement is None:
+            placement = self.sample()
+        player.set_battle_area(self.width, self.height, area_class)
+        for (ship_type, ship_width, ship_height), (row, col) in zip(self.shapes, placement):
+            player.place_ships(ship_width, ship_height, Position(row_label(row), col), ship_type)
+        player.set_ship_count(len(self.shapes))
+        return player
+
+    def player(self, name: str, area_class=BattleArea) -> Player:
+        """A new player with a random fleet and no firing sequence."""
+        return self.place(Player(name), area_class=area_class)
+
+    def players(self, names: Sequence[str], area_class=BattleArea) -> List[Player]:
+        return [self.player(name, area_class) for name in names]
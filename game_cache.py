@@ -0,0 +1,236 @@
+"""
+Memoized game results, shared by games that are the same up to board symmetry.
+
+    cache = GameCache('cache/')          # Or GameCache() for memory only
+    result = cache.play(players)         # Simulates only configurations not seen before
+    print(cache.hit_rate)
+
+A game's outcome depends only on which shots hit which ship cells, so
+mirroring or rotating every board and every shot the same way, or renaming
+the players, never changes it. `game_key` encodes a configured game (the
+output of `ValidateInput.configure_game`) as one integer array per dihedral
+transform of the board and hashes the smallest. Shots that can never hit
+(off the board, lower-case rows, cells without a ship on any board) are all
+encoded as the same miss, so they do not tell games apart either. Players keep
+their order: who fires first changes the game.
+
+Results are stored by player index, so a hit is returned under the names of
+the game that asked for it. The memory cache is an LRU of `capacity` entries;
+with a directory, entries also go to one small JSON file each, evicted
+oldest-used first past `disk_capacity`.
+"""
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict
+from itertools import repeat
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from firing_tokens import COLUMN_LIMIT, sequence_codes
+from game_controller import GameResult, simulate_game
+from outcome_resolver import resolve_game
+from player import Player
+from utils import row_number
+
+DEFAULT_CAPACITY = 65536
+DEFAULT_DISK_CAPACITY = 1_000_000
+
+# Dihedral transforms of a rows x cols grid: (row, col, rows, cols) -> (row, col), and whether they swap the sides
+TRANSFORMS: Tuple[Tuple[Callable[[int, int, int, int], Tuple[int, int]], bool], ...] = (
+    (lambda r, c, R, C: (r, c), False),
+    (lambda r, c, R, C: (r, C - 1 - c), False),
+    (lambda r, c, R, C: (R - 1 - r, c), False),
+    (lambda r, c, R, C: (R - 1 - r, C - 1 - c), False),
+    (lambda r, c, R, C: (c, r), True),
+    (lambda r, c, R, C: (c, R - 1 - r), True),
+    (lambda r, c, R, C: (C - 1 - c, r), True),
+    (lambda r, c, R, C: (C - 1 - c, R - 1 - r), True),
+)
+
+
+def canonical_form(players: Sequence[Player], first_turn: int = 0) -> Optional[array]:
+    """
+    The smallest encoding of the game over the board symmetries, or None for a
+    game that cannot be cached (players choosing their own shots, or sharing a name).
+    """
+    names = {player.name for player in players}
+    if len(names) < len(players) or any(player.targeting is not None for player in players):
+        return None
+    boards = []
+    for player in players:
+        ships: Dict[int, List[Tuple[int, int, int]]] = {}
+        for x, y, health, ship in player.battle_area.cells():
+            ships.setdefault(id(ship), []).append((row_number(x) - 1, y, health))
+        boards.append(list(ships.values()))
+    battle_area = players[0].battle_area
+    # Column 0 is a board column only for games that place ships in it
+    first_col = 0 if any(y == 0 for ships in boards for ship in ships for _, y, _ in ship) else 1
+    rows, cols = battle_area.rows, battle_area.width + 1 - first_col
+    cell_count = rows * cols
+    occupied = {r * cols + y - first_col for ships in boards for ship in ships for r, y, _ in ship}
+    # Cell code (as in firing_tokens) -> index: every other shot is the miss
+    cell_of = {(index // cols + 1) * COLUMN_LIMIT + index % cols + first_col: index for index in occupied}
+    sequences = [array('q', map(cell_of.get, sequence_codes(player.firing_sequence, rows), repeat(cell_count)))
+                 for player in players]
+
+    # Boards first: they are short and nearly always tell the transforms apart, so the
+    # long firing sequences are mapped only for the transforms that tie on the boards
+    candidates = []
+    for transform, swaps in TRANSFORMS:
+        new_cols = rows if swaps else cols
+        # Only cells with ships can be hit, so only they need mapping, whatever the board size
+        table = {cell_count: cell_count}  # The miss stays a miss
+        for index in occupied:
+            new_r, new_c = transform(*divmod(index, cols), rows, cols)
+            table[index] = new_r * new_cols + new_c
+        encoded = array('q', [cols if swaps else rows, new_cols, len(players), first_turn])
+        for player, ships in zip(players, boards):
+            placed = sorted(sorted(table[r * cols + y - first_col] * 4 + health for r, y, health in ship)
+                            for ship in ships)
+            encoded.extend((player.ship_count, len(placed)))
+            for cells in placed:
+                encoded.append(len(cells))
+                encoded.extend(cells)
+        candidates.append((encoded, table))
+    # A copy: the firing sequences are appended to the candidates, one of which is the smallest board
+    smallest = array('q', min(encoded for encoded, _ in candidates))
+    best = None
+    for encoded, table in candidates:
+        if encoded != smallest:
+            continue
+        for shots in sequences:
+            encoded.append(len(shots))
+            encoded.extend(map(table.__getitem__, shots))
+        if best is None or encoded < best:
+            best = encoded
+    return best
+
+
+def game_key(players: Sequence[Player], first_turn: int = 0) -> Optional[str]:
+    """SHA-256 hex digest of the canonical form, or None for a game that cannot be cached."""
+    encoded = canonical_form(players, first_turn)
+    return None if encoded is None else hashlib.sha256(encoded.tobytes()).hexdigest()
+
+
+def encode_result(players: Sequence[Player], result: GameResult) -> list:
+    """[winner index or -1, turns, shots, hits, ships sunk] with one count per player, in player order."""
+    names = [player.name for player in players]
+    return [-1 if result.winner is None else names.index(result.winner), result.turns,
+            [result.shots[name] for name in names], [result.hits[name] for name in names],
+            [result.ships_sunk[name] for name in names]]
+
+
+def decode_result(players: Sequence[Player], value: list) -> GameResult:
+    names = [player.name for player in players]
+    winner, turns, shots, hits, sunk = value
+    return GameResult(None if winner < 0 else names[winner], dict(zip(names, shots)), dict(zip(names, hits)),
+                      dict(zip(names, sunk)), turns)
+
+
+class GameCache:
+    """Bounded LRU of game results by `game_key`, in memory and optionally in `directory`."""
+
+    def __init__(self, directory: Optional[str] = None, capacity: int = DEFAULT_CAPACITY,
+                 disk_capacity: int = DEFAULT_DISK_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.entries: 'OrderedDict[str, list]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_entries = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.disk_entries = sum(len(files) for _, _, files in os.walk(directory))
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[list]:
+        """The stored result for `key`, counted as a hit or a miss."""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        elif self.directory is not None:
+            try:
+                with open(self._path(key)) as entry_file:
+                    value = json.load(entry_file)
+                os.utime(self._path(key))  # Most recently used on disk too
+            except (FileNotFoundError, ValueError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: list):
+        self._remember(key, value)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a process-specific name and renamed, so concurrent workers never read half an entry
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as entry_file:
+            json.dump(value, entry_file)
+        os.replace(temporary, path)
+        self.disk_entries += 1
+        if self.disk_entries > self.disk_capacity:
+            self._evict_disk()
+
+    def _remember(self, key: str, value: list):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        """Deletes the least recently used tenth of the disk entries, so eviction scans rarely."""
+        paths = [os.path.join(root, name) for root, _, files in os.walk(self.directory) for name in files]
+        files = []
+        for path in paths:
+            try:
+                files.append((os.path.getmtime(path), path))
+            except FileNotFoundError:  # Evicted by another process meanwhile
+                pass
+        files.sort()
+        excess = len(files) - self.disk_capacity + self.disk_capacity // 10
+        for _, path in files[:max(0, excess)]:
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+        self.disk_entries = len(files) - max(0, excess)
+
+    def play(self, players: Sequence[Player], first_turn: int = 0) -> GameResult:
+        """
+        The result of the game, resolved only if no equivalent game was cached. Games that
+        cannot be cached are simulated, which consumes the players; others leave them untouched.
+        """
+        key = game_key(players, first_turn)
+        if key is None:
+            return simulate_game(list(players), first_turn)
+        value = self.get(key)
+        if value is not None:
+            return decode_result(players, value)
+        result = resolve_game(players, first_turn)
+        self.put(key, encode_result(players, result))
+        return result
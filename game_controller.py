@@ -1,40 +1,72 @@
-from battleship_ui import BattleshipUI
-from typing import List, Optional
+from headless_ui import NullUI
+from renderers import DEFAULT_RENDERER, resolve_renderer
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
 from ship import Ship
+from packed_battle_area import PackedBattleArea
+from sparse_battle_area import SparseBattleArea
 from player import Player
-from logger import logging
+from player_ring import PlayerRing
+from logger import log_event
 from utils import Position
 
 import time
 
+if TYPE_CHECKING:  # Journaling is optional: game_journal is only imported by the code that writes one
+    from game_journal import JournalWriter
+
 SLEEP_TIME = 2
 
+@dataclass
+class GameResult:
+    """Summary of a finished game, keyed by player name."""
+    winner: Optional[str] = None
+    shots: Dict[str, int] = field(default_factory=dict)
+    hits: Dict[str, int] = field(default_factory=dict)
+    ships_sunk: Dict[str, int] = field(default_factory=dict)
+    turns: int = 0
+
+    @property
+    def is_draw(self) -> bool:
+        return self.winner is None
+
 class GameController:
-    def __init__(self):
+    def __init__(self, ui_class=DEFAULT_RENDERER, sleep_time: float = SLEEP_TIME,
+                 log_events: bool = True, wait_for_close: bool = True, journal: Optional['JournalWriter'] = None):
         self.state = None
-        self.ui = None
+        self.ui = NullUI()  # Replaced by `ui_class`, a UI class or renderer name, once the game starts
+        self.ui_class = ui_class
+        self.sleep_time = sleep_time
+        self.log_events = log_events
+        self.wait_for_close = wait_for_close
+        self.result = GameResult()
+        self.ring: Optional[PlayerRing] = None  # Live players of the running game
+        self.player_index: Dict[Player, int] = {}  # Player -> grid index in the UI
+        self.journal = journal  # Records every game event when set
+
+    @classmethod
+    def headless(cls, journal: Optional['JournalWriter'] = None) -> 'GameController':
+        """A controller with no rendering, no pacing and no per-shot logging."""
+        return cls(ui_class=NullUI, sleep_time=0, log_events=False, wait_for_close=False, journal=journal)
 
     def initialize_ui(self, players: List[Player], grid_size: tuple):
         """Initialize the game UI."""
         player_names = [player.name for player in players]
-        self.ui = BattleshipUI(player_names, grid_size)
-        
+        self.ui = resolve_renderer(self.ui_class)(player_names, grid_size)
+        if self.journal is not None:
+            self.journal.start_game(players, grid_size)
+
         # Place ships for all players
         for i, player in enumerate(players):
-            for x in player.battle_area.grid:
-                for y in player.battle_area.grid[x]:
-                    ship_cell = player.battle_area.grid[x][y]
-                    if ship_cell:
-                        # Get ship dimensions from the grid
-                        # width = sum(1 for dy in player.battle_area.grid[x] if player.battle_area.grid[x][dy] 
-                        #           and player.battle_area.grid[x][dy].ship == ship_cell.ship)
-                        # height = sum(1 for dx in player.battle_area.grid if player.battle_area.grid[dx].get(y) 
-                        #            and player.battle_area.grid[dx][y].ship == ship_cell.ship)
-                        
-                        self.ui.draw_ship(i, ship_cell.ship)
+            for ship in player.battle_area.ships:
+                self.ui.draw_ship(i, ship)
+        self.ui.flush(force=True)
 
     def check_hit(self, target, player) -> Optional[Ship]:
         """Check if a missile hits a ship at the given position in the player's battle area."""
+        if isinstance(player.battle_area, (PackedBattleArea, SparseBattleArea)):
+            return player.battle_area.fire_at(target)
+
         battle_area = player.battle_area.grid
 
         ship_cell = battle_area.get(target.x, {}).get(target.y)
@@ -68,39 +100,63 @@ class GameController:
         """Handles the missile firing logic and returns True if it was a hit, False otherwise."""
         ship = self.check_hit(target, next_player)
         # Get the index of the target player
-        try:
-            target_player_index = 0
-            for i, p in enumerate(self.players):
-                if p == next_player:
-                    target_player_index = i
-                    break
-        except Exception as e:
-            print("error", e)
-        
+        target_player_index = self.player_index.get(next_player, 0)
+
+        result = self.result
+        name = current_player.name
+        if self.journal is not None:
+            self.journal.shot(self.player_index.get(current_player, 0), target_player_index, target,
+                              ship is not None, ship is not None and ship.is_destroyed())
+        result.shots[name] = result.shots.get(name, 0) + 1
         if ship:
-            logging.info(f"{current_player.name} fires a missile at {target} which is a hit.")
+            result.hits[name] = result.hits.get(name, 0) + 1
+            if self.log_events:
+                log_event('shot', "%s fires a missile at %s which is a hit.", name, target,
+                          player=name, target=target, hit=True)
             self.ui.mark_hit(target_player_index, target)
+            if current_player.targeting is not None:
+                current_player.targeting.observe(next_player.name, target, True, ship.is_destroyed())
             if ship.is_destroyed():
                 next_player.ship_count -= 1
-                logging.info(f"{current_player.name} destroyed a ship!")
+                if next_player.ship_count <= 0 and self.ring is not None:
+                    self.ring.eliminate(next_player)
+                result.ships_sunk[name] = result.ships_sunk.get(name, 0) + 1
+                if self.log_events:
+                    log_event('sink', "%s destroyed a ship!", name, player=name, target_player=next_player.name)
             return True
         else:
-            logging.info(f"{current_player.name} fires a missile at {target} which missed.")
+            if self.log_events:
+                log_event('shot', "%s fires a missile at %s which missed.", name, target,
+                          player=name, target=target, hit=False)
             self.ui.mark_miss(target_player_index, target)
+            if current_player.targeting is not None:
+                current_player.targeting.observe(next_player.name, target, False, False)
             return False
 
+    def get_target_player(self, current_player: Player, active_players: List[Player], index: int) -> Optional[Player]:
+        """
+        The player `current_player` fires at: the next player with remaining ships.
+        Uses the live-player ring in constant time while a game is running.
+        """
+        if self.ring is None:
+            return self.get_next_player(active_players, index)
+        return self.ring.next_live_player(current_player)
+
     def process_player_turn(self, current_player: Player, active_players: List[Player], index: int):
         """Processes the turn for the current player."""
         while current_player.firing_sequence:
-            time.sleep(SLEEP_TIME)
+            if self.sleep_time:
+                time.sleep(self.sleep_time)
             target = current_player.firing_sequence.popleft()
-            next_player = self.get_next_player(active_players, index)
+            next_player = self.get_target_player(current_player, active_players, index)
 
             if not next_player:
                 # logging.info(f"{current_player.name} wins the game!")
                 return
 
-            if not self.fire_missile(current_player, target, next_player):
+            hit = self.fire_missile(current_player, target, next_player)
+            self.ui.flush()
+            if not hit:
                 break
 
     def is_firing_sequence_available(self, players:List[Player]):
@@ -122,33 +178,69 @@ class GameController:
             return False
         return len(active_players)>1 and self.is_firing_sequence_available(active_players)
 
-    def start_game(self, players: List[Player]):
-        """Starts the battleship game between multiple players."""
+    def start_game(self, players: List[Player], first_turn: int = 0) -> GameResult:
+        """
+        Starts the battleship game between multiple players and returns its result.
+        A game resumed mid-round passes the index in `players` of the player whose turn is next.
+        """
         self.players = players
+        self.result = GameResult(
+            shots={player.name: 0 for player in players},
+            hits={player.name: 0 for player in players},
+            ships_sunk={player.name: 0 for player in players},
+        )
         # Initialize UI with grid size from first player (assuming all grids are same size)
-        grid_size = (players[0].battle_area.width, ord(players[0].battle_area.height) - ord('A') + 1)
+        grid_size = (players[0].battle_area.width, players[0].battle_area.rows)
         self.initialize_ui(players, grid_size)
-        
-        active_players = self.get_active_players(players)
+
+        self.ring = PlayerRing(players)
+        self.player_index = self.ring.index
+        active_players = self.ring.live_players()
+        # Live players before `first_turn` already had their turn this round
+        skip = sum(1 for player in players[:first_turn] if player.ship_count > 0)
 
         while self.game_is_on(active_players):
             for i, player in enumerate(active_players):
+                if i < skip:
+                    continue
                 current_player = player
                 if not current_player.firing_sequence:
-                    logging.info(f"{current_player.name} has no more missiles left to launch")
+                    if self.log_events:
+                        log_event('out_of_shots', "%s has no more missiles left to launch", current_player.name,
+                                  player=current_player.name)
                     continue
+                self.result.turns += 1
+                if self.journal is not None:
+                    self.journal.start_turn(self.player_index[current_player])
                 self.ui.announce_turn(current_player.name)
+                self.ui.flush()
                 self.process_player_turn(current_player, active_players, i)
 
-            active_players = self.get_active_players(players)
+            active_players = self.ring.live_players()
+            skip = 0
 
         if len(active_players) == 1:
+            self.result.winner = active_players[0].name
             self.ui.announce_winner(active_players[0].name)
-            logging.info(f"{active_players[0].name} wins the game!")
+            if self.log_events:
+                log_event('game_over', "%s wins the game!", active_players[0].name, winner=active_players[0].name)
         else:
             self.ui.announce_draw()
-            logging.info("Game ends in a draw.")
-            
+            if self.log_events:
+                log_event('game_over', "Game ends in a draw.", winner=None)
+
+        self.ui.flush(force=True)
+        if self.journal is not None:
+            self.journal.result(self.player_index[active_players[0]] if len(active_players) == 1 else None,
+                                self.result.turns)
+            self.journal.flush()
+
         # Keep the window open until clicked
-        self.ui.screen.exitonclick()
-            
\ No newline at end of file
+        if self.wait_for_close:
+            self.ui.wait_for_close()
+        return self.result
+
+
+def simulate_game(players: List[Player], first_turn: int = 0) -> GameResult:
+    """Plays a configured game to completion without a display and returns the result."""
+    return GameController.headless().start_game(players, first_turn)
@@ -0,0 +1,185 @@
+"""
+Append-only binary journal of game events.
+
+Every record is RECORD.size (40) bytes:
+
+    kind, ship_type, player, target, height, row, col, width, value
+
+A game starts with a HEADER record (player count, board width and rows, and the
+length of the player names) followed by the UTF-8 names, padded to whole
+records. Games can be appended to the same file one after another, so a file
+is a flat array of fixed-width records that JournalReader scans in place
+through a memory map, without copying.
+
+Rows are stored as row numbers (A=1, AA=27); a shot at a label that is not a
+valid upper-case row (which always misses) is stored with row 0. Rows and
+columns are signed 64-bit and players 32-bit. The input accepts even larger
+rows and columns (firing_tokens keeps them aside); such a shot is far off any
+board and always misses, so it is stored as row 0, column 0.
+"""
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+
+from player import Player
+from ship import Ship
+from utils import Position, ShipType, row_number
+
+RECORD = struct.Struct('<BBxxIIIqqII')
+VERSION = 2  # Version 1 had 24-byte records with 16-bit players and 32-bit coordinates
+NO_PLAYER = 0xFFFFFFFF  # Winner of a draw
+COORDINATE_LIMIT = 1 << 63  # Rows and columns must be below this in magnitude to be stored
+
+HEADER, PLACE, TURN, HIT, MISS, SINK, RESULT = range(7)
+KIND_NAMES = ('header', 'place', 'turn', 'hit', 'miss', 'sink', 'result')
+SHIP_TYPES = {0: None, ShipType.P.value: 'P', ShipType.Q.value: 'Q'}
+
+
+class JournalEvent(NamedTuple):
+    kind: int
+    ship_type: int
+    player: int  # Player acting: owner of a placed ship, shooter, or winner
+    target: int  # Player fired at
+    height: int
+    row: int
+    col: int
+    width: int
+    value: int  # Turn number, or the number of turns for RESULT
+
+
+class JournalGame(NamedTuple):
+    """A game found in a journal: its header fields and the byte range of its events."""
+    width: int
+    rows: int
+    players: List[str]
+    offset: int  # Of the header record
+    start: int
+    end: int
+
+
+class JournalWriter:
+    """Writes the events of one or more games to an append-only journal file."""
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.file: BinaryIO = open(path, 'ab', buffering=buffer_size)
+        self.turn = 0
+
+    @staticmethod
+    def _coordinates(row: int, col: int) -> Tuple[int, int]:
+        """(row, col), or (0, 0) for a cell too far off the board to store."""
+        if -COORDINATE_LIMIT <= row < COORDINATE_LIMIT and -COORDINATE_LIMIT <= col < COORDINATE_LIMIT:
+            return row, col
+        return 0, 0
+
+    def _write(self, kind, ship_type=0, player=0, target=0, height=0, row=0, col=0, width=0, value=0):
+        self.file.write(RECORD.pack(kind, ship_type, player, target, height, row, col, width, value))
+
+    def start_game(self, players: List[Player], grid_size: Tuple[int, int]):
+        """Writes the header and the placement of every ship."""
+        names = b'\0'.join(player.name.encode('utf-8') for player in players)
+        width, rows = grid_size
+        self.turn = 0
+        self._write(HEADER, player=len(players), row=rows, col=width, width=len(names), value=VERSION)
+        self.file.write(names.ljust(-(-len(names) // RECORD.size) * RECORD.size, b'\0'))
+        for index, player in enumerate(players):
+            for ship in player.battle_area.ships:
+                self.place(index, ship)
+
+    def place(self, player: int, ship: Ship):
+        position = ship.position or Position('', 0)
+        row, col = self._coordinates(row_number(position.x.upper()), position.y)
+        self._write(PLACE, ShipType[ship.ship_type].value if ship.ship_type in ('P', 'Q') else 0, player,
+                    height=ship.height, row=row, col=col, width=ship.width, value=self.turn)
+
+    def start_turn(self, player: int):
+        self.turn += 1
+        self._write(TURN, player=player, value=self.turn)
+
+    def shot(self, player: int, target: int, position: Position, hit: bool, sunk: bool = False):
+        row, col = self._coordinates(row_number(position.x), position.y)
+        self._write(HIT if hit else MISS, player=player, target=target, row=row, col=col, value=self.turn)
+        if sunk:
+            self._write(SINK, player=player, target=target, row=row, col=col, value=self.turn)
+
+    def result(self, winner: Optional[int], turns: int):
+        self._write(RESULT, player=NO_PLAYER if winner is None else winner, value=turns)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> 'JournalWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JournalReader:
+    """Memory-maps a journal and iterates its records without copying them."""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        # A record cut short by a crash is ignored
+        self.view = memoryview(self.map if self.map is not None else b'')[:size - size % RECORD.size]
+
+    def records(self, start: int = 0, end: Optional[int] = None) -> Iterator[tuple]:
+        """Raw record tuples between two byte offsets, unpacked straight from the map."""
+        return RECORD.iter_unpack(self.view[start:end])
+
+    def _scan(self) -> Iterator[Tuple[Optional[JournalGame], tuple]]:
+        """Single pass yielding (game, record) for every event record."""
+        game = None
+        skip = 0
+        for index, record in enumerate(RECORD.iter_unpack(self.view)):
+            if skip:
+                skip -= 1
+                continue
+            if record[0] != HEADER:
+                yield game, record
+                continue
+            names_length = record[7]
+            names_start = (index + 1) * RECORD.size
+            names = bytes(self.view[names_start:names_start + names_length]).decode('utf-8')
+            skip = -(-names_length // RECORD.size)
+            game = JournalGame(record[6], record[5], names.split('\0') if record[2] else [],
+                               index * RECORD.size, names_start + skip * RECORD.size, len(self.view))
+            yield game, None
+
+    def games(self) -> Iterator[JournalGame]:
+        """Every game in the journal, in order, with the byte range of its events."""
+        previous = None
+        for game, record in self._scan():
+            if record is None:
+                if previous is not None:
+                    yield previous._replace(end=game.offset)
+                previous = game
+        if previous is not None:
+            yield previous
+
+    def events(self, game: Optional[JournalGame] = None) -> Iterator[JournalEvent]:
+        """Events of one game, or of every game in the file when `game` is None."""
+        if game is not None:
+            for record in self.records(game.start, game.end):
+                yield JournalEvent._make(record)
+            return
+        for _, record in self._scan():
+            if record is not None:
+                yield JournalEvent._make(record)
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> 'JournalReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
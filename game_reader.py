@@ -0,0 +1,74 @@
+"""
+Streaming reader for inputs that hold many games.
+
+Games use the main.py format and are separated by a separator line (a blank
+line by default). Only the game being parsed is kept in memory, so arbitrarily
+large streams can be read with constant memory. A game that fails validation
+is yielded with its error, and the reader carries on with the next one.
+"""
+from dataclasses import dataclass
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+
+from input_validator import ValidateInput
+from player import Player
+from utils import InputValidationError
+
+PLAYER_NAMES = ('Player-1', 'Player-2')
+
+
+@dataclass
+class GameRecord:
+    """One game from the stream: `players` when it parsed, `error` when it did not."""
+    index: int
+    first_line: int
+    players: Optional[List[Player]] = None
+    error: Optional[InputValidationError] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def iter_records(stream: IO[str], separator: str = '') -> Iterator[Tuple[int, List[str]]]:
+    """
+    Splits a stream into raw game records without parsing them.
+    Yields (first line number, lines) for each record.
+    """
+    lines: List[str] = []
+    first_line = 1
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line == separator:
+            if lines:
+                yield first_line, lines
+                lines = []
+            continue
+        if not line:
+            continue
+        if not lines:
+            first_line = line_number
+        lines.append(line)
+    if lines:
+        yield first_line, lines
+
+
+def parse_record(lines: List[str], first_line: int = 1, player_names: Sequence[str] = PLAYER_NAMES,
+                 battle_area_class=None) -> List[Player]:
+    """Validates one record and returns its configured players."""
+    input_class = ValidateInput(battle_area_class) if battle_area_class else ValidateInput()
+    input_class.set_players(list(player_names))
+    input_class.set_input(lines, first_line)
+    input_class.configure_game()
+    return input_class.players
+
+
+def read_games(stream: IO[str], player_names: Sequence[str] = PLAYER_NAMES, separator: str = '',
+               battle_area_class=None) -> Iterator[GameRecord]:
+    """Yields a GameRecord for every game in `stream`, in order."""
+    for index, (first_line, lines) in enumerate(iter_records(stream, separator)):
+        try:
+            players = parse_record(lines, first_line, player_names, battle_area_class)
+        except InputValidationError as e:
+            yield GameRecord(index, first_line, error=e)
+        else:
+            yield GameRecord(index, first_line, players)
@@ -0,0 +1,438 @@
+"""
+asyncio server hosting many concurrent games over TCP or a Unix socket.
+
+    python game_server.py --port 8765
+    python game_server.py --unix /tmp/battleship.sock
+
+Clients exchange JSON objects, one per line. A connection may create games and
+take any number of seats in them, and only it can play the seats it took:
+
+    {"op": "create", "players": 2, "width": 5, "height": "E", "timeout": 60}
+    {"op": "join", "game": 1, "name": "Player-1"}
+    {"op": "place", "game": 1, "player": 0, "ships": [["Q", 1, 1, "A1"], ["P", 2, 1, "D4"]]}
+    {"op": "ready", "game": 1, "player": 0}
+    {"op": "fire", "game": 1, "player": 0, "at": ["A1", "B2"]}
+    {"op": "done", "game": 1, "player": 0}
+    {"op": "ping"}
+
+and receive events such as {"event": "shot", ...} and {"event": "result", ...}.
+A game starts once every seat is ready and follows the same rules as
+GameController.start_game, with each player's firing sequence arriving over the
+connection: a turn waits for the player's next shot until the player sends
+"done". Every game runs as one coroutine under its own timeout. Outgoing events
+go through a bounded queue per connection whose writer awaits `drain()`, so a
+slow client only slows down its own games, and at most `max_active_games` games
+play at once so the event loop stays responsive however many are open.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+from typing import Dict, List
+
+from game_controller import GameController, GameResult
+from input_validator import ValidateInput
+from logger import configure_logging, logging
+from packed_battle_area import PackedBattleArea
+from player import Player
+from player_ring import PlayerRing
+from utils import InputValidationError, ShipType, row_label, row_number
+
+DEFAULT_TIMEOUT = 300.0
+SEND_QUEUE_SIZE = 1024  # Events buffered per connection before games wait for the client
+MAX_ACTIVE_GAMES = 256  # Games playing at once; others keep buffering messages until admitted
+MAX_LINE = 1 << 16
+MAX_PLAYERS = 1000
+# Board size limits: every seat holds about 5 bytes per cell, allocated when it joins
+MAX_WIDTH = 100
+MAX_ROWS = 100
+
+
+class Connection:
+    """One client. Events are queued and written by a single writer task."""
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int = SEND_QUEUE_SIZE):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.task = asyncio.ensure_future(self._write_loop())
+        self.closed = False
+        self.seats: List['Seat'] = []
+
+    async def send(self, event: dict):
+        """Queues an event, waiting while the client is too far behind."""
+        await self.send_line(json.dumps(event).encode() + b'\n')
+
+    async def send_line(self, data: bytes):
+        if not self.closed:
+            await self.queue.put(data)
+
+    def send_nowait(self, event: dict):
+        """Queues an event unless the client is too far behind, in which case it is dropped."""
+        if not self.closed and not self.queue.full():
+            self.queue.put_nowait(json.dumps(event).encode() + b'\n')
+
+    async def _write_loop(self):
+        try:
+            while True:
+                data = await self.queue.get()
+                if data is None:
+                    break
+                # Coalesce whatever else is already queued into one write
+                chunks = [data]
+                while not self.queue.empty():
+                    data = self.queue.get_nowait()
+                    if data is None:
+                        break
+                    chunks.append(data)
+                self.writer.write(b''.join(chunks))
+                await self.writer.drain()
+                if data is None:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+            # Release games waiting for room in the queue; nothing more will be written
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+    async def close(self):
+        """Flushes queued events and closes the connection. Its seats will send no more shots."""
+        for seat in self.seats:
+            seat.done = True
+            seat.changed.set()
+        if not self.closed:
+            await self.queue.put(None)
+        await self.task
+
+
+class Seat:
+    """A player's place in a game: the Player, its client, and its shot stream."""
+
+    def __init__(self, player: Player, connection: Connection):
+        self.player = player
+        self.connection = connection
+        self.ready = False
+        self.done = False  # No more shots will arrive
+        self.changed = asyncio.Event()
+
+    async def has_shots(self) -> bool:
+        """Whether the player has a shot left, waiting for the client when it has not decided yet."""
+        while not self.player.firing_sequence and not self.done:
+            self.changed.clear()
+            await self.changed.wait()
+        return bool(self.player.firing_sequence)
+
+
+class ServerGame:
+    def __init__(self, game_id: int, player_count: int, width: int, height: str, creator: Connection):
+        self.id = game_id
+        self.player_count = player_count
+        self.width = width
+        self.height = height
+        self.creator = creator
+        self.seats: List[Seat] = []
+        self.validator = ValidateInput()  # Parses and interns coordinates
+        self.all_ready = asyncio.Event()
+        self.controller = GameController.headless()
+
+    def seat(self, index, connection: Connection) -> Seat:
+        """The seat `index`, which only the connection that joined it may play."""
+        if not isinstance(index, int) or not 0 <= index < len(self.seats):
+            raise InputValidationError(f"Game {self.id} has no player {index}.")
+        seat = self.seats[index]
+        if seat.connection is not connection:
+            raise InputValidationError(f"Player {index} of game {self.id} belongs to another connection.")
+        return seat
+
+    def connections(self) -> List[Connection]:
+        """The creator and every seated client, each once."""
+        connections = {id(self.creator): self.creator}
+        for seat in self.seats:
+            connections.setdefault(id(seat.connection), seat.connection)
+        return list(connections.values())
+
+    async def broadcast(self, event: dict, connections: List[Connection] = None):
+        event['game'] = self.id
+        data = json.dumps(event).encode() + b'\n'
+        for connection in connections or self.connections():
+            await connection.send_line(data)
+
+    async def play(self, admission: asyncio.Semaphore) -> GameResult:
+        """Waits for every seat and a free slot, then plays the game."""
+        await self.all_ready.wait()
+        async with admission:
+            return await self._play()
+
+    async def _play(self) -> GameResult:
+        """GameController.start_game over streamed firing sequences."""
+        controller = self.controller
+        seats = {seat.player: seat for seat in self.seats}
+        players = [seat.player for seat in self.seats]
+        for player in players:
+            player.set_ship_count(len(player.battle_area.ships))
+        controller.result = result = GameResult(
+            shots={player.name: 0 for player in players},
+            hits={player.name: 0 for player in players},
+            ships_sunk={player.name: 0 for player in players},
+        )
+        controller.ring = PlayerRing(players)
+        controller.player_index = controller.ring.index
+        connections = self.connections()  # Seats are all taken once the game starts
+
+        async def broadcast(event):
+            await self.broadcast(event, connections)
+
+        await broadcast({'event': 'start', 'players': [player.name for player in players]})
+
+        active_players = controller.ring.live_players()
+        while len(active_players) > 1 and await self._any_shots(active_players, seats):
+            for i, player in enumerate(active_players):
+                seat = seats[player]
+                if not await seat.has_shots():
+                    continue
+                result.turns += 1
+                await broadcast({'event': 'turn', 'player': player.name, 'turn': result.turns})
+                while await seat.has_shots():
+                    target = player.firing_sequence.popleft()
+                    next_player = controller.get_target_player(player, active_players, i)
+                    if not next_player:
+                        break
+                    ships_left = next_player.ship_count
+                    hit = controller.fire_missile(player, target, next_player)
+                    await broadcast({'event': 'shot', 'player': player.name, 'target': next_player.name,
+                                          'at': str(target), 'hit': hit,
+                                          'sunk': next_player.ship_count < ships_left})
+                    if not hit:
+                        break
+            active_players = controller.ring.live_players()
+
+        if len(active_players) == 1:
+            result.winner = active_players[0].name
+        await broadcast({'event': 'result', 'winner': result.winner, 'turns': result.turns,
+                              'shots': result.shots, 'hits': result.hits, 'ships_sunk': result.ships_sunk})
+        return result
+
+    @staticmethod
+    async def _any_shots(active_players: List[Player], seats: Dict[Player, Seat]) -> bool:
+        for player in active_players:
+            if await seats[player].has_shots():
+                return True
+        return False
+
+
+class GameServer:
+    """Routes client messages to games and runs every game as its own task."""
+
+    def __init__(self, default_timeout: float = DEFAULT_TIMEOUT, queue_size: int = SEND_QUEUE_SIZE,
+                 max_active_games: int = MAX_ACTIVE_GAMES):
+        self.default_timeout = default_timeout
+        self.queue_size = queue_size
+        self.active_games = asyncio.Semaphore(max_active_games)
+        self.games: Dict[int, ServerGame] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self._ids = itertools.count(1)
+
+    async def start_tcp(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle_connection, path, limit=MAX_LINE)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(writer, self.queue_size)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Line over MAX_LINE, or the client went away
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await self.handle_message(connection, line)
+        finally:
+            await connection.close()
+
+    async def handle_message(self, connection: Connection, line: bytes):
+        op = None
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise InputValidationError("Expected a JSON object.")
+            op = message.get('op')
+            handler = getattr(self, f'_op_{op}', None) if isinstance(op, str) else None
+            if handler is None:
+                raise InputValidationError(f"Unknown op '{op}'.")
+            await handler(connection, message)
+        except (InputValidationError, ValueError, TypeError, KeyError, AttributeError, MemoryError) as e:
+            await connection.send({'event': 'error', 'op': op, 'message': str(e)})
+
+    def _game(self, message: dict) -> ServerGame:
+        game = self.games.get(message.get('game'))
+        if game is None:
+            raise InputValidationError(f"No game {message.get('game')}.")
+        return game
+
+    async def _op_ping(self, connection: Connection, message: dict):
+        await connection.send({'event': 'pong'})
+
+    async def _op_create(self, connection: Connection, message: dict):
+        player_count = message.get('players', 2)
+        width, height = message.get('width'), message.get('height')
+        timeout = message.get('timeout', self.default_timeout)
+        if not isinstance(player_count, int) or not 2 <= player_count <= MAX_PLAYERS:
+            raise InputValidationError(f"players must be between 2 and {MAX_PLAYERS}.")
+        if not isinstance(width, int) or width <= 0 or not isinstance(height, str) or not height.isalpha():
+            raise InputValidationError("Expected a positive integer width and a row label height, e.g. 5 and 'E'.")
+        max_height = row_label(MAX_ROWS)
+        if width > MAX_WIDTH or len(height) > len(max_height) or row_number(height.upper()) > MAX_ROWS:
+            raise InputValidationError(f"Boards are at most {MAX_WIDTH} wide and {max_height} high.")
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise InputValidationError("timeout must be a positive number of seconds.")
+
+        game = ServerGame(next(self._ids), player_count, width, height, connection)
+        self.games[game.id] = game
+        self.tasks[game.id] = asyncio.ensure_future(self._run(game, timeout))
+        await connection.send({'event': 'created', 'game': game.id})
+
+    async def _run(self, game: ServerGame, timeout: float):
+        try:
+            await asyncio.wait_for(game.play(self.active_games), timeout)
+        except asyncio.TimeoutError:
+            logging.info(f"Game {game.id} timed out")
+            for connection in game.connections():
+                connection.send_nowait({'event': 'timeout', 'game': game.id})
+        finally:
+            del self.games[game.id]
+            del self.tasks[game.id]
+
+    async def _op_join(self, connection: Connection, message: dict):
+        game = self._game(message)
+        if len(game.seats) >= game.player_count:
+            raise InputValidationError(f"Game {game.id} is full.")
+        index = len(game.seats)
+        name = str(message.get('name') or f'Player-{index + 1}')
+        if any(seat.player.name == name for seat in game.seats):
+            raise InputValidationError(f"Name '{name}' is taken in game {game.id}.")
+        player = Player(name)
+        # Checks a whole ship before writing any of its cells, so a rejected placement leaves no trace
+        player.set_battle_area(game.width, game.height, PackedBattleArea)
+        player.set_firing_sequence([])
+        seat = Seat(player, connection)
+        game.seats.append(seat)
+        connection.seats.append(seat)
+        await connection.send({'event': 'joined', 'game': game.id, 'player': index})
+
+    async def _op_place(self, connection: Connection, message: dict):
+        game = self._game(message)
+        seat = game.seat(message.get('player'), connection)
+        if seat.ready:
+            raise InputValidationError("Ships cannot be placed after ready.")
+        ships = []
+        for ship_type, width, height, at in message['ships']:
+            if not isinstance(width, int) or not isinstance(height, int) or width < 1 or height < 1:
+                raise InputValidationError("Ship width and height must be positive integers.")
+            if ship_type not in ShipType.__members__:
+                raise InputValidationError(f"Invalid ship type '{ship_type}'. Expected P or Q.")
+            ships.append((ship_type, width, height, game.validator.get_coordinates_pos(at)))
+        # All of the message's ships or none: undo the ones placed before a rejected one
+        area = seat.player.battle_area
+        saved = (bytes(area.health), area.ship_ids[:], len(area.ships))
+        try:
+            for ship_type, width, height, position in ships:
+                seat.player.place_ships(width, height, position, ship_type)
+        except InputValidationError:
+            area.health[:], area.ship_ids[:] = saved[0], saved[1]
+            del area.ships[saved[2]:]
+            raise
+        await connection.send({'event': 'placed', 'game': game.id, 'player': message['player'],
+                               'ships': len(seat.player.battle_area.ships)})
+
+    async def _op_ready(self, connection: Connection, message: dict):
+        game = self._game(message)
+        game.seat(message.get('player'), connection).ready = True
+        if len(game.seats) == game.player_count and all(seat.ready for seat in game.seats):
+            game.all_ready.set()
+
+    async def _op_fire(self, connection: Connection, message: dict):
+        game = self._game(message)
+        seat = game.seat(message.get('player'), connection)
+        if seat.done:
+            raise InputValidationError("No shots can follow done.")
+        shots = message['at']
+        positions = [game.validator.get_coordinates_pos(at) for at in (shots if isinstance(shots, list) else [shots])]
+        seat.player.firing_sequence.extend(positions)
+        seat.changed.set()
+
+    async def _op_done(self, connection: Connection, message: dict):
+        seat = self._game(message).seat(message.get('player'), connection)
+        seat.done = True
+        seat.changed.set()
+
+
+async def play_remote_game(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, players: List[Player],
+                           timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """
+    Client side: plays configured players (ships and whole firing sequences) as
+    one game over a connection of its own, and returns the result or timeout event.
+    """
+    async def send(message):
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+
+    async def receive(*events):
+        while True:
+            event = json.loads(await reader.readline())
+            if event['event'] in events:
+                return event
+            if event['event'] == 'error':
+                raise InputValidationError(event['message'])
+
+    battle_area = players[0].battle_area
+    await send({'op': 'create', 'players': len(players), 'width': battle_area.width,
+                'height': battle_area.height, 'timeout': timeout})
+    game = (await receive('created'))['game']
+    for index, player in enumerate(players):
+        await send({'op': 'join', 'game': game, 'name': player.name})
+        await receive('joined')
+        ships = [[ship.ship_type, ship.width, ship.height, str(ship.position)] for ship in player.battle_area.ships]
+        await send({'op': 'place', 'game': game, 'player': index, 'ships': ships})
+        await receive('placed')
+    for index, player in enumerate(players):
+        await send({'op': 'fire', 'game': game, 'player': index, 'at': [str(shot) for shot in player.firing_sequence]})
+        await send({'op': 'done', 'game': game, 'player': index})
+        await send({'op': 'ready', 'game': game, 'player': index})
+    return await receive('result', 'timeout')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Host battleship games over TCP or a Unix socket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="Listen on a Unix socket instead of TCP")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="Default seconds per game")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    server = GameServer(args.timeout)
+    if args.unix:
+        listener = await server.start_unix(args.unix)
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+    logging.info(f"Listening on {', '.join(str(sock.getsockname()) for sock in listener.sockets)}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    asyncio.run(serve(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+from typing import List, Tuple
+from utils import Position
+from ship import Ship
+
+
+class NullUI:
+    """Drop-in replacement for BattleshipUI that draws nothing."""
+
+    def __init__(self, players: List[str] = None, grid_size: tuple = (0, 0)):
+        self.players = players or []
+        self.width, self.height = grid_size
+
+    def draw_ship(self, player_index: int, ship: Ship):
+        pass
+
+    def mark_hit(self, player_index: int, position: Position):
+        pass
+
+    def mark_miss(self, player_index: int, position: Position):
+        pass
+
+    def display_message(self, message: str, message_type: str = 'text'):
+        pass
+
+    def announce_winner(self, player_name: str):
+        pass
+
+    def announce_draw(self):
+        pass
+
+    def announce_turn(self, player_name: str):
+        pass
+
+    def clear_marks(self):
+        pass
+
+    def flush(self, force: bool = False):
+        pass
+
+    def wait_for_close(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RecordingUI(NullUI):
+    """Headless UI that keeps every draw call as an (operation, args) tuple."""
+
+    def __init__(self, players: List[str] = None, grid_size: tuple = (0, 0)):
+        super().__init__(players, grid_size)
+        self.events: List[Tuple] = []
+
+    def draw_ship(self, player_index: int, ship: Ship):
+        self.events.append(('draw_ship', player_index, ship))
+
+    def mark_hit(self, player_index: int, position: Position):
+        self.events.append(('mark_hit', player_index, position))
+
+    def mark_miss(self, player_index: int, position: Position):
+        self.events.append(('mark_miss', player_index, position))
+
+    def display_message(self, message: str, message_type: str = 'text'):
+        self.events.append(('display_message', message, message_type))
+
+    def announce_winner(self, player_name: str):
+        self.events.append(('announce_winner', player_name))
+
+    def announce_draw(self):
+        self.events.append(('announce_draw',))
+
+    def announce_turn(self, player_name: str):
+        self.events.append(('announce_turn', player_name))
+
+    def clear_marks(self):
+        self.events.append(('clear_marks',))
@@ -1,30 +1,61 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from player import Player
+from battle_area import BattleArea
+from firing_tokens import parse_firing_sequence
 from utils import Position, throw_error
 import sys
 
 class ValidateInput:
-    def __init__(self) -> None:
+    def __init__(self, battle_area_class=BattleArea) -> None:
         self.expected_input_lines:int = 6
+        self.battle_area_class = battle_area_class
         self.ship_count: int = 0
         self.input: List[str] = []
+        self.first_line: int = 1  # Line number of self.input[0] in the original input
         self.players: List[Player] = []
+        self.positions: Dict[str, Position] = {}  # Interned coordinates, shared by repeated shots
 
     def set_players(self, player_names: List[str]):
         for name in player_names:
             self.players.append(Player(name))
 
+    @staticmethod
+    def _split_coordinates(char: str) -> int:
+        """Length of the row label, or 0 when `char` is not a row label followed by a column."""
+        row_length = len(char)
+        for i, c in enumerate(char):
+            if not c.isalpha():
+                row_length = i
+                break
+        if row_length == 0 or not char[row_length:].isdigit():
+            return 0
+        return row_length
+
     def get_coordinates_pos(self, char: str) -> Position:
-        if not char[0].isalpha() or not char[1:].isdigit():
-            throw_error(f"Invalid input '{char}'. Expected format: A1, B10, etc.")
-        xPos = char[0]
-        yPos = int(char[1:])
-        return Position(xPos, yPos)
-
-    def get_valid_input(self) -> List[str]:
-        input_text = sys.stdin.read().strip()
-        input_lines = input_text.splitlines()
-        
+        position = self.positions.get(char)
+        if position is not None:
+            return position
+        row_length = self._split_coordinates(char)
+        if not row_length:
+            throw_error(f"Invalid input '{char}'. Expected format: A1, B10, AA7, etc.")
+        xPos = char[:row_length]
+        yPos = int(char[row_length:])
+        position = self.positions[char] = Position(xPos, yPos)
+        return position
+
+    def get_valid_input(self, input_text: Optional[str] = None) -> List[str]:
+        """
+        Reads one game (from stdin by default). Once players are set, the number of
+        ship and firing-sequence lines follows the ship count and player count;
+        otherwise exactly `expected_input_lines` lines are required.
+        """
+        if input_text is None:
+            input_text = sys.stdin.read()
+        input_text = input_text.strip()
+        input_lines = [line.strip() for line in input_text.splitlines()]
+
+        if input_lines and self.players:
+            return self.set_input(input_lines)
         if not input_lines:
             throw_error("No input provided. Please enter valid input.")
         if len(input_lines) != self.expected_input_lines:
@@ -33,18 +64,45 @@ class ValidateInput:
         self.input = input_lines
         return True
 
+    def set_input(self, input_lines: List[str], first_line: int = 1) -> bool:
+        """
+        Accepts one game record that has already been split into lines, e.g. by
+        game_reader. The number of ship lines follows the ship count, so records
+        may hold any number of ships. Players must be set first.
+        """
+        if not input_lines:
+            throw_error("No input provided. Please enter valid input.", first_line)
+
+        self.input = input_lines
+        self.first_line = first_line
+        if len(input_lines) < 2:
+            throw_error(f"Expected at least 2 lines of input. Got {len(input_lines)}.", first_line)
+
+        # A non-numeric ship count is reported by set_ship_count
+        ship_count = input_lines[1].strip()
+        if ship_count.isdigit():
+            expected_lines = 2 + int(ship_count) + len(self.players)
+            if len(input_lines) != expected_lines:
+                throw_error(f"Expected {expected_lines} lines of input. Got {len(input_lines)}.", first_line)
+        return True
+
+    def _line_number(self, index: int) -> int:
+        """Line number in the original input of self.input[index]."""
+        return self.first_line + index % len(self.input)
+
     def set_battle_area(self):
         battle_area = self.input[0].split()
 
         # Validate battle area dimensions
         if len(battle_area) != 2 or not battle_area[0].isdigit() or not battle_area[1].isalpha():
-            throw_error(f"{battle_area} is not a valid battle area dimension. Please enter valid dimensions (e.g., '5 E')!")
+            throw_error(f"{battle_area} is not a valid battle area dimension. Please enter valid dimensions (e.g., '5 E')!",
+                        self._line_number(0))
 
         width, height = battle_area
 
         # Set battle area dimensions for both players
         for player in self.players:
-            player.set_battle_area(width, height)
+            player.set_battle_area(width, height, self.battle_area_class)
 
 
     def set_ship_count(self):
@@ -52,7 +110,8 @@ class ValidateInput:
 
         # Validate ship count
         if not ship_count.isdigit():
-            throw_error("Please enter a valid integer for ship count; it cannot be empty or non-numeric!")
+            throw_error("Please enter a valid integer for ship count; it cannot be empty or non-numeric!",
+                        self._line_number(1))
 
         ship_count = int(ship_count)
         
@@ -70,8 +129,9 @@ class ValidateInput:
             ship_positions = self.input[start_index].split()
 
             # Validate ship positions
+            line = self._line_number(start_index)
             if len(ship_positions) != (3 + len(self.players)):
-                throw_error("Invalid ship position input for all players.")
+                throw_error("Invalid ship position input for all players.", line)
 
             try:
                 ship_type, ship_width, ship_height = ship_positions[:3]
@@ -81,30 +141,19 @@ class ValidateInput:
                     position = self.get_coordinates_pos(ship_positions[3+i])
                     player.place_ships(ship_width, ship_height,position, ship_type)
             except ValueError as e:
-                throw_error(f"Invalid ship dimensions or positions: {e}")
+                throw_error(f"Invalid ship dimensions or positions: {e}", line)
             except Exception as e:
-                throw_error(f"An unexpected error occurred: {e}")
+                throw_error(f"An unexpected error occurred: {e}", line)
 
             self.ship_count -= 1
             start_index += 1
 
 
     def set_firing_sequence(self):
-        def validate_and_get_coordinates(sequence):
-            positions = sequence.split()
-            
-            # Validate each position (format: letter followed by a number, e.g., A1, B2)
-            for pos in positions:
-                if not (len(pos) >= 2 and pos[0].isalpha() and pos[1:].isdigit()):
-                    throw_error(f"Invalid position '{pos}'. Expected format: A1 B2 B3 ...")
-            
-            # Convert positions to coordinates
-            return [self.get_coordinates_pos(pos) for pos in positions]
-
-        # Validate and set firing sequences for both players
+        # Validate and set firing sequences for both players, packed in one pass per line
         for i, player in enumerate(self.players):
-            sequence = validate_and_get_coordinates(self.input[-len(self.players)+i])
-            player.set_firing_sequence(sequence)
+            index = -len(self.players) + i
+            player.set_firing_sequence(parse_firing_sequence(self.input[index], self._line_number(index)))
 
     def configure_game(self) -> None:
         self.set_battle_area()
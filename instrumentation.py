@@ -0,0 +1,182 @@
+"""
+Optional timing and counters for a GameController and its UI.
+
+    metrics = instrument(controller)
+    controller.start_game(players)
+    metrics.dump('metrics.json')
+
+`instrument` wraps the controller's hot-path methods on that instance only, and
+the UI's draw calls once the game creates its UI. A controller that was never
+instrumented runs the plain methods, so instrumentation costs nothing when off.
+"""
+import json
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from renderers import resolve_renderer
+
+CONTROLLER_METHODS = ('process_player_turn', 'fire_missile', 'check_hit')
+UI_METHODS = ('draw_ship', 'mark_hit', 'mark_miss', 'display_message', 'announce_turn', 'flush')
+
+
+class Histogram:
+    """
+    Latency histogram with power-of-two nanosecond buckets: bucket `b` counts
+    durations in [2**(b-1), 2**b) ns. Exact count, total, min and max are kept too.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int):
+        bucket = elapsed_ns.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound, in ns, of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(2 ** bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns / self.count if self.count else 0,
+            'min_ns': self.min_ns or 0,
+            'max_ns': self.max_ns,
+            'p50_ns': self.percentile(0.5),
+            'p99_ns': self.percentile(0.99),
+            'buckets': {f"<{2 ** bucket}": count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+class Metrics:
+    """Latency histograms per method, shot counters and turn durations per player."""
+
+    def __init__(self):
+        self.latency: Dict[str, Histogram] = {}
+        self.turns: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {'shots': 0, 'hits': 0, 'misses': 0, 'sinks': 0}
+        self.listeners: List[Callable[[str, int], None]] = []
+
+    def add_listener(self, callback: Callable[[str, int], None]):
+        """Calls `callback(name, elapsed_ns)` for every timed call as it is recorded."""
+        self.listeners.append(callback)
+
+    def record(self, name: str, elapsed_ns: int):
+        histogram = self.latency.get(name)
+        if histogram is None:
+            histogram = self.latency[name] = Histogram()
+        histogram.record(elapsed_ns)
+        for callback in self.listeners:
+            callback(name, elapsed_ns)
+
+    def record_turn(self, player_name: str, elapsed_ns: int):
+        histogram = self.turns.get(player_name)
+        if histogram is None:
+            histogram = self.turns[player_name] = Histogram()
+        histogram.record(elapsed_ns)
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict:
+        return {
+            'counters': dict(self.counters),
+            'latency': {name: histogram.to_dict() for name, histogram in self.latency.items()},
+            'turns': {name: histogram.to_dict() for name, histogram in self.turns.items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path: str):
+        with open(path, 'w') as output:
+            output.write(self.to_json())
+
+
+def timed(metrics: Metrics, name: str, method: Callable) -> Callable:
+    """Wraps a bound method so each call is recorded under `name`."""
+    clock = time.perf_counter_ns
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            metrics.record(name, clock() - start)
+    return wrapper
+
+
+def instrument_ui(ui, metrics: Metrics):
+    """Times the UI's draw calls, e.g. BattleshipUI queueing and flushing frames, and returns the UI."""
+    for name in UI_METHODS:
+        method = getattr(ui, name, None)
+        if method is not None:
+            setattr(ui, name, timed(metrics, f"ui.{name}", method))
+    return ui
+
+
+def instrument(controller, metrics: Optional[Metrics] = None) -> Metrics:
+    """Instruments one GameController in place and returns the metrics it records into."""
+    metrics = metrics or Metrics()
+    clock = time.perf_counter_ns
+    for name in CONTROLLER_METHODS:
+        setattr(controller, name, timed(metrics, name, getattr(controller, name)))
+
+    process_player_turn = controller.process_player_turn
+    fire_missile = controller.fire_missile
+    initialize_ui = controller.initialize_ui
+
+    @wraps(process_player_turn)
+    def timed_turn(current_player, *args):
+        start = clock()
+        try:
+            return process_player_turn(current_player, *args)
+        finally:
+            metrics.record_turn(current_player.name, clock() - start)
+
+    @wraps(fire_missile)
+    def counted_fire_missile(current_player, target, next_player):
+        ships_left = next_player.ship_count
+        hit = fire_missile(current_player, target, next_player)
+        metrics.count('shots')
+        metrics.count('hits' if hit else 'misses')
+        if next_player.ship_count < ships_left:
+            metrics.count('sinks')
+        return hit
+
+    @wraps(initialize_ui)
+    def instrumented_initialize_ui(*args):
+        # Wrap the UI before the ships are drawn, so draw_ship is timed too
+        ui_class = controller.ui_class
+        resolved = resolve_renderer(ui_class)
+        controller.ui_class = lambda *ui_args: instrument_ui(resolved(*ui_args), metrics)
+        try:
+            return initialize_ui(*args)
+        finally:
+            controller.ui_class = ui_class
+
+    controller.process_player_turn = timed_turn
+    controller.fire_missile = counted_fire_missile
+    controller.initialize_ui = instrumented_initialize_ui
+    return metrics
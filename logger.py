@@ -1,10 +1,175 @@
+"""
+Logging setup shared by every module (`from logger import logging`).
+
+Nothing is configured on import: entry points call `configure_logging()`, which
+by default sends records synchronously to game.log and the console. Until then
+info records are dropped without being formatted.
+`configure_logging(mode='queue')` makes the game loop only enqueue records: a
+background writer formats them and writes them in batches, flushing each
+handler once per batch. `structured=True` writes one JSON object per record,
+including the fields passed to `log_event`.
+"""
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+
+LOG_FILE = "game.log"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DEFAULT_BATCH_SIZE = 256
+
+game_logger = logging.getLogger('battleship')
+
+_STOP = object()
+_writer: Optional['BatchWriter'] = None
+_event_queue: Optional[queue.SimpleQueue] = None  # Set in queue mode
+
+
+def log_event(event: str, message: str, *args, level: int = logging.INFO, **fields):
+    """
+    Logs a structured event. `message` is %-formatted with `args` only if a
+    handler actually writes the record, and never when `level` is disabled.
+    In queue mode only a plain tuple is enqueued; the writer builds the record.
+    """
+    if game_logger.isEnabledFor(level):
+        if _event_queue is not None:
+            _event_queue.put((time.time(), level, event, message, args, fields))
+        else:
+            game_logger.log(level, message, *args, extra={'event': event, 'fields': fields})
+
+
+def _make_record(entry) -> logging.LogRecord:
+    created, level, event, message, args, fields = entry
+    record = game_logger.makeRecord(game_logger.name, level, '(unknown file)', 0, message, args, None,
+                                    extra={'event': event, 'fields': fields})
+    record.created = created
+    record.msecs = int((created - int(created)) * 1000)
+    return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, event, message and the event's fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'event': getattr(record, 'event', None),
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.Handler):
+    """Enqueues records as they are, leaving all formatting to the writer thread."""
+
+    def __init__(self, record_queue: queue.SimpleQueue):
+        # Like logging.handlers.QueueHandler, without importing logging.handlers (and socket) at startup
+        super().__init__()
+        self.queue = record_queue
+
+    def emit(self, record: logging.LogRecord):
+        self.queue.put_nowait(record)
+
+
+class BatchWriter:
+    """Background thread that drains the log queue and writes records in batches."""
+
+    def __init__(self, record_queue: queue.SimpleQueue, handlers: List[logging.Handler],
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.queue = record_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Writes every queued record, then stops the thread and closes the handlers."""
+        self.queue.put(_STOP)
+        self.thread.join()
+        for handler in self.handlers:
+            handler.close()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            record = self.queue.get()
+            if record is _STOP:
+                break
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            self._write([_make_record(record) if isinstance(record, tuple) else record for record in batch])
+
+    def _write(self, batch: List[logging.LogRecord]):
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level and handler.filter(record)]
+            if not records:
+                continue
+            if not isinstance(handler, logging.StreamHandler):
+                for record in records:
+                    handler.handle(record)
+                continue
+            text = "".join(handler.format(record) + handler.terminator for record in records)
+            handler.acquire()
+            try:
+                handler.stream.write(text)
+                handler.flush()
+            finally:
+                handler.release()
+
+
+def stop_writer():
+    """Flushes and stops the queue writer, if one is running."""
+    global _writer, _event_queue
+    if _writer is not None:
+        writer, _writer = _writer, None
+        _event_queue = None
+        writer.stop()
+
+
+def configure_logging(mode: str = 'sync', structured: bool = False, filename: Optional[str] = LOG_FILE,
+                      console: bool = True, level: int = logging.INFO,
+                      batch_size: int = DEFAULT_BATCH_SIZE, force: bool = True):
+    """
+    (Re)configures the root logger. `mode` is 'sync' to write from the calling
+    thread or 'queue' to write from a background thread.
+    """
+    if mode not in ('sync', 'queue'):
+        raise ValueError(f"Unknown logging mode '{mode}'. Expected 'sync' or 'queue'.")
+    stop_writer()
+
+    formatter = JsonFormatter() if structured else logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = []
+    if filename:
+        handlers.append(logging.FileHandler(filename))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if mode == 'queue':
+        global _writer, _event_queue
+        record_queue = queue.SimpleQueue()
+        _writer = BatchWriter(record_queue, handlers, batch_size)
+        _writer.start()
+        _event_queue = record_queue
+        handlers = [DeferredQueueHandler(record_queue)]
+
+    logging.basicConfig(level=level, handlers=handlers, force=force)
+
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("game.log"),
-        logging.StreamHandler()
-    ]
-)
\ No newline at end of file
+atexit.register(stop_writer)
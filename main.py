@@ -1,29 +1,88 @@
 import os
 os.environ['TK_SILENCE_DEPRECATION'] = '1'
-from logger import logging
+import argparse
+from functools import partial
+from logger import logging, configure_logging
 from input_validator import ValidateInput
 from game_controller import GameController
+from renderers import DEFAULT_RENDERER, get_renderer
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Battleship game simulator")
+    parser.add_argument('--headless', action='store_true',
+                        help="Play the game without the Turtle window or pacing and print the result")
+    parser.add_argument('--renderer', default=None,
+                        help=f"UI to draw the game with (default: {DEFAULT_RENDERER}, or null with --headless)")
+    parser.add_argument('--frames', metavar='DIR',
+                        help="Draw the game offscreen and write a PNG frame per turn to DIR (see raster_ui.py)")
+    parser.add_argument('--players', type=int, default=2,
+                        help="Number of players; each needs a ship position column and a firing sequence line")
+    parser.add_argument('--log-mode', choices=('sync', 'queue'), default='sync',
+                        help="'queue' writes log records from a background thread in batches")
+    parser.add_argument('--log-json', action='store_true', help="Write log records as JSON lines")
+    parser.add_argument('--ai', type=int, nargs='+', default=[], metavar='N',
+                        help="Players (numbered from 1) whose shots are chosen by the AI instead of their sequence")
+    parser.add_argument('--journal', metavar='FILE',
+                        help="Append the game's events to a binary journal (see game_journal.py)")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="Record timings and shot counters and write them as JSON to FILE")
+    args = parser.parse_args(argv)
+    out_of_range = [number for number in args.ai if not 1 <= number <= args.players]
+    if out_of_range:
+        parser.error(f"--ai takes player numbers from 1 to {args.players}, not {', '.join(map(str, out_of_range))}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(mode=args.log_mode, structured=args.log_json)
     try:
         # Take input
         logging.info("Please enter all lines of your input (Press Ctrl+D to end):")
         input_class = ValidateInput()
 
+        # Initialize players
+        player_names = [f'Player-{i + 1}' for i in range(args.players)]
+        input_class.set_players(player_names)
+
         if input_class.get_valid_input():
-            # Initialize players
-            player_names = ['Player-1', 'Player-2']
-            input_class.set_players(player_names)
-            
             # Configure the game setup
             input_class.configure_game()
             
+            if args.ai:
+                # Optional features are imported only when their flag is set, to keep startup fast
+                from ai_player import ProbabilityTargeting
+                for number in args.ai:
+                    player = input_class.players[number - 1]
+                    player.set_targeting(ProbabilityTargeting.for_player(player, players=input_class.players))
+
             # Print player inputs
             for player in input_class.players:
                 player.print_input()
             
             # Start the game
-            GameController().start_game(input_class.players)
+            journal = None
+            if args.journal:
+                from game_journal import JournalWriter
+                journal = JournalWriter(args.journal)
+            if args.headless:
+                controller = GameController.headless(journal)
+            else:
+                controller = GameController(journal=journal)
+            if args.frames:
+                controller.ui_class = partial(get_renderer('raster'), output_dir=args.frames)
+            elif args.renderer:
+                controller.ui_class = args.renderer
+            metrics = None
+            if args.metrics:
+                from instrumentation import instrument
+                metrics = instrument(controller)
+            result = controller.start_game(input_class.players)
+            if args.headless:
+                logging.info(f"Result: {result}")
+            if metrics:
+                metrics.dump(args.metrics)
+            if journal:
+                journal.close()
     except Exception as e:
         logging.info(f"An error occurred: {e}")
 
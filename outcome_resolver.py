@@ -0,0 +1,177 @@
+"""
+Resolves fixed-sequence games without firing every shot through the controller.
+
+    result = resolve_game(players)       # Same GameResult as simulate_game(players)
+
+A shot can only hit a cell that still has health, so before a player fires at
+a target, the indices of its shots aimed at the target's live cells are
+picked out of its firing sequence in one pass (at C speed, with
+itertools.compress). With those, the next hit of every player is known, and
+every round up to the first one that contains a hit is all misses: one shot
+and one turn per armed player. Such rounds are skipped in one step. Rounds
+that contain a hit are played shot by shot on plain dicts and counters, with
+the rules of `GameController.start_game`: a round iterates the players live
+at its start, a player fires at the next live player after it (an eliminated
+player still takes its turn in that round), a hit keeps the turn and a miss
+ends it, and a Q cell takes two hits.
+
+The work is proportional to the rounds with hits, the hits and the shots at
+ship cells, instead of every shot fired. The players are left untouched.
+"""
+from array import array
+from bisect import bisect_left
+from itertools import compress
+from typing import Dict, List, Sequence, Tuple
+
+from firing_tokens import COLUMN_LIMIT, sequence_codes
+from game_controller import GameResult
+from player import Player
+from player_ring import PlayerRing
+from utils import row_number
+
+NO_HIT = float('inf')
+
+
+class OutcomeResolver:
+    """State of one game being resolved: live cells, ship sizes and the position in every sequence."""
+
+    def __init__(self, players: Sequence[Player]):
+        if any(player.targeting is not None for player in players):
+            raise ValueError("Players that choose their shots during the game cannot be resolved in advance; "
+                             "use simulate_game.")
+        self.players = list(players)
+        rows = players[0].battle_area.rows
+        self.health: List[Dict[int, int]] = []  # Live cells only: cell code -> health
+        self.ship_of: List[Dict[int, int]] = []  # Cell code -> ship number
+        self.ship_sizes: List[List[int]] = []  # Live cells of each ship
+        for player in players:
+            health, ship_of, sizes = {}, {}, []
+            numbers: Dict[int, int] = {}  # id() of a Ship -> its number on this board
+            for x, y, cell_health, ship in player.battle_area.cells():
+                number = numbers.get(id(ship))
+                if number is None:
+                    number = numbers[id(ship)] = len(sizes)
+                    sizes.append(0)
+                code = row_number(x) * COLUMN_LIMIT + y
+                health[code] = cell_health
+                ship_of[code] = number
+                sizes[number] += 1
+            self.health.append(health)
+            self.ship_of.append(ship_of)
+            self.ship_sizes.append(sizes)
+        self.sequences = [sequence_codes(player.firing_sequence, rows) for player in players]
+        self.lengths = [len(sequence) for sequence in self.sequences]
+        self.pointers = [0] * len(players)  # Next shot of each player
+        self.ship_counts = [player.ship_count for player in players]
+        self.ring = PlayerRing(self.players)
+        # (shooter, target) -> (indices of the shooter's shots at the target's live cells, cursor)
+        self.candidates: Dict[Tuple[int, int], List] = {}
+        self.shots = [0] * len(players)
+        self.hits = [0] * len(players)
+        self.sunk = [0] * len(players)
+        self.turns = 0
+
+    def next_hit(self, shooter: int, target: int) -> float:
+        """Index of the next shot of `shooter` that hits `target` as its board is now, or NO_HIT."""
+        key = (shooter, target)
+        entry = self.candidates.get(key)
+        pointer = self.pointers[shooter]
+        health = self.health[target]
+        if entry is None:
+            sequence = self.sequences[shooter]
+            # Boards only lose cells, so shots at cells dead now can never hit this target again
+            indices = array('q', compress(range(pointer, len(sequence)),
+                                          map(health.__contains__, sequence[pointer:])))
+            entry = self.candidates[key] = [indices, 0]
+        indices, cursor = entry
+        sequence = self.sequences[shooter]
+        if cursor < len(indices) and indices[cursor] < pointer:
+            cursor = bisect_left(indices, pointer, cursor)
+        while cursor < len(indices) and sequence[indices[cursor]] not in health:
+            cursor += 1
+        entry[1] = cursor
+        return indices[cursor] if cursor < len(indices) else NO_HIT
+
+    def skip_missed_rounds(self, armed: List[int]) -> bool:
+        """
+        Plays every round before the next one with a hit, all misses, in one step.
+        Returns False when the next round has a hit.
+        """
+        next_live_index = self.ring.next_live_index
+        rounds = min(self.next_hit(player, next_live_index(player)) - self.pointers[player] for player in armed)
+        if not rounds:
+            return False
+        if rounds == NO_HIT:
+            rounds = max(self.lengths[player] - self.pointers[player] for player in armed)
+        for player in armed:
+            fired = min(rounds, self.lengths[player] - self.pointers[player])
+            self.pointers[player] += fired
+            self.shots[player] += fired
+            self.turns += fired
+        return True
+
+    def play_turn(self, player: int):
+        """Fires `player`'s shots until a miss, as GameController.process_player_turn."""
+        self.turns += 1
+        sequence, length = self.sequences[player], self.lengths[player]
+        pointer = self.pointers[player]
+        next_live_index = self.ring.next_live_index
+        while pointer < length:
+            code = sequence[pointer]
+            pointer += 1
+            target = next_live_index(player)
+            if target is None:
+                break  # The shot is spent without being fired
+            self.shots[player] += 1
+            health = self.health[target]
+            cell_health = health.get(code)
+            if cell_health is None:
+                break
+            self.hits[player] += 1
+            if cell_health > 1:
+                health[code] = cell_health - 1
+                continue
+            del health[code]
+            sizes = self.ship_sizes[target]
+            ship = self.ship_of[target][code]
+            sizes[ship] -= 1
+            if not sizes[ship]:
+                self.sunk[player] += 1
+                self.ship_counts[target] -= 1
+                if self.ship_counts[target] <= 0:
+                    self.ring.eliminate(self.players[target])
+        self.pointers[player] = pointer
+
+    def resolve(self, first_turn: int = 0) -> GameResult:
+        ring, index = self.ring, self.ring.index
+        pointers, lengths = self.pointers, self.lengths
+        # Live players before `first_turn` already had their turn this round
+        skip = sum(1 for count in self.ship_counts[:first_turn] if count > 0)
+        while True:
+            live = [index[player] for player in ring.live_players()]
+            armed = [player for player in live if pointers[player] < lengths[player]]
+            if len(live) < 2 or not armed:
+                break
+            if not skip and self.skip_missed_rounds(armed):
+                continue
+            for i, player in enumerate(live):
+                if i >= skip and pointers[player] < lengths[player]:
+                    self.play_turn(player)
+            skip = 0
+
+        names = [player.name for player in self.players]
+        result = GameResult(shots={name: 0 for name in names}, hits={name: 0 for name in names},
+                            ships_sunk={name: 0 for name in names}, turns=self.turns)
+        for name, shots, hits, sunk in zip(names, self.shots, self.hits, self.sunk):
+            result.shots[name] += shots
+            result.hits[name] += hits
+            result.ships_sunk[name] += sunk
+        live = ring.live_players()
+        if len(live) == 1:
+            result.winner = live[0].name
+        return result
+
+
+def resolve_game(players: Sequence[Player], first_turn: int = 0) -> GameResult:
+    """The result `simulate_game(players, first_turn)` would return, computed without changing the players."""
+    return OutcomeResolver(players).resolve(first_turn)
@@ -0,0 +1,89 @@
+from array import array
+from utils import ShipType, Position, InputValidationError, row_label, row_number
+
+
+class PackedBattleArea:
+    """
+    Battle area backed by flat arrays instead of a dict of ShipCell objects.
+
+    Cell (row, col) lives at index `row * stride + col`, where rows count from 0 for 'A'
+    and columns run from 0 to `width` (the same bounds BattleArea accepts).
+    `health` holds the remaining hits of each cell and `ship_ids` the index of the
+    owning ship in `ships`, so a shot is an index computation and a byte decrement.
+    """
+
+    def __init__(self, width, height):
+        self.width: int = width
+        self.height: str = height
+        self.rows = row_number(height.upper())
+        self.stride = width + 1
+        cell_count = self.rows * self.stride
+        self.health = bytearray(cell_count)
+        self.ship_ids = array('i', [-1]) * cell_count
+        self.ships = []
+        # Row label -> index of the row's first cell, so a shot needs no label parsing
+        self.row_offsets = {row_label(row + 1): row * self.stride for row in range(self.rows)}
+
+    def _is_out_of_bounds(self, row: int, y: int) -> bool:
+        return not 0 <= row < self.rows or (y > self.width)
+
+    def _raise_placement_error(self, width, height, row, col, start_x):
+        """Reports the first offending cell in the same order BattleArea checks them."""
+        for i in range(height):
+            new_x = row_label(row + i + 1) if row >= 0 else start_x
+            for j in range(width):
+                new_y = col + j
+                if self._is_out_of_bounds(row + i, new_y):
+                    raise InputValidationError(f"Ship placement out of bounds at {new_x}{new_y}.")
+                if self.health[(row + i) * self.stride + new_y]:
+                    raise InputValidationError(f"Ship overlap detected at {new_x}{new_y}.")
+
+    def place_ship(self, width, height, position, ship):
+        """Places the ship in the grid with specified width, height, and position."""
+        ship_cell_health = ShipType.Q.value if ship.ship_type == 'Q' else ShipType.P.value
+        start_x = position.x.upper()
+        row = row_number(start_x) - 1
+        col = int(position.y)
+        stride = self.stride
+
+        if row < 0 or row + height > self.rows or col + width > stride:
+            self._raise_placement_error(width, height, row, col, start_x)
+        for i in range(height):
+            start = (row + i) * stride + col
+            if any(self.health[start:start + width]):
+                self._raise_placement_error(width, height, row, col, start_x)
+
+        ship_id = len(self.ships)
+        cell_health = bytes([ship_cell_health]) * width
+        cell_ids = array('i', [ship_id]) * width
+        for i in range(height):
+            start = (row + i) * stride + col
+            self.health[start:start + width] = cell_health
+            self.ship_ids[start:start + width] = cell_ids
+
+        self.ships.append(ship)
+
+    def fire_at(self, position: Position):
+        """Records a missile at `position` and returns the ship it hit, if any."""
+        offset = self.row_offsets.get(position.x)
+        col = position.y
+        if offset is None or col < 0 or col > self.width:
+            return None
+
+        index = offset + col
+        health = self.health[index]
+        if not health:
+            return None
+        self.health[index] = health - 1
+        ship = self.ships[self.ship_ids[index]]
+        if health == 1:
+            ship.size -= 1
+        return ship
+
+    def cells(self):
+        """Yields (row, column, health, ship) for every cell that can still be hit."""
+        stride = self.stride
+        for index, health in enumerate(self.health):
+            if health:
+                row, col = divmod(index, stride)
+                yield row_label(row + 1), col, health, self.ships[self.ship_ids[index]]
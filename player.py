@@ -1,6 +1,7 @@
 from battle_area import BattleArea
 from ship import Ship
 from collections import deque
+from firing_tokens import PackedFiringSequence
 from logger import logging
 
 class Player:
@@ -9,9 +10,10 @@ class Player:
         self.battle_area = None
         self.ship_count = 0
         self.firing_sequence = []
+        self.targeting = None  # Told the outcome of every shot when set, e.g. an AI
 
-    def set_battle_area(self, width, height):
-        self.battle_area = BattleArea(int(width), height)
+    def set_battle_area(self, width, height, area_class=BattleArea):
+        self.battle_area = area_class(int(width), height)
 
     def set_ship_count(self, ship_count):
         self.ship_count = ship_count
@@ -21,7 +23,13 @@ class Player:
         self.battle_area.place_ship(width, height, position, ship)
 
     def set_firing_sequence(self, sequence):
-        self.firing_sequence = deque(sequence)
+        # A packed sequence is already deque-like and much smaller than a deque of Positions
+        self.firing_sequence = sequence if isinstance(sequence, PackedFiringSequence) else deque(sequence)
+
+    def set_targeting(self, targeting):
+        """Fires the shots `targeting` chooses (it must support popleft and len) instead of a fixed sequence."""
+        self.firing_sequence = targeting
+        self.targeting = targeting
 
     def check_all_ships_destroyed(self):
         return self.ship_count == 0
@@ -0,0 +1,68 @@
+from typing import Dict, List, Optional
+from player import Player
+
+
+class PlayerRing:
+    """
+    Circular turn order of the players that still have ships, as a doubly linked
+    ring over player indices. Eliminating a player unlinks it in O(1) and leaves
+    its own `next` pointer in place, so the next live player after an eliminated
+    one is still found by following pointers (with path compression).
+    """
+
+    def __init__(self, players: List[Player]):
+        count = len(players)
+        self.players = players
+        self.index: Dict[Player, int] = {player: i for i, player in enumerate(players)}
+        self._next = [(i + 1) % count for i in range(count)]
+        self._prev = [(i - 1) % count for i in range(count)]
+        self._live = [True] * count
+        self.live_count = count
+        self._head = 0  # Lowest index of a live player
+        for i, player in enumerate(players):
+            if player.ship_count <= 0:
+                self._unlink(i)
+
+    def _unlink(self, i: int):
+        if not self._live[i]:
+            return
+        self._live[i] = False
+        self.live_count -= 1
+        following, preceding = self._next[i], self._prev[i]
+        self._next[preceding] = following
+        self._prev[following] = preceding
+        if i == self._head:
+            self._head = following
+
+    def eliminate(self, player: Player):
+        """Removes a player that has no ships left from the turn order."""
+        self._unlink(self.index[player])
+
+    def is_live(self, player: Player) -> bool:
+        return self._live[self.index[player]]
+
+    def next_live_index(self, i: int) -> Optional[int]:
+        """Index of the first live player after player `i` (which may be eliminated), excluding `i`."""
+        if not self.live_count:
+            return None
+        following = self._next[i]
+        if not self._live[following]:
+            while not self._live[following]:
+                following = self._next[following]
+            self._next[i] = following
+        return None if following == i else following
+
+    def next_live_player(self, player: Player) -> Optional[Player]:
+        following = self.next_live_index(self.index[player])
+        return None if following is None else self.players[following]
+
+    def live_players(self) -> List[Player]:
+        """Live players in their original order."""
+        if not self.live_count:
+            return []
+        live = []
+        i = self._head
+        for _ in range(self.live_count):
+            live.append(self.players[i])
+            i = self._next[i]
+        return live
@@ -0,0 +1,319 @@
+"""
+Offscreen renderer that draws into an in-memory RGB buffer, for exporting
+game frames without a display.
+
+    python raster_ui.py games.journal --output frames/ --sheet sheet.png
+
+RasterUI has the same interface as BattleshipUI. The grids are drawn once into
+a base image; ships and markers are filled row by row with slice assignments,
+so a shot costs a few dozen byte copies. Frames are captured at the start of
+every turn (or after every shot) and written as PPM or PNG files, kept for a
+contact sheet, or both. PNG files are encoded with zlib only.
+"""
+import argparse
+import os
+import struct
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from game_journal import HIT, MISS, NO_PLAYER, PLACE, RESULT, SHIP_TYPES, TURN, JournalReader
+from ship import Ship
+from utils import Position, row_label, row_number
+
+CELL_SIZE = 8
+PNG_LEVEL = 1  # zlib level for frames: mostly flat colors compress well even at level 1
+
+COLORS: Dict[str, Tuple[int, int, int]] = {
+    'background': (255, 255, 255),
+    'grid': (0, 0, 0),
+    'P': (0, 0, 255),
+    'Q': (0, 128, 0),
+    'hit': (255, 0, 0),
+    'miss': (128, 128, 128),
+    'text': (0, 0, 0),
+    'win': (0, 128, 0),
+    'draw': (255, 165, 0),
+    'turn': (0, 0, 255),
+}
+
+
+def encode_ppm(rgb: bytes, width: int, height: int) -> bytes:
+    return b'P6\n%d %d\n255\n' % (width, height) + bytes(rgb)
+
+
+def encode_png(rgb: bytes, width: int, height: int, text: Optional[str] = None, level: int = PNG_LEVEL) -> bytes:
+    """Encodes an RGB buffer as a PNG with no row filters, optionally with a Comment text chunk."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    stride = width * 3
+    view = memoryview(rgb)
+    rows = b''.join(b'\0' + view[offset:offset + stride] for offset in range(0, stride * height, stride))
+    png = b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    if text:
+        png += chunk(b'tEXt', b'Comment\0' + text.encode('latin-1', 'replace'))
+    return png + chunk(b'IDAT', zlib.compress(rows, level)) + chunk(b'IEND', b'')
+
+
+def contact_sheet(frames: Sequence[bytes], width: int, height: int, columns: Optional[int] = None,
+                  step: int = 1, gap: int = 2) -> Tuple[bytearray, int, int]:
+    """
+    Tiles equally sized RGB frames into one image, keeping every `step`-th pixel of
+    each frame. Returns (rgb, sheet width, sheet height).
+    """
+    columns = columns or max(1, int(len(frames) ** 0.5 + 0.999))
+    rows = -(-len(frames) // columns)
+    tile_width, tile_height = -(-width // step), -(-height // step)
+    sheet_width = columns * (tile_width + gap) + gap
+    sheet_height = rows * (tile_height + gap) + gap
+    sheet = bytearray(b'\xff' * (sheet_width * sheet_height * 3))
+    stride, tile_stride = width * 3, tile_width * 3
+    for index, frame in enumerate(frames):
+        row, column = divmod(index, columns)
+        x = (gap + column * (tile_width + gap)) * 3
+        y = gap + row * (tile_height + gap)
+        for tile_row, source_row in enumerate(range(0, height, step)):
+            line = frame[source_row * stride:(source_row + 1) * stride]
+            if step > 1:
+                sampled = bytearray(tile_stride)
+                for channel in range(3):
+                    sampled[channel::3] = line[channel::3 * step]
+                line = sampled
+            start = (y + tile_row) * sheet_width * 3 + x
+            sheet[start:start + tile_stride] = line
+    return sheet, sheet_width, sheet_height
+
+
+class RasterUI:
+    """
+    BattleshipUI-compatible renderer drawing into `pixels`, an RGB bytearray of
+    `image_width` x `image_height`. `capture` is 'turn' to take a frame at the
+    start of every turn and at the end of the game, 'shot' to take one after
+    every shot as well, or None to only take frames through `capture_frame`.
+    """
+
+    def __init__(self, players: List[str], grid_size: tuple, cell_size: int = CELL_SIZE,
+                 capture: Optional[str] = 'turn', output_dir: Optional[str] = None, frame_format: str = 'png',
+                 keep_frames: bool = False, prefix: str = 'frame'):
+        if capture not in ('turn', 'shot', None):
+            raise ValueError(f"Unknown capture mode '{capture}'. Expected 'turn', 'shot' or None.")
+        if frame_format not in ('png', 'ppm'):
+            raise ValueError(f"Unknown frame format '{frame_format}'. Expected 'png' or 'ppm'.")
+        self.players = players
+        self.width, self.height = grid_size
+        self.cell_size = cell_size
+        self.capture = capture
+        self.output_dir = output_dir
+        self.frame_format = frame_format
+        self.keep_frames = keep_frames
+        self.prefix = prefix
+        self.frames: List[bytes] = []  # Kept frames, when keep_frames is set
+        self.frame_count = 0
+        self.message: Optional[str] = None
+        self._capture_pending = False
+        self.colors = {name: bytes(color) for name, color in COLORS.items()}
+
+        # Status bar, then one grid per player side by side, with a margin of one cell
+        self.margin = cell_size
+        self.grid_width = self.width * cell_size + 1
+        self.grid_height = self.height * cell_size + 1
+        self.top = cell_size + self.margin
+        self.image_width = self.margin + len(players) * (self.grid_width + self.margin)
+        self.image_height = self.top + self.grid_height + self.margin
+        self.stride = self.image_width * 3
+        self.grid_origins = [self.margin + i * (self.grid_width + self.margin) for i in range(len(players))]
+
+        self.base = self._draw_grids()
+        self.pixels = bytearray(self.base)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def _draw_grids(self) -> bytes:
+        """The background with every grid, drawn once with whole-row copies."""
+        background, grid = self.colors['background'], self.colors['grid']
+        cell_size = self.cell_size
+        line_row = bytearray(background * self.image_width)
+        cell_row = bytearray(line_row)
+        for x in self.grid_origins:
+            line_row[x * 3:(x + self.grid_width) * 3] = grid * self.grid_width
+            for column in range(self.width + 1):
+                offset = (x + column * cell_size) * 3
+                cell_row[offset:offset + 3] = grid
+        image = bytearray(background * (self.image_width * self.image_height))
+        for y in range(self.grid_height):
+            start = (self.top + y) * self.stride
+            image[start:start + self.stride] = line_row if y % cell_size == 0 else cell_row
+        return bytes(image)
+
+    def _cell_box(self, player_index: int, row: int, column: int, rows: int = 1,
+                  columns: int = 1) -> Optional[Tuple[int, int, int, int]]:
+        """Pixel box (x, y, width, height) inside the grid lines of a block of cells, clipped to the grid."""
+        first_row, first_column = max(row, 1), max(column, 1)
+        last_row, last_column = min(row + rows - 1, self.height), min(column + columns - 1, self.width)
+        if first_row > last_row or first_column > last_column:
+            return None
+        cell_size = self.cell_size
+        x = self.grid_origins[player_index] + (first_column - 1) * cell_size + 1
+        y = self.top + (first_row - 1) * cell_size + 1
+        return x, y, (last_column - first_column + 1) * cell_size - 1, (last_row - first_row + 1) * cell_size - 1
+
+    def _fill(self, x: int, y: int, width: int, height: int, color: bytes):
+        span = color * width
+        stride, pixels = self.stride, self.pixels
+        start = y * stride + x * 3
+        for offset in range(start, start + height * stride, stride):
+            pixels[offset:offset + len(span)] = span
+
+    def draw_ship(self, player_index: int, ship: Ship):
+        row = row_number(ship.position.x.upper())
+        box = self._cell_box(player_index, row, ship.position.y, ship.height, ship.width) if row else None
+        if box:
+            self._fill(*box, self.colors.get(ship.ship_type, self.colors['P']))
+
+    def _mark(self, player_index: int, position: Position, color: bytes, inset: int):
+        row = row_number(position.x)
+        box = self._cell_box(player_index, row, position.y) if row else None
+        if box:
+            x, y, width, height = box
+            self._fill(x + inset, y + inset, width - 2 * inset, height - 2 * inset, color)
+
+    def mark_hit(self, player_index: int, position: Position):
+        """Fills the cell red, leaving a border of the ship's color."""
+        self._mark(player_index, position, self.colors['hit'], self.cell_size // 5)
+        if self.capture == 'shot':
+            self._capture_pending = True
+
+    def mark_miss(self, player_index: int, position: Position):
+        """A gray square in the middle of the cell."""
+        self._mark(player_index, position, self.colors['miss'], self.cell_size * 3 // 8)
+        if self.capture == 'shot':
+            self._capture_pending = True
+
+    def clear_marks(self):
+        self.pixels[:] = self.base
+
+    def display_message(self, message: str, message_type: str = 'text'):
+        """Shows the message type as the color of the status bar; the text goes into PNG metadata."""
+        self.message = message
+        self._fill(0, 0, self.image_width, self.cell_size, self.colors.get(message_type, self.colors['text']))
+
+    def announce_winner(self, player_name: str):
+        self.display_message(f"{player_name} Wins!", 'win')
+        self._capture_pending = self.capture is not None
+
+    def announce_draw(self):
+        self.display_message("Game Ends in a Draw!", 'draw')
+        self._capture_pending = self.capture is not None
+
+    def announce_turn(self, player_name: str):
+        self.display_message(f"{player_name} Turn", 'turn')
+        self._capture_pending = self.capture is not None
+
+    def flush(self, force: bool = False):
+        """Takes the frame requested by the last draw calls, if any."""
+        if self._capture_pending:
+            self._capture_pending = False
+            self.capture_frame()
+
+    def capture_frame(self) -> bytes:
+        """Copies the current image, writing it to `output_dir` and keeping it when configured to."""
+        frame = bytes(self.pixels)
+        if self.output_dir:
+            path = os.path.join(self.output_dir, f"{self.prefix}{self.frame_count:06d}.{self.frame_format}")
+            self.save(path, frame)
+        if self.keep_frames:
+            self.frames.append(frame)
+        self.frame_count += 1
+        return frame
+
+    def encode(self, frame: Optional[bytes] = None, frame_format: Optional[str] = None) -> bytes:
+        frame = self.pixels if frame is None else frame
+        if (frame_format or self.frame_format) == 'ppm':
+            return encode_ppm(frame, self.image_width, self.image_height)
+        return encode_png(frame, self.image_width, self.image_height, self.message)
+
+    def save(self, path: str, frame: Optional[bytes] = None):
+        """Writes the current image, or `frame`, as PPM or PNG depending on the extension of `path`."""
+        with open(path, 'wb') as image_file:
+            image_file.write(self.encode(frame, 'ppm' if path.endswith('.ppm') else 'png'))
+
+    def save_contact_sheet(self, path: str, columns: Optional[int] = None, step: int = 1):
+        """Writes every kept frame tiled into one PNG (or PPM) image."""
+        sheet, width, height = contact_sheet(self.frames, self.image_width, self.image_height, columns, step)
+        with open(path, 'wb') as image_file:
+            image_file.write(encode_ppm(sheet, width, height) if path.endswith('.ppm')
+                             else encode_png(sheet, width, height, level=6))
+
+    def wait_for_close(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def render_journal(path: str, output_dir: Optional[str] = None, games: Optional[Sequence[int]] = None,
+                   capture: str = 'turn', cell_size: int = CELL_SIZE, frame_format: str = 'png',
+                   sheet: Optional[str] = None, sheet_step: int = 1) -> int:
+    """
+    Renders every turn of the games in a journal (all games, or the numbers in
+    `games`) straight from its events and returns the number of frames taken.
+    Frames of game N are named gameN_frameXXXXXX; a contact sheet needs one game.
+    """
+    frame_count = 0
+    with JournalReader(path) as reader:
+        for number, game in enumerate(reader.games()):
+            if games is not None and number not in games:
+                continue
+            ui = RasterUI(game.players, (game.width, game.rows), cell_size, capture, output_dir, frame_format,
+                          keep_frames=sheet is not None, prefix=f"game{number}_frame")
+            labels: Dict[int, str] = {}
+            for kind, ship_type, player, target, height, row, col, width, value in reader.records(game.start,
+                                                                                                  game.end):
+                if kind == HIT or kind == MISS:
+                    label = labels.get(row)
+                    if label is None:
+                        label = labels[row] = row_label(row)
+                    mark = ui.mark_hit if kind == HIT else ui.mark_miss
+                    mark(target, Position(label, col))
+                elif kind == TURN:
+                    ui.announce_turn(game.players[player])
+                elif kind == PLACE:
+                    ui.draw_ship(player, Ship(SHIP_TYPES.get(ship_type) or 'P', width, height,
+                                              Position(row_label(row), col)))
+                elif kind == RESULT:
+                    if player == NO_PLAYER or player >= len(game.players):
+                        ui.announce_draw()
+                    else:
+                        ui.announce_winner(game.players[player])
+                ui.flush()
+            frame_count += ui.frame_count
+            if sheet is not None:
+                ui.save_contact_sheet(sheet, step=sheet_step)
+    return frame_count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render journaled games to image files without a display")
+    parser.add_argument('journal', help="Journal file written with --journal")
+    parser.add_argument('--output', metavar='DIR', help="Directory for one image per frame")
+    parser.add_argument('--game', type=int, nargs='+', help="Game numbers to render, from 0 (default: all)")
+    parser.add_argument('--capture', choices=('turn', 'shot'), default='turn',
+                        help="Take a frame at the start of every turn, or after every shot")
+    parser.add_argument('--format', choices=('png', 'ppm'), default='png', help="Frame file format")
+    parser.add_argument('--cell-size', type=int, default=CELL_SIZE, help="Pixels per cell")
+    parser.add_argument('--sheet', metavar='FILE', help="Write the frames of one game as a contact sheet")
+    parser.add_argument('--sheet-step', type=int, default=1, help="Keep every N-th pixel in the contact sheet")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.sheet and (not args.game or len(args.game) != 1):
+        raise SystemExit("--sheet needs exactly one --game")
+    frames = render_journal(args.journal, args.output, args.game, args.capture, args.cell_size, args.format,
+                            args.sheet, args.sheet_step)
+    print(f"{frames} frames")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Registry of game renderers, imported only when selected.
+
+    ui_class = get_renderer('turtle')
+
+Renderers are registered by name as a class or as a 'module:attribute' path,
+so listing or choosing a renderer never imports turtle/tkinter unless the
+Turtle renderer is actually used.
+"""
+from importlib import import_module
+from typing import Dict, List, Union
+
+DEFAULT_RENDERER = 'turtle'
+
+_renderers: Dict[str, Union[str, type]] = {
+    'turtle': 'battleship_ui:BattleshipUI',
+    'null': 'headless_ui:NullUI',
+    'recording': 'headless_ui:RecordingUI',
+    'raster': 'raster_ui:RasterUI',
+}
+
+
+def register_renderer(name: str, renderer: Union[str, type]):
+    """Registers a UI class, or the 'module:attribute' path of one, under `name`."""
+    _renderers[name] = renderer
+
+
+def renderer_names() -> List[str]:
+    return sorted(_renderers)
+
+
+def get_renderer(name: str) -> type:
+    """The UI class registered under `name`, importing its module on first use."""
+    try:
+        renderer = _renderers[name]
+    except KeyError:
+        raise ValueError(f"Unknown renderer '{name}'. Expected one of: {', '.join(renderer_names())}.") from None
+    if isinstance(renderer, str):
+        module_name, _, attribute = renderer.partition(':')
+        renderer = _renderers[name] = getattr(import_module(module_name), attribute)
+    return renderer
+
+
+def resolve_renderer(renderer: Union[str, type]) -> type:
+    """Accepts either a registered name or a UI class."""
+    return get_renderer(renderer) if isinstance(renderer, str) else renderer
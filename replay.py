@@ -0,0 +1,271 @@
+"""
+Replays journaled games with fast seeking and optional playback on a UI.
+
+    python replay.py games.journal --game 0 --turn 500 --speed 20
+
+Board state is rebuilt on Players with PackedBattleArea, whose whole state is a
+bytearray of cell health plus ship sizes and ship counts. Checkpoints of that
+state (and of the marks drawn so far) are stored as the game is replayed, so
+seeking restores the nearest earlier checkpoint and applies the events after it.
+A checkpoint is taken after `checkpoint_interval` events, or after as many
+events as it holds cells and marks if that is more: checkpoints of a big board
+are spaced out so that together they never hold more entries than the game has
+events, and seeking replays no more events than restoring a checkpoint copies.
+"""
+import argparse
+import time
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from game_journal import HIT, MISS, PLACE, RESULT, SHIP_TYPES, SINK, TURN, JournalEvent, JournalReader
+from packed_battle_area import PackedBattleArea
+from player import Player
+from renderers import DEFAULT_RENDERER, resolve_renderer
+from utils import Position, row_label
+
+DEFAULT_CHECKPOINT_INTERVAL = 1024
+
+
+class Checkpoint(NamedTuple):
+    """Replay state after the first `position` events."""
+    position: int
+    turn: int
+    current_player: Optional[int]
+    health: List[bytes]
+    ship_sizes: List[Tuple[int, ...]]
+    ship_counts: List[int]
+    marks: Dict[Tuple[int, int, int], int]
+
+
+class Replay:
+    """
+    Game state at any point of a recorded game. `position` is the number of
+    events (after ship placement) applied so far; `seek` moves it either way.
+    """
+
+    def __init__(self, width: int, rows: int, player_names: Sequence[str], events: Sequence[JournalEvent],
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        self.width = width
+        self.rows = rows
+        self.players = [Player(name) for name in player_names]
+        for player in self.players:
+            player.set_battle_area(width, row_label(rows), PackedBattleArea)
+
+        for event in events:
+            if event.kind == PLACE:
+                position = Position(row_label(event.row), event.col)
+                player = self.players[event.player]
+                player.place_ships(event.width, event.height, position, SHIP_TYPES.get(event.ship_type) or 'P')
+                player.ship_count += 1
+        self.events = [event for event in events if event.kind != PLACE]
+        self.checkpoint_interval = checkpoint_interval
+
+        self.position = 0
+        self.turn = 0
+        self.current_player: Optional[int] = None
+        # (target player, row, col) -> HIT or MISS, the latest mark drawn on each cell
+        self.marks: Dict[Tuple[int, int, int], int] = {}
+        # Event index at which each turn starts; turn_starts[t - 1] is turn t
+        self.turn_starts = [index for index, event in enumerate(self.events) if event.kind == TURN]
+
+        self.checkpoints = [self._checkpoint()]
+        due = self._next_checkpoint()
+        while self.position < len(self.events):
+            self.step()
+            if self.position >= due:
+                self.checkpoints.append(self._checkpoint())
+                due = self._next_checkpoint()
+        self.checkpoint_positions = [checkpoint.position for checkpoint in self.checkpoints]
+        self._restore(self.checkpoints[0])
+
+    @classmethod
+    def from_journal(cls, path: str, game_number: int = 0,
+                     checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL) -> 'Replay':
+        """Loads game `game_number` (counting from 0) of a journal file."""
+        with JournalReader(path) as reader:
+            for number, game in enumerate(reader.games()):
+                if number == game_number:
+                    events = list(reader.events(game))
+                    return cls(game.width, game.rows, game.players, events, checkpoint_interval)
+        raise IndexError(f"Journal {path} has no game {game_number}.")
+
+    @property
+    def turns(self) -> int:
+        return len(self.turn_starts)
+
+    def _next_checkpoint(self) -> int:
+        """Position of the next checkpoint: one interval on, or as many events on as the state has entries."""
+        size = len(self.marks) + sum(len(player.battle_area.health) + len(player.battle_area.ships)
+                                     for player in self.players)
+        return self.position + max(self.checkpoint_interval, size)
+
+    def _checkpoint(self) -> Checkpoint:
+        return Checkpoint(
+            self.position, self.turn, self.current_player,
+            [bytes(player.battle_area.health) for player in self.players],
+            [tuple(ship.size for ship in player.battle_area.ships) for player in self.players],
+            [player.ship_count for player in self.players],
+            dict(self.marks),
+        )
+
+    def _restore(self, checkpoint: Checkpoint):
+        self.position = checkpoint.position
+        self.turn = checkpoint.turn
+        self.current_player = checkpoint.current_player
+        for player, health, sizes, ship_count in zip(self.players, checkpoint.health,
+                                                      checkpoint.ship_sizes, checkpoint.ship_counts):
+            player.battle_area.health[:] = health
+            for ship, size in zip(player.battle_area.ships, sizes):
+                ship.size = size
+            player.ship_count = ship_count
+        self.marks = dict(checkpoint.marks)
+
+    def step(self) -> Optional[JournalEvent]:
+        """Applies the next event and returns it, or returns None at the end of the game."""
+        if self.position >= len(self.events):
+            return None
+        event = self.events[self.position]
+        self.position += 1
+        if event.kind == TURN:
+            self.turn = event.value
+            self.current_player = event.player
+        elif event.kind == HIT:
+            target = self.players[event.target]
+            target.battle_area.fire_at(Position(row_label(event.row), event.col))
+            self.marks[(event.target, event.row, event.col)] = HIT
+        elif event.kind == MISS:
+            self.marks[(event.target, event.row, event.col)] = MISS
+        elif event.kind == SINK:
+            self.players[event.target].ship_count -= 1
+        return event
+
+    def seek(self, position: int):
+        """Moves to the state after `position` events, replaying at most the events after one checkpoint."""
+        position = max(0, min(position, len(self.events)))
+        checkpoint = self.checkpoints[bisect_right(self.checkpoint_positions, position) - 1]
+        if position < self.position or checkpoint.position > self.position:
+            self._restore(checkpoint)
+        while self.position < position:
+            self.step()
+
+    def seek_turn(self, turn: int):
+        """Moves to the start of `turn` (1-based), before any of its shots."""
+        if turn <= 0:
+            self.seek(0)
+        elif turn > len(self.turn_starts):
+            self.seek(len(self.events))
+        else:
+            self.seek(self.turn_starts[turn - 1] + 1)
+
+    def step_back(self):
+        self.seek(self.position - 1)
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.events)
+
+    @property
+    def winner(self) -> Optional[str]:
+        """Name of the winner once the result has been replayed."""
+        if self.position and self.events[self.position - 1].kind == RESULT:
+            winner = self.events[self.position - 1].player
+            return self.players[winner].name if winner < len(self.players) else None
+        return None
+
+
+class ReplayViewer:
+    """Plays a Replay on a UI (the Turtle renderer by default), forward or backward at any speed."""
+
+    def __init__(self, replay: Replay, ui_class=DEFAULT_RENDERER):
+        self.replay = replay
+        self.ui = resolve_renderer(ui_class)([player.name for player in replay.players], (replay.width, replay.rows))
+        self.redraw()
+
+    def redraw(self):
+        """Draws the current state from scratch, e.g. after seeking or stepping back."""
+        self.ui.clear_marks()
+        for index, player in enumerate(self.replay.players):
+            for ship in player.battle_area.ships:
+                self.ui.draw_ship(index, ship)
+        for (target, row, col), kind in self.replay.marks.items():
+            mark = self.ui.mark_hit if kind == HIT else self.ui.mark_miss
+            mark(target, Position(row_label(row), col))
+        self._announce()
+        self.ui.flush(force=True)
+
+    def _announce(self):
+        replay = self.replay
+        if replay.finished:
+            if replay.winner:
+                self.ui.announce_winner(replay.winner)
+            else:
+                self.ui.announce_draw()
+        elif replay.current_player is not None:
+            self.ui.announce_turn(replay.players[replay.current_player].name)
+
+    def forward(self) -> Optional[JournalEvent]:
+        """Steps one event forward, drawing only what it changed."""
+        event = self.replay.step()
+        if event is None:
+            return None
+        if event.kind in (HIT, MISS):
+            mark = self.ui.mark_hit if event.kind == HIT else self.ui.mark_miss
+            mark(event.target, Position(row_label(event.row), event.col))
+        if event.kind in (TURN, RESULT):
+            self._announce()
+        self.ui.flush()
+        return event
+
+    def backward(self):
+        self.replay.step_back()
+        self.redraw()
+
+    def seek_turn(self, turn: int):
+        self.replay.seek_turn(turn)
+        self.redraw()
+
+    def play(self, speed: float = 10.0, steps: Optional[int] = None):
+        """
+        Plays `speed` events per second; a negative speed plays backward.
+        Stops after `steps` events or at either end of the game.
+        """
+        delay = 1.0 / abs(speed) if speed else 0.0
+        played = 0
+        while steps is None or played < steps:
+            if speed >= 0:
+                if self.forward() is None:
+                    break
+            else:
+                if self.replay.position == 0:
+                    break
+                self.backward()
+            played += 1
+            if delay:
+                time.sleep(delay)
+        self.ui.flush(force=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a game from a journal")
+    parser.add_argument('journal', help="Journal file written with --journal")
+    parser.add_argument('--game', type=int, default=0, help="Game number in the journal, from 0")
+    parser.add_argument('--turn', type=int, default=0, help="Turn to start from")
+    parser.add_argument('--speed', type=float, default=5.0,
+                        help="Events per second; negative plays backward from --turn")
+    parser.add_argument('--renderer', default=DEFAULT_RENDERER, help="Renderer to play the game on")
+    parser.add_argument('--checkpoint-interval', type=int, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help="Events between state checkpoints")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    replay = Replay.from_journal(args.journal, args.game, args.checkpoint_interval)
+    viewer = ReplayViewer(replay, args.renderer)
+    viewer.seek_turn(args.turn)
+    viewer.play(args.speed)
+    viewer.ui.wait_for_close()
+
+
+if __name__ == '__main__':
+    main()
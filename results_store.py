@@ -0,0 +1,326 @@
+"""
+Append-only columnar store for the outcomes of many games.
+
+    store = ResultsStore('results/')
+    store.play(players)                  # Or store.add(outcome) for games played elsewhere
+    store.flush()
+    store.win_rate_by_fleet()
+    store.heatmap(10, 10)
+
+Every game is one row across typed columns (config hash, board size, fleet,
+player count, winner, shots, hits, turns). Rows are buffered in memory and
+appended in chunks of `chunk_size` to one raw array file per column, so a
+million games take about 40 MB on disk and in memory.
+
+Aggregates (games, draws and wins per fleet composition, and per-cell hit
+counts per board size) and the index from config hash to rows are updated as
+each game is added, so these queries never rescan the columns. Aggregates are
+saved with every flush; reopening a store reads them back and rebuilds only the
+hash and fleet indexes from their two columns. Heatmap files are named after the
+row count they cover and aggregates.json is replaced last, so a crash during a
+flush leaves the previous aggregates and heatmaps in place, matching each other.
+"""
+import hashlib
+import json
+import os
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from game_controller import GameController, GameResult
+from player import Player
+from utils import row_number
+
+DEFAULT_CHUNK_SIZE = 65536
+NO_WINNER = -1
+
+# Column name -> array typecode
+COLUMNS = {
+    'config_hash': 'q',
+    'width': 'I',
+    'rows': 'I',
+    'fleet': 'I',  # Index into ResultsStore.fleets
+    'players': 'H',
+    'winner': 'h',  # Player index, or NO_WINNER for a draw
+    'shots': 'I',
+    'hits': 'I',
+    'turns': 'I',
+}
+
+
+@dataclass
+class GameOutcome:
+    """One game to store. `hit_cells` lists (row, column) of every hit, for the heatmap."""
+    config_hash: int
+    width: int
+    rows: int
+    fleet: str
+    players: int
+    winner: int
+    shots: int
+    hits: int
+    turns: int
+    hit_cells: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def fleet_key(players: Sequence[Player]) -> str:
+    """Composition of the first player's fleet, e.g. 'P2x1*2,Q1x1': type, width x height, count."""
+    counts = Counter((ship.ship_type, ship.width, ship.height) for ship in players[0].battle_area.ships)
+    return ','.join(f"{ship_type}{width}x{height}" + (f"*{count}" if count > 1 else '')
+                    for (ship_type, width, height), count in sorted(counts.items()))
+
+
+def config_hash(players: Sequence[Player]) -> int:
+    """Signed 64-bit hash of a game's board, ship placements and firing sequences, taken before it is played."""
+    digest = hashlib.sha256()
+    battle_area = players[0].battle_area
+    digest.update(f"{battle_area.width} {battle_area.rows}\n".encode())
+    for player in players:
+        for ship in player.battle_area.ships:
+            digest.update(f"{ship.ship_type} {ship.width} {ship.height} {ship.position}\n".encode())
+        # Shots chosen during the game (e.g. by an AI) are not part of the configuration
+        shots = () if player.targeting is not None else player.firing_sequence
+        digest.update(' '.join(map(str, shots)).encode() + b'\n')
+    return int.from_bytes(digest.digest()[:8], 'little', signed=True)
+
+
+def track_hits(controller: GameController) -> List[Tuple[int, int]]:
+    """Records (row, column) of every hit `controller` makes into the returned list, on this instance only."""
+    hit_cells: List[Tuple[int, int]] = []
+    fire_missile = controller.fire_missile
+
+    @wraps(fire_missile)
+    def tracked_fire_missile(current_player, target, next_player):
+        hit = fire_missile(current_player, target, next_player)
+        if hit:
+            hit_cells.append((row_number(target.x), target.y))
+        return hit
+
+    controller.fire_missile = tracked_fire_missile
+    return hit_cells
+
+
+def make_outcome(key: int, fleet: str, players: Sequence[Player], result: GameResult,
+                 hit_cells: List[Tuple[int, int]]) -> GameOutcome:
+    names = [player.name for player in players]
+    battle_area = players[0].battle_area
+    return GameOutcome(key, battle_area.width, battle_area.rows, fleet, len(players),
+                       NO_WINNER if result.winner is None else names.index(result.winner),
+                       sum(result.shots.values()), sum(result.hits.values()), result.turns, hit_cells)
+
+
+def play_and_describe(players: Sequence[Player]) -> GameOutcome:
+    """Plays a configured game headlessly and returns its outcome with the hit cells."""
+    key, fleet = config_hash(players), fleet_key(players)
+    controller = GameController.headless()
+    hit_cells = track_hits(controller)
+    result = controller.start_game(list(players))
+    return make_outcome(key, fleet, players, result, hit_cells)
+
+
+class FleetStats:
+    """Incremental totals of the games played with one fleet composition."""
+    __slots__ = ('games', 'draws', 'wins')
+
+    def __init__(self, games: int = 0, draws: int = 0, wins: Optional[List[int]] = None):
+        self.games = games
+        self.draws = draws
+        self.wins = wins or []  # By player index
+
+    def add(self, winner: int):
+        self.games += 1
+        if winner == NO_WINNER:
+            self.draws += 1
+            return
+        if winner >= len(self.wins):
+            self.wins.extend([0] * (winner + 1 - len(self.wins)))
+        self.wins[winner] += 1
+
+    def win_rates(self) -> List[float]:
+        return [wins / self.games for wins in self.wins] if self.games else []
+
+    @property
+    def draw_rate(self) -> float:
+        return self.draws / self.games if self.games else 0.0
+
+
+class ResultsStore:
+    """Columnar game outcomes in `directory`, with incrementally updated aggregates and indexes."""
+
+    def __init__(self, directory: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        self.stored = 0  # Rows already in the column files
+        self.fleets: List[str] = []
+        self.fleet_ids: Dict[str, int] = {}
+        self.fleet_stats: List[FleetStats] = []
+        self.heatmaps: Dict[Tuple[int, int], array] = {}  # (width, rows) -> hits per cell, row-major from A1
+        self.buffers = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        self.hash_index: Dict[int, List[int]] = {}
+        self.fleet_rows: Dict[int, array] = {}  # Fleet id -> row numbers
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _heatmap_path(self, width: int, rows: int, stored: int) -> str:
+        """Heatmap of a board size over the first `stored` rows."""
+        return self._path(f'heatmap_{width}x{rows}.{stored}.bin')
+
+    def _load(self):
+        meta_path = self._path('aggregates.json')
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        self.stored = meta['rows']
+        self.fleets = meta['fleets']
+        self.fleet_ids = {fleet: index for index, fleet in enumerate(self.fleets)}
+        self.fleet_stats = [FleetStats(*stats) for stats in meta['fleet_stats']]
+        for key in meta['heatmaps']:
+            width, rows = map(int, key.split('x'))
+            heatmap = array('Q')
+            try:
+                with open(self._heatmap_path(width, rows, self.stored), 'rb') as heatmap_file:
+                    heatmap.frombytes(heatmap_file.read())
+            except FileNotFoundError:
+                pass
+            if len(heatmap) != width * rows:
+                raise ValueError(f"Heatmap {key} of {self.directory} does not match its {self.stored} rows.")
+            self.heatmaps[(width, rows)] = heatmap
+        # Columns may hold rows written after the last aggregates, e.g. before a crash: drop them
+        for name, typecode in COLUMNS.items():
+            path = self._path(f'{name}.bin')
+            if os.path.exists(path):
+                with open(path, 'r+b') as column_file:
+                    column_file.truncate(self.stored * array(typecode).itemsize)
+        for row, key in enumerate(self._stored_column('config_hash')):
+            self.hash_index.setdefault(key, []).append(row)
+        for row, fleet in enumerate(self._stored_column('fleet')):
+            self.fleet_rows.setdefault(fleet, array('I')).append(row)
+
+    def __len__(self) -> int:
+        return self.stored + len(self.buffers['turns'])
+
+    def add(self, outcome: GameOutcome):
+        """Appends one game and updates the aggregates and indexes; flushes every `chunk_size` games."""
+        row = len(self)
+        fleet = self.fleet_ids.get(outcome.fleet)
+        if fleet is None:
+            fleet = self.fleet_ids[outcome.fleet] = len(self.fleets)
+            self.fleets.append(outcome.fleet)
+            self.fleet_stats.append(FleetStats())
+        buffers = self.buffers
+        buffers['config_hash'].append(outcome.config_hash)
+        buffers['width'].append(outcome.width)
+        buffers['rows'].append(outcome.rows)
+        buffers['fleet'].append(fleet)
+        buffers['players'].append(outcome.players)
+        buffers['winner'].append(outcome.winner)
+        buffers['shots'].append(outcome.shots)
+        buffers['hits'].append(outcome.hits)
+        buffers['turns'].append(outcome.turns)
+
+        self.fleet_stats[fleet].add(outcome.winner)
+        self.hash_index.setdefault(outcome.config_hash, []).append(row)
+        self.fleet_rows.setdefault(fleet, array('I')).append(row)
+        if outcome.hit_cells:
+            size = (outcome.width, outcome.rows)
+            heatmap = self.heatmaps.get(size)
+            if heatmap is None:
+                heatmap = self.heatmaps[size] = array('Q', bytes(8 * outcome.width * outcome.rows))
+            for hit_row, column in outcome.hit_cells:
+                if 1 <= hit_row <= outcome.rows and 1 <= column <= outcome.width:
+                    heatmap[(hit_row - 1) * outcome.width + column - 1] += 1
+        if len(buffers['turns']) >= self.chunk_size:
+            self.flush()
+
+    def play(self, players: Sequence[Player]) -> GameOutcome:
+        """Plays a configured game headlessly and stores its outcome."""
+        outcome = play_and_describe(players)
+        self.add(outcome)
+        return outcome
+
+    def flush(self):
+        """
+        Appends buffered rows to the column files, writes the heatmaps of the new row
+        count next to the old ones, then saves the aggregates that point to them.
+        """
+        stored = len(self)
+        for name, buffer in self.buffers.items():
+            with open(self._path(f'{name}.bin'), 'ab') as column_file:
+                buffer.tofile(column_file)
+            del buffer[:]
+        self.stored = stored
+        current = set()
+        for (width, rows), heatmap in self.heatmaps.items():
+            path = self._heatmap_path(width, rows, stored)
+            with open(f'{path}.tmp', 'wb') as heatmap_file:
+                heatmap.tofile(heatmap_file)
+            os.replace(f'{path}.tmp', path)
+            current.add(os.path.basename(path))
+        meta = {
+            'rows': self.stored,
+            'fleets': self.fleets,
+            'fleet_stats': [[stats.games, stats.draws, stats.wins] for stats in self.fleet_stats],
+            'heatmaps': [f'{width}x{rows}' for width, rows in self.heatmaps],
+        }
+        temporary = self._path('aggregates.json.tmp')
+        with open(temporary, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temporary, self._path('aggregates.json'))
+        # Heatmaps of earlier flushes are no longer referenced
+        for name in os.listdir(self.directory):
+            if name.startswith('heatmap_') and name not in current:
+                os.remove(self._path(name))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stored_column(self, name: str) -> array:
+        column = array(COLUMNS[name])
+        path = self._path(f'{name}.bin')
+        if os.path.exists(path):
+            with open(path, 'rb') as column_file:
+                column.fromfile(column_file, self.stored)
+        return column
+
+    def column(self, name: str) -> array:
+        """Every value of one column, stored and buffered."""
+        return self._stored_column(name) + self.buffers[name]
+
+    def rows(self, row_numbers: Sequence[int]) -> Iterator[Dict[str, int]]:
+        """The given rows as dicts of column values, reading each column once."""
+        columns = {name: self.column(name) for name in COLUMNS}
+        for row in row_numbers:
+            record = {name: column[row] for name, column in columns.items()}
+            record['fleet'] = self.fleets[record['fleet']]
+            yield record
+
+    def find(self, key: int) -> List[int]:
+        """Rows of the games with config hash `key`."""
+        return list(self.hash_index.get(key, ()))
+
+    def fleet_games(self, fleet: str) -> array:
+        """Rows of the games played with fleet composition `fleet`."""
+        fleet_id = self.fleet_ids.get(fleet)
+        return array('I') if fleet_id is None else array('I', self.fleet_rows.get(fleet_id, ()))
+
+    def win_rate_by_fleet(self) -> Dict[str, FleetStats]:
+        return dict(zip(self.fleets, self.fleet_stats))
+
+    def heatmap(self, width: int, rows: int) -> List[List[int]]:
+        """Hits per cell over every game on a `width` x `rows` board, one list per row from A."""
+        heatmap = self.heatmaps.get((width, rows))
+        if heatmap is None:
+            return [[0] * width for _ in range(rows)]
+        return [heatmap[row * width:(row + 1) * width].tolist() for row in range(rows)]
@@ -0,0 +1,160 @@
+"""
+Compact, reversible game state for players that search ahead.
+
+    state = SearchState.from_players(players, current=0)
+    hit = state.apply(Position('B', 3))   # The current player fires at the next live player
+    state.undo()                          # Back to exactly the state before the shot
+
+Each board is a bytearray of cell health laid out like PackedBattleArea
+(index = row * stride + column). The cell layout (which ship owns each cell) is
+shared by every clone and never written, so `clone` only copies the health
+bytes, the ship sizes and the ship counts. `apply` changes at most one health
+byte, one ship size and one ship count, and pushes one entry on the undo log;
+`undo` reverses it in constant time from the state itself.
+
+Turns follow the live-player ring of the game: the current player fires at the
+next player with ships, keeps the turn on a hit and passes it to that player on
+a miss. A round of the real game iterates the players live at its start, so a
+player eliminated mid-round still fires; that corner is not modeled here.
+"""
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from player import Player
+from utils import Position, row_label, row_number
+
+
+class SearchState:
+    """Boards, ship counts and the player to move, with an undo log of applied shots."""
+    __slots__ = ('names', 'width', 'rows', 'stride', 'row_offsets', 'ship_ids', 'health', 'ship_sizes',
+                 'ship_counts', 'current', 'log')
+
+    def __init__(self, names: List[str], width: int, rows: int, ship_ids: List[array], health: List[bytearray],
+                 ship_sizes: List[array], ship_counts: List[int], current: int = 0):
+        self.names = names
+        self.width = width
+        self.rows = rows
+        self.stride = width + 1
+        self.row_offsets: Dict[str, int] = {row_label(row + 1): row * self.stride for row in range(rows)}
+        self.ship_ids = ship_ids  # Shared by clones, read only
+        self.health = health
+        self.ship_sizes = ship_sizes  # Live cells of each ship
+        self.ship_counts = ship_counts
+        self.current = current
+        self.log: List[Tuple[int, int, int]] = []  # (current before the shot, target, cell index or -1)
+
+    @classmethod
+    def from_players(cls, players: Sequence[Player], current: int = 0) -> 'SearchState':
+        """Captures the boards of `players` (any battle area backend); `current` is the player to move."""
+        battle_area = players[0].battle_area
+        width, rows = battle_area.width, battle_area.rows
+        stride = width + 1
+        ship_ids, health, ship_sizes = [], [], []
+        for player in players:
+            cells = bytearray(rows * stride)
+            ids = array('i', [-1]) * len(cells)
+            numbers: Dict[int, int] = {}  # id() of a Ship -> its number on this board
+            sizes = array('i')
+            for x, y, cell_health, ship in player.battle_area.cells():
+                number = numbers.get(id(ship))
+                if number is None:
+                    number = numbers[id(ship)] = len(sizes)
+                    sizes.append(0)
+                index = (row_number(x) - 1) * stride + y
+                cells[index] = cell_health
+                ids[index] = number
+                sizes[number] += 1
+            ship_ids.append(ids)
+            health.append(cells)
+            ship_sizes.append(sizes)
+        return cls([player.name for player in players], width, rows, ship_ids, health, ship_sizes,
+                   [player.ship_count for player in players], current)
+
+    def clone(self) -> 'SearchState':
+        """Independent copy of the current state with an empty undo log; the cell layout is shared."""
+        state = SearchState.__new__(SearchState)
+        state.names = self.names
+        state.width, state.rows, state.stride = self.width, self.rows, self.stride
+        state.row_offsets = self.row_offsets
+        state.ship_ids = self.ship_ids
+        state.health = [bytearray(cells) for cells in self.health]
+        state.ship_sizes = [array('i', sizes) for sizes in self.ship_sizes]
+        state.ship_counts = list(self.ship_counts)
+        state.current = self.current
+        state.log = []
+        return state
+
+    def target(self) -> Optional[int]:
+        """The player the current player fires at: the next player with ships, if any."""
+        count = len(self.ship_counts)
+        for step in range(1, count):
+            player = (self.current + step) % count
+            if self.ship_counts[player] > 0:
+                return player
+        return None
+
+    def cell_index(self, position: Position) -> int:
+        """Board index of `position`, or -1 for a shot that can never hit."""
+        offset = self.row_offsets.get(position.x)
+        if offset is None or not 0 <= position.y <= self.width:
+            return -1
+        return offset + position.y
+
+    def position(self, index: int) -> Position:
+        row, col = divmod(index, self.stride)
+        return Position(row_label(row + 1), col)
+
+    def apply(self, position: Position) -> bool:
+        return self.apply_index(self.cell_index(position))
+
+    def apply_index(self, index: int) -> bool:
+        """Fires the current player's shot at board `index` of its target; returns True on a hit."""
+        current = self.current
+        target = self.target()
+        if target is None:
+            self.log.append((current, -1, -1))
+            return False
+        cells = self.health[target]
+        if index < 0 or not cells[index]:
+            self.log.append((current, target, -1))
+            self.current = target
+            return False
+        self.log.append((current, target, index))
+        cells[index] -= 1
+        if not cells[index]:
+            sizes = self.ship_sizes[target]
+            ship = self.ship_ids[target][index]
+            sizes[ship] -= 1
+            if not sizes[ship]:
+                self.ship_counts[target] -= 1
+        return True
+
+    def undo(self):
+        """Reverses the last applied shot."""
+        current, target, index = self.log.pop()
+        self.current = current
+        if index < 0:
+            return
+        cells = self.health[target]
+        if not cells[index]:
+            sizes = self.ship_sizes[target]
+            ship = self.ship_ids[target][index]
+            if not sizes[ship]:
+                self.ship_counts[target] += 1
+            sizes[ship] += 1
+        cells[index] += 1
+
+    def undo_to(self, depth: int):
+        """Undoes shots until `depth` shots remain in the log, e.g. a depth saved before a search."""
+        while len(self.log) > depth:
+            self.undo()
+
+    def live_cells(self, player: int) -> List[int]:
+        """Board indices of `player` that can still be hit."""
+        return [index for index, cell_health in enumerate(self.health[player]) if cell_health]
+
+    @property
+    def winner(self) -> Optional[str]:
+        """Name of the only player with ships left, if there is exactly one."""
+        live = [name for name, count in zip(self.names, self.ship_counts) if count > 0]
+        return live[0] if len(live) == 1 else None
@@ -1,6 +1,8 @@
 from utils import Position
 class Ship:
-    def __init__(self, ship_type, width, height, postion:Position):
+    __slots__ = ('ship_type', 'size', 'width', 'height', 'position')
+
+    def __init__(self, ship_type, width, height, postion:Position = None):
         self.ship_type = ship_type
         self.size = width * height
         self.width = width
@@ -16,6 +18,8 @@ class Ship:
         return self.size == 0
 
 class ShipCell:
+    __slots__ = ('ship', 'health', 'position')
+
     def __init__(self, ship, health, position) -> None:
         self.ship = ship
         self.health = health
@@ -0,0 +1,138 @@
+from bisect import bisect_left, bisect_right, insort
+from utils import ShipType, Position, InputValidationError, row_label, row_number
+
+INFINITY = float('inf')
+
+
+class SparseBattleArea:
+    """
+    Battle area for very large boards that stores ships as rectangles.
+
+    Memory grows with the number of ships and of cells hit so far, never with the
+    board area. Ships are indexed by their top-left corner in a sorted list of
+    (top, left, ship id) keys. Ships sharing a top row never share a column, so
+    the ship that may contain a cell is found with one bisect per distinct top
+    row within `max_ship_height` rows above it, i.e. in O(log n) for fleets of
+    bounded ship height.
+    """
+
+    def __init__(self, width, height):
+        self.width: int = width
+        self.height: str = height
+        self.rows: int = row_number(height.upper())
+        self.ships = []
+        self.max_ship_height = 0
+        self._keys = []  # Sorted (top row, left column, ship id)
+        self._bounds = []  # Ship id -> (top, left, bottom, right), inclusive
+        self._cell_health = []  # Ship id -> health of each of its cells when untouched
+        self.damage = {}  # (row, col) -> remaining health, for cells hit at least once
+
+    def _is_out_of_bounds(self, row: int, y: int) -> bool:
+        return not 1 <= row <= self.rows or (y > self.width)
+
+    def _ships_in_band(self, first_top: int, last_top: int, left: int, right: int):
+        """Yields ids of ships whose top row is in [first_top, last_top] and whose columns meet [left, right]."""
+        keys = self._keys
+        index = bisect_left(keys, (first_top,))
+        while index < len(keys) and keys[index][0] <= last_top:
+            top = keys[index][0]
+            group_end = bisect_left(keys, (top + 1,), index)
+            # Ships with the same top row are column-disjoint, so walk left from the
+            # last one starting at or before `right` until they end before `left`
+            candidate = bisect_right(keys, (top, right, INFINITY), index, group_end) - 1
+            while candidate >= index:
+                ship_id = keys[candidate][2]
+                if self._bounds[ship_id][3] < left:
+                    break
+                yield ship_id
+                candidate -= 1
+            index = group_end
+
+    def _overlapping_ship(self, top: int, left: int, bottom: int, right: int):
+        """Returns the id of a ship overlapping the rectangle, or None."""
+        for ship_id in self._ships_in_band(top - self.max_ship_height + 1, bottom, left, right):
+            if self._bounds[ship_id][2] >= top:
+                return ship_id
+        return None
+
+    def ship_at(self, row: int, col: int):
+        """Returns the id of the ship covering (row, col), or None."""
+        keys = self._keys
+        index = bisect_left(keys, (row - self.max_ship_height + 1,))
+        end = bisect_right(keys, (row, col, INFINITY), index)
+        while index < end:
+            top = keys[index][0]
+            group_end = bisect_left(keys, (top + 1,), index, end)
+            # Only the last ship of the group starting at or before `col` can cover it
+            candidate = bisect_right(keys, (top, col, INFINITY), index, group_end) - 1
+            if candidate >= index:
+                ship_id = keys[candidate][2]
+                _, _, bottom, right = self._bounds[ship_id]
+                if right >= col and bottom >= row:
+                    return ship_id
+            index = group_end
+        return None
+
+    def _raise_placement_error(self, width, height, top, col, start_x):
+        """Reports the first offending cell in the same order BattleArea checks them."""
+        for i in range(height):
+            new_x = row_label(top + i) if top else start_x
+            for j in range(width):
+                new_y = col + j
+                if self._is_out_of_bounds(top + i, new_y):
+                    raise InputValidationError(f"Ship placement out of bounds at {new_x}{new_y}.")
+                if self.ship_at(top + i, new_y) is not None:
+                    raise InputValidationError(f"Ship overlap detected at {new_x}{new_y}.")
+
+    def place_ship(self, width, height, position, ship):
+        """Places the ship in the grid with specified width, height, and position."""
+        ship_cell_health = ShipType.Q.value if ship.ship_type == 'Q' else ShipType.P.value
+        start_x = position.x.upper()
+        top = row_number(start_x)
+        left = int(position.y)
+
+        if width > 0 and height > 0:
+            bottom, right = top + height - 1, left + width - 1
+            if (top == 0 or bottom > self.rows or right > self.width
+                    or self._overlapping_ship(top, left, bottom, right) is not None):
+                self._raise_placement_error(width, height, top, left, start_x)
+
+            ship_id = len(self.ships)
+            insort(self._keys, (top, left, ship_id))
+            self._bounds.append((top, left, bottom, right))
+            self.max_ship_height = max(self.max_ship_height, height)
+        else:
+            self._bounds.append((0, 0, -1, -1))
+        self._cell_health.append(ship_cell_health)
+        self.ships.append(ship)
+
+    def fire_at(self, position: Position):
+        """Records a missile at `position` and returns the ship it hit, if any."""
+        row = row_number(position.x)
+        col = position.y
+        if not row:
+            return None
+        ship_id = self.ship_at(row, col)
+        if ship_id is None:
+            return None
+
+        cell = (row, col)
+        health = self.damage.get(cell, self._cell_health[ship_id])
+        if not health:
+            return None
+        self.damage[cell] = health - 1
+        ship = self.ships[ship_id]
+        if health == 1:
+            ship.size -= 1
+        return ship
+
+    def cells(self):
+        """Yields (row, column, health, ship) for every cell that can still be hit."""
+        for ship_id, (top, left, bottom, right) in enumerate(self._bounds):
+            ship = self.ships[ship_id]
+            for row in range(top, bottom + 1):
+                x = row_label(row)
+                for col in range(left, right + 1):
+                    health = self.damage.get((row, col), self._cell_health[ship_id])
+                    if health:
+                        yield x, col, health, ship
@@ -1,11 +1,98 @@
+import asyncio
+import copy
+import io
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import random
+import struct
+import subprocess
+import sys
+import tempfile
 import unittest
+import zlib
+from functools import partial
 from unittest.mock import MagicMock, patch
-from game_controller import GameController
+from game_controller import GameController, GameResult, simulate_game
+from headless_ui import NullUI, RecordingUI
+from battleship_ui import BattleshipUI
+from packed_battle_area import PackedBattleArea
+from sparse_battle_area import SparseBattleArea
 from player import Player
 from battle_area import BattleArea
-from utils import Position, InputValidationError
+from utils import Position, InputValidationError, row_label, row_number
 from ship import Ship, ShipCell
 from input_validator import ValidateInput
+from game_reader import read_games
+from player_ring import PlayerRing
+from tournament import run_tournament
+from instrumentation import instrument
+from game_journal import HIT, MISS, PLACE, RESULT, SINK, TURN, JournalReader, JournalWriter
+from replay import Replay, ReplayViewer
+from game_server import MAX_ROWS, MAX_WIDTH, GameServer, play_remote_game
+from ai_player import ProbabilityTargeting
+import main
+from renderers import get_renderer, register_renderer
+from raster_ui import RasterUI, render_journal
+from search_state import SearchState
+from fleet_generator import FleetGenerator
+from game_cache import GameCache, game_key
+from outcome_resolver import resolve_game
+from results_store import ResultsStore
+from firing_tokens import PackedFiringSequence, parse_firing_sequence
+from win_probability import estimate_win_probability, wilson_interval
+from logger import configure_logging, log_event, stop_writer
+from benchmarks.suite import Case, compare, format_comparison, run_suite
+
+try:
+    import numpy
+    from batch_engine import simulate_batch
+except ImportError:
+    numpy = None
+
+
+SAMPLE_INPUT = """5 E
+2
+Q 1 1 A1 B2
+P 2 1 D4 C3
+A1 B2 B2 B3
+A1 B2 B3 A1 D1 E1 D4 D4 D5 D5"""
+
+
+def build_players(input_text=SAMPLE_INPUT, player_names=('Player-1', 'Player-2'),
+                  battle_area_class=BattleArea):
+    """Parse a game description into configured players."""
+    validator = ValidateInput(battle_area_class)
+    validator.get_valid_input(input_text)
+    validator.set_players(list(player_names))
+    validator.configure_game()
+    return validator.players
+
+
+def random_players(rng, player_count=2, width=6, height='F', ship_shapes=(('Q', 2, 1), ('P', 1, 3)),
+                   shots=30, battle_area_class=BattleArea):
+    """Players with randomly placed ships and random (sometimes off-board) firing sequences."""
+    rows = ord(height) - ord('A') + 1
+    players = []
+    for p in range(player_count):
+        player = Player(f'Player-{p + 1}')
+        player.set_battle_area(width, height, battle_area_class)
+        occupied = set()
+        for ship_type, ship_width, ship_height in ship_shapes:
+            while True:
+                row, col = rng.randrange(rows - ship_height + 1), rng.randint(0, width - ship_width + 1)
+                cells = {(row + i, col + j) for i in range(ship_height) for j in range(ship_width)}
+                if not cells & occupied:
+                    break
+            occupied |= cells
+            player.place_ships(ship_width, ship_height, Position(chr(ord('A') + row), col), ship_type)
+        player.set_ship_count(len(ship_shapes))
+        player.set_firing_sequence([Position(chr(ord('A') + rng.randrange(rows + 1)), rng.randint(0, width + 1))
+                                    for _ in range(rng.randint(0, shots))])
+        players.append(player)
+    return players
 
 
 class TestGameController(unittest.TestCase):
@@ -68,6 +155,53 @@ class TestGameController(unittest.TestCase):
         self.assertIn("fires a missile at A1 which missed.", log.output[0])
 
 
+class TestPlayerRing(unittest.TestCase):
+
+    def setUp(self):
+        self.players = [Player(f"Player {i}") for i in range(5)]
+        for player in self.players:
+            player.ship_count = 1
+
+    def test_next_live_player_skips_eliminated(self):
+        """Test eliminated players are skipped, including when starting from one."""
+        ring = PlayerRing(self.players)
+        ring.eliminate(self.players[1])
+        ring.eliminate(self.players[2])
+        self.assertIs(ring.next_live_player(self.players[0]), self.players[3])
+        self.assertIs(ring.next_live_player(self.players[1]), self.players[3])
+        ring.eliminate(self.players[3])
+        self.assertIs(ring.next_live_player(self.players[1]), self.players[4])
+        self.assertEqual(ring.live_players(), [self.players[0], self.players[4]])
+
+    def test_last_player_has_no_target(self):
+        """Test the only live player has no one to fire at."""
+        self.players[0].ship_count = 0
+        ring = PlayerRing(self.players[:2])
+        self.assertEqual(ring.live_players(), [self.players[1]])
+        self.assertIsNone(ring.next_live_player(self.players[1]))
+        self.assertIs(ring.next_live_player(self.players[0]), self.players[1])
+
+    def test_matches_get_next_player(self):
+        """Test the ring agrees with the circular scan for every live pattern."""
+        controller = GameController()
+        for mask in range(32):
+            for i, player in enumerate(self.players):
+                player.ship_count = (mask >> i) & 1
+            ring = PlayerRing(self.players)
+            for i, player in enumerate(self.players):
+                self.assertIs(ring.next_live_player(player), controller.get_next_player(self.players, i))
+
+    def test_three_player_game_from_input(self):
+        """Test a game with three ship position columns and three firing sequences."""
+        validator = ValidateInput()
+        validator.set_players(['Player-1', 'Player-2', 'Player-3'])
+        validator.get_valid_input("5 E\n1\nQ 1 1 A1 B2 C3\nB2 B2\nC3 C3\nA1")
+        validator.configure_game()
+        result = simulate_game(validator.players)
+        self.assertEqual(result.winner, 'Player-1')
+        self.assertEqual(result.ships_sunk, {'Player-1': 1, 'Player-2': 1, 'Player-3': 0})
+
+
 class TestPlayer(unittest.TestCase):
 
     def test_set_battle_area(self):
@@ -104,6 +238,77 @@ class TestBattleArea(unittest.TestCase):
             battle_area.place_ship(1, 1, Position('F', 1), ship)
 
 
+class TestPackedBattleArea(unittest.TestCase):
+
+    def test_q_cell_needs_two_hits(self):
+        """Test a Q cell survives the first hit and sinks the ship on the second."""
+        battle_area = PackedBattleArea(5, 'E')
+        ship = Ship('Q', 1, 1, Position('B', 2))
+        battle_area.place_ship(1, 1, Position('B', 2), ship)
+        self.assertIs(battle_area.fire_at(Position('B', 2)), ship)
+        self.assertFalse(ship.is_destroyed())
+        self.assertIs(battle_area.fire_at(Position('B', 2)), ship)
+        self.assertTrue(ship.is_destroyed())
+        self.assertIsNone(battle_area.fire_at(Position('B', 2)))
+
+    def test_place_ship_errors_match_dict_grid(self):
+        """Test out of bounds and overlap errors report the same cell as BattleArea."""
+        for position, width in ((Position('E', 4), 3), (Position('A', 2), 2)):
+            messages = []
+            for area_class in (BattleArea, PackedBattleArea):
+                battle_area = area_class(5, 'E')
+                battle_area.place_ship(2, 1, Position('A', 3), Ship('P', 2, 1))
+                with self.assertRaises(InputValidationError) as error:
+                    battle_area.place_ship(width, 1, position, Ship('P', width, 1))
+                messages.append(str(error.exception))
+            self.assertEqual(messages[0], messages[1])
+
+    def test_game_result_matches_dict_grid(self):
+        """Test a full game plays out identically on every backend."""
+        for area_class in (PackedBattleArea, SparseBattleArea):
+            self.assertEqual(simulate_game(build_players(battle_area_class=area_class)),
+                             simulate_game(build_players()))
+
+
+class TestLargeBoards(unittest.TestCase):
+
+    def test_row_labels_round_trip(self):
+        """Test rows continue after Z with two and three letter labels."""
+        self.assertEqual([row_label(n) for n in (1, 26, 27, 52, 703)], ['A', 'Z', 'AA', 'AZ', 'AAA'])
+        self.assertEqual(row_number(row_label(10000)), 10000)
+        self.assertEqual(row_number('a'), 0)
+
+    def test_ship_spans_past_row_z(self):
+        """Test every backend places a ship across Z and AA and reports bounds past the last row."""
+        for area_class in (BattleArea, PackedBattleArea, SparseBattleArea):
+            battle_area = area_class(5, 'AB')
+            ship = Ship('P', 1, 3, Position('Z', 1))
+            battle_area.place_ship(1, 3, Position('Z', 1), ship)
+            self.assertEqual(sorted(x for x, _, _, _ in battle_area.cells()), ['AA', 'AB', 'Z'])
+            with self.assertRaisesRegex(InputValidationError, "out of bounds at AC2"):
+                battle_area.place_ship(1, 2, Position('AB', 2), Ship('P', 1, 2))
+
+    def test_sparse_area_on_huge_board(self):
+        """Test a 10^4 x 10^4 board with a thousand ships only stores what was placed and hit."""
+        battle_area = SparseBattleArea(10000, row_label(10000))
+        for i in range(1000):
+            position = Position(row_label(1 + 10 * i), 1 + 7 * i)
+            battle_area.place_ship(5, 3, position, Ship('Q', 5, 3, position))
+        with self.assertRaisesRegex(InputValidationError, "overlap"):
+            battle_area.place_ship(2, 2, Position(row_label(12), 7), Ship('P', 2, 2))
+
+        target = Position(row_label(5003), 3505)
+        ship = battle_area.ships[500]
+        self.assertIs(battle_area.fire_at(target), ship)
+        self.assertIsNone(battle_area.fire_at(Position(row_label(5004), 3505)))
+        self.assertEqual(battle_area.damage, {(5003, 3505): 1})
+
+    def test_multi_letter_coordinates_are_parsed(self):
+        """Test coordinates with multi-letter rows are accepted."""
+        position = ValidateInput().get_coordinates_pos('AB12')
+        self.assertEqual((position.x, position.y), ('AB', 12))
+
+
 class TestValidateInput(unittest.TestCase):
 
     def setUp(self):
@@ -120,9 +325,909 @@ class TestValidateInput(unittest.TestCase):
         with self.assertRaises(InputValidationError):
             self.validator.get_coordinates_pos('1A')
 
+    def test_repeated_coordinates_share_one_position(self):
+        """Test positions are interned per game and usable as dict keys."""
+        first = self.validator.get_coordinates_pos('B7')
+        self.assertIs(self.validator.get_coordinates_pos('B7'), first)
+        self.assertEqual({first: 'hit'}[Position('B', 7)], 'hit')
+        with self.assertRaises(AttributeError):
+            first.x = 'C'
+
     def test_set_players(self):
         """Test set_players creates Player instances."""
         self.validator.set_players(['Player 1', 'Player 2'])
         self.assertEqual(len(self.validator.players), 2)
         self.assertEqual(self.validator.players[0].name, 'Player 1')
 
+
+class TestFiringTokens(unittest.TestCase):
+
+    def test_packed_sequence_matches_split_tokens(self):
+        """Test packing decodes every token, including lower-case and huge ones, in order across chunks."""
+        text = "A1 B10  AA7\tzz3 a1 ZZZZZZZZ2 C99999999999 A1"
+        expected = [Position('A', 1), Position('B', 10), Position('AA', 7), Position('zz', 3), Position('a', 1),
+                    Position('ZZZZZZZZ', 2), Position('C', 99999999999), Position('A', 1)]
+        sequence = parse_firing_sequence(text, chunk_size=4)
+        self.assertEqual(list(sequence), expected)
+        self.assertEqual(len(sequence), 8)
+        self.assertEqual(sequence.popleft(), Position('A', 1))
+        sequence.append(Position('D', 4))
+        self.assertEqual([sequence.popleft() for _ in range(len(sequence))], expected[1:] + [Position('D', 4)])
+        with self.assertRaises(IndexError):
+            sequence.popleft()
+
+    def test_invalid_token_reports_token_number_and_offset(self):
+        with self.assertRaises(InputValidationError) as context:
+            parse_firing_sequence("A1 B2 C3 1A D4", line=5, chunk_size=3)
+        self.assertEqual(context.exception.line, 5)
+        self.assertIn("'1A' (token 4, offset 9)", str(context.exception))
+
+    def test_parsed_game_keeps_packed_sequences(self):
+        players = build_players()
+        self.assertIsInstance(players[0].firing_sequence, PackedFiringSequence)
+        self.assertEqual(simulate_game(build_players()).winner, 'Player-2')
+
+
+
+class TestRenderers(unittest.TestCase):
+
+    def test_renderers_are_selected_by_name(self):
+        """Test a controller accepts a renderer name and unknown names are rejected."""
+        self.assertIs(get_renderer('null'), NullUI)
+        controller = GameController(ui_class='recording', sleep_time=0, log_events=False, wait_for_close=False)
+        controller.start_game(build_players())
+        self.assertIsInstance(controller.ui, RecordingUI)
+        register_renderer('test-recording', 'headless_ui:RecordingUI')
+        self.assertIs(get_renderer('test-recording'), RecordingUI)
+        with self.assertRaises(ValueError):
+            get_renderer('missing')
+
+    def test_import_has_no_side_effects(self):
+        """Test importing the game neither loads turtle or the optional features nor configures logging."""
+        with tempfile.TemporaryDirectory() as directory:
+            probe = subprocess.run(
+                [sys.executable, '-c', "import sys, logging, main; "
+                 "print('turtle' in sys.modules, 'tkinter' in sys.modules, bool(logging.getLogger().handlers), "
+                 "any(name in sys.modules for name in ('ai_player', 'instrumentation', 'game_journal')))"],
+                capture_output=True, text=True, cwd=directory, check=True,
+                env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__))))
+            self.assertEqual(probe.stdout.split(), ['False', 'False', 'False', 'False'])
+            self.assertFalse(os.path.exists(os.path.join(directory, 'game.log')))
+
+
+class TestRasterUI(unittest.TestCase):
+
+    @staticmethod
+    def decode_png(data):
+        """Pixels of a PNG written by RasterUI (8-bit RGB, no row filters)."""
+        width, height = struct.unpack('>II', data[16:24])
+        offset, idat = 8, b''
+        while offset < len(data):
+            length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+            if kind == b'IDAT':
+                idat += data[offset + 8:offset + 8 + length]
+            offset += length + 12
+        rows = zlib.decompress(idat)
+        stride = width * 3 + 1
+        return b''.join(rows[y * stride + 1:(y + 1) * stride] for y in range(height))
+
+    def test_frames_follow_the_game(self):
+        """Test a frame is taken per turn and at the end, and PNG export keeps the pixels."""
+        controller = GameController(ui_class=partial(RasterUI, keep_frames=True), sleep_time=0,
+                                    log_events=False, wait_for_close=False)
+        result = controller.start_game(build_players())
+        ui = controller.ui
+        self.assertEqual(len(ui.frames), result.turns + 1)
+        self.assertEqual(self.decode_png(ui.encode(ui.frames[-1])), ui.frames[-1])
+        # Player-2 hit the Q ship at A1 of Player-1's grid: the middle of that cell is red
+        x, y, width, height = ui._cell_box(0, 1, 1)
+        middle = ((y + height // 2) * ui.image_width + x + width // 2) * 3
+        self.assertEqual(ui.frames[-1][middle:middle + 3], bytes((255, 0, 0)))
+        self.assertEqual(ui.message, "Player-2 Wins!")
+
+    def test_render_journal_writes_frames_and_contact_sheet(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.journal')
+            with JournalWriter(path) as journal:
+                result = GameController.headless(journal).start_game(build_players())
+            frames = os.path.join(directory, 'frames')
+            sheet = os.path.join(directory, 'sheet.png')
+            self.assertEqual(render_journal(path, frames, sheet=sheet, sheet_step=2), result.turns + 1)
+            self.assertEqual(len(os.listdir(frames)), result.turns + 1)
+            with open(sheet, 'rb') as sheet_file:
+                self.assertEqual(sheet_file.read(8), b'\x89PNG\r\n\x1a\n')
+
+
+class TestHeadlessGame(unittest.TestCase):
+
+    def test_simulate_game_result(self):
+        """Test a headless game reports the winner, shots, hits, sinks and turns."""
+        result = simulate_game(build_players())
+        self.assertEqual(result, GameResult(
+            winner='Player-2',
+            shots={'Player-1': 4, 'Player-2': 9},
+            hits={'Player-1': 2, 'Player-2': 4},
+            ships_sunk={'Player-1': 1, 'Player-2': 2},
+            turns=8,
+        ))
+        self.assertFalse(result.is_draw)
+
+    def test_recording_ui_receives_draw_calls(self):
+        """Test the recording renderer sees every shot and the final announcement."""
+        controller = GameController(ui_class=RecordingUI, sleep_time=0, log_events=False)
+        controller.start_game(build_players())
+        operations = [event[0] for event in controller.ui.events]
+        self.assertEqual(operations.count('mark_hit') + operations.count('mark_miss'), 13)
+        self.assertEqual(operations[-1], 'announce_winner')
+
+    def test_instrumented_game_counts_and_times_shots(self):
+        """Test instrumentation matches the game result and reports timings to listeners."""
+        controller = GameController(ui_class=RecordingUI, sleep_time=0, log_events=False)
+        metrics = instrument(controller)
+        seen = []
+        metrics.add_listener(lambda name, elapsed_ns: seen.append(name))
+        result = controller.start_game(build_players())
+
+        self.assertEqual(metrics.counters, {'shots': 13, 'hits': 6, 'misses': 7, 'sinks': 3})
+        self.assertEqual(metrics.latency['check_hit'].count, 13)
+        self.assertEqual(metrics.latency['ui.draw_ship'].count, 4)
+        self.assertEqual(sum(h.count for h in metrics.turns.values()), result.turns)
+        self.assertIn('fire_missile', seen)
+        self.assertEqual(json.loads(metrics.to_json())['counters']['shots'], 13)
+        self.assertNotIn('fire_missile', vars(GameController()))
+
+    def test_game_resumes_mid_round(self):
+        """Test first_turn lets the given player open the first round only."""
+        controller = GameController(ui_class=RecordingUI, sleep_time=0, log_events=False)
+        controller.start_game(build_players(), first_turn=1)
+        turns = [event[1] for event in controller.ui.events if event[0] == 'announce_turn']
+        self.assertEqual(turns[:3], ['Player-2', 'Player-1', 'Player-2'])
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestBatchEngine(unittest.TestCase):
+
+    def test_sample_game_matches_scalar_engine(self):
+        """Test the batched engine reproduces the scalar result of the sample game."""
+        self.assertEqual(simulate_batch([build_players()]), [simulate_game(build_players())])
+
+    def test_random_games_match_scalar_engine(self):
+        """Test mixed two- and three-player games give identical results in both engines."""
+        def games():
+            rng = random.Random(7)
+            return [random_players(rng, player_count=rng.choice((2, 3))) for _ in range(200)]
+
+        self.assertEqual(simulate_batch(games()), [simulate_game(players) for players in games()])
+
+
+class TestTournament(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_games(self, name, *games):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as game_file:
+            game_file.write("\n\n".join(games) + "\n")
+        return path
+
+    def test_directory_files_may_hold_several_games(self):
+        """Test every blank-line separated game in each file of a directory is played."""
+        self.write_games('a.txt', SAMPLE_INPUT, SAMPLE_INPUT)
+        self.write_games('b.txt', SAMPLE_INPUT)
+        self.assertEqual(run_tournament([self.directory.name], workers=1).games, 3)
+
+    def test_report_aggregates_games_and_errors(self):
+        """Test wins, draws and invalid games are counted across a multi-game file."""
+        draw = SAMPLE_INPUT.rsplit("\n", 2)[0] + "\nE5\nE5"
+        path = self.write_games('games.txt', SAMPLE_INPUT, draw, "5 E\n2", SAMPLE_INPUT)
+        report = run_tournament([path], workers=1, chunk_size=2)
+        self.assertEqual((report.games, report.draws, report.errors), (3, 1, 1))
+        self.assertEqual(report.wins, {'Player-2': 2})
+        self.assertAlmostEqual(report.mean_shots, (13 + 13 + 2) / 3)
+
+    def test_process_pool_matches_serial_run(self):
+        """Test a worker pool reports the same totals as an in-process run."""
+        self.write_games('a.txt', SAMPLE_INPUT)
+        self.write_games('b.txt', SAMPLE_INPUT)
+        serial = run_tournament([self.directory.name], workers=1)
+        pooled = run_tournament([self.directory.name], workers=2, chunk_size=1)
+        self.assertEqual((serial.games, serial.wins, serial.total_shots),
+                         (pooled.games, pooled.wins, pooled.total_shots))
+
+    def test_results_store_aggregates_and_reopens(self):
+        """Test stored outcomes feed the fleet win rates, heatmap and hash index, and survive a reopen."""
+        draw = SAMPLE_INPUT.rsplit("\n", 2)[0] + "\nE5\nE5"
+        path = self.write_games('games.txt', SAMPLE_INPUT, draw, SAMPLE_INPUT)
+        store_path = os.path.join(self.directory.name, 'results')
+        store = ResultsStore(store_path, chunk_size=2)
+        report = run_tournament([path], workers=1, store=store)
+        store.close()
+
+        store = ResultsStore(store_path)
+        self.assertEqual(len(store), 3)
+        stats = store.win_rate_by_fleet()['P2x1,Q1x1']
+        self.assertEqual((stats.games, stats.draws, stats.wins), (3, 1, [0, 2]))
+        self.assertEqual(sum(map(sum, store.heatmap(5, 5))), 2 * 6)
+        self.assertEqual(store.column('shots').tolist(), [13, 2, 13])
+        first = next(store.rows([0]))
+        self.assertEqual(store.find(first['config_hash']), [0, 2])
+        self.assertEqual(report.games, 3)
+
+    def test_results_store_survives_crash_during_flush(self):
+        """Test a flush that dies before saving the aggregates leaves heatmaps that match the kept rows."""
+        store_path = os.path.join(self.directory.name, 'results')
+        store = ResultsStore(store_path)
+        store.play(build_players())
+        store.flush()
+        heatmap = store.heatmap(5, 5)
+        store.play(build_players())
+        with patch('results_store.json.dump', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                store.flush()
+
+        store = ResultsStore(store_path)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.heatmap(5, 5), heatmap)
+
+    def test_game_cache_skips_known_games(self):
+        """Test repeated games are served from the cache, in process and across pool workers."""
+        path = self.write_games('games.txt', SAMPLE_INPUT, SAMPLE_INPUT, "5 E\n2", SAMPLE_INPUT)
+        cache = GameCache(os.path.join(self.directory.name, 'cache'))
+        report = run_tournament([path], workers=1, cache=cache)
+        self.assertEqual((report.games, report.cache_hits, report.cache_lookups), (3, 2, 3))
+        self.assertEqual(report.wins, {'Player-2': 3})
+        pooled = run_tournament([path], workers=2, chunk_size=1, cache=GameCache(cache.directory))
+        self.assertEqual((pooled.cache_hits, pooled.wins), (3, {'Player-2': 3}))
+
+
+class TestGameReader(unittest.TestCase):
+
+    def test_reads_games_with_any_ship_count(self):
+        """Test records are split on blank lines and may hold any number of ships."""
+        three_ships = SAMPLE_INPUT.replace("\n2\n", "\n3\nP 1 1 E1 E1\n", 1)
+        stream = io.StringIO(SAMPLE_INPUT + "\n\n\n" + three_ships + "\n")
+        records = list(read_games(stream))
+        self.assertEqual([(record.index, record.first_line, record.ok) for record in records],
+                         [(0, 1, True), (1, 9, True)])
+        self.assertEqual(len(records[1].players[0].battle_area.ships), 3)
+
+    def test_bad_game_reports_line_and_reading_continues(self):
+        """Test a parse error carries its line number and later games are still read."""
+        bad = SAMPLE_INPUT.replace("B2 B3\n", "B2 3B\n")
+        stream = io.StringIO("\n\n".join([SAMPLE_INPUT, bad, SAMPLE_INPUT]))
+        records = list(read_games(stream))
+        self.assertEqual([record.ok for record in records], [True, False, True])
+        self.assertEqual(records[1].error.line, 12)
+        self.assertIn("Line 12", str(records[1].error))
+
+    def test_custom_separator(self):
+        """Test a separator line other than a blank line."""
+        stream = io.StringIO(SAMPLE_INPUT + "\n---\n" + SAMPLE_INPUT)
+        self.assertEqual(len(list(read_games(stream, separator='---'))), 2)
+
+
+class TestGameJournal(unittest.TestCase):
+    def test_journal_round_trip(self):
+        """Test journaled games can be read back, event by event, from one file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.journal')
+            with JournalWriter(path) as journal:
+                result = GameController.headless(journal).start_game(build_players())
+                GameController.headless(journal).start_game(build_players())
+            with JournalReader(path) as reader:
+                games = list(reader.games())
+                events = list(reader.events(games[0]))
+                self.assertEqual(len(list(reader.events())), 2 * len(events))
+
+        self.assertEqual([(game.width, game.rows, game.players) for game in games],
+                         [(5, 5, ['Player-1', 'Player-2'])] * 2)
+        kinds = [event.kind for event in events]
+        self.assertEqual(kinds.count(PLACE), 4)
+        self.assertEqual(kinds.count(TURN), result.turns)
+        self.assertEqual(kinds.count(HIT) + kinds.count(MISS), 13)
+        self.assertEqual(kinds.count(SINK), 3)
+        first_shot = events[kinds.index(MISS)]
+        self.assertEqual((first_shot.player, first_shot.target, first_shot.row, first_shot.col), (0, 1, 1, 1))
+        self.assertEqual((events[-1].kind, events[-1].player, events[-1].value), (RESULT, 1, result.turns))
+
+    def test_records_any_accepted_shot(self):
+        """Test a shot at a column of 2^32 or more, which the input accepts, is journaled as it was fired."""
+        players = build_players(SAMPLE_INPUT.rsplit("\n", 2)[0] + f"\nA{2 ** 40} B2\nE5")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.journal')
+            with JournalWriter(path) as journal:
+                result = GameController.headless(journal).start_game(players)
+            with JournalReader(path) as reader:
+                shots = [event for event in reader.events() if event.kind in (HIT, MISS)]
+                last = list(reader.events())[-1]
+        self.assertEqual((shots[0].kind, shots[0].row, shots[0].col), (MISS, 1, 2 ** 40))
+        self.assertEqual((last.kind, last.value), (RESULT, result.turns))
+
+    def test_records_shots_beyond_64_bits_as_misses_off_the_board(self):
+        """Test a column or row too large for a record is journaled as row 0, column 0 without aborting."""
+        players = build_players(SAMPLE_INPUT.rsplit("\n", 2)[0] + "\nA9223372036854775808 ZZZZZZZZZZZZZZ1 B2\nE5")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.journal')
+            with JournalWriter(path) as journal:
+                result = GameController.headless(journal).start_game(players)
+            with JournalReader(path) as reader:
+                shots = [event for event in reader.events() if event.kind in (HIT, MISS)]
+        self.assertEqual([(event.kind, event.row, event.col) for event in shots if event.player == 0][:2],
+                         [(MISS, 0, 0), (MISS, 0, 0)])
+        self.assertEqual(len(shots), sum(result.shots.values()))
+
+
+class TestReplay(unittest.TestCase):
+
+    def replay_of(self, players, checkpoint_interval):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.journal')
+            with JournalWriter(path) as journal:
+                self.result = GameController.headless(journal).start_game(players)
+            return Replay.from_journal(path, checkpoint_interval=checkpoint_interval)
+
+    @staticmethod
+    def state(replay):
+        return ([bytes(player.battle_area.health) for player in replay.players],
+                [player.ship_count for player in replay.players], replay.turn, dict(replay.marks))
+
+    def test_seek_matches_sequential_replay(self):
+        """Test seeking to any position, in any order, gives the state reached by stepping."""
+        players = random_players(random.Random(3), player_count=3, shots=120)
+        replay = self.replay_of(players, checkpoint_interval=5)
+        states = [self.state(replay)]
+        while replay.step():
+            states.append(self.state(replay))
+        self.assertEqual(replay.winner, self.result.winner)
+        self.assertEqual(replay.turns, self.result.turns)
+        self.assertEqual([player.ship_count for player in replay.players],
+                         [player.ship_count for player in players])
+
+        for position in random.Random(4).sample(range(len(states)), len(states)):
+            replay.seek(position)
+            self.assertEqual(self.state(replay), states[position])
+
+    def test_checkpoints_grow_with_events_not_board_size(self):
+        """Test checkpoints of a big board are spaced so they hold no more entries than the game has events."""
+        players = random_players(random.Random(5), width=400, height='Z', shots=300)
+        replay = self.replay_of(players, checkpoint_interval=4)
+        stored = sum(len(health) + len(checkpoint.marks)
+                     for checkpoint in replay.checkpoints[1:] for health in checkpoint.health)
+        self.assertGreater(len(replay.events), 1000)
+        self.assertLessEqual(stored, len(replay.events))
+        replay.seek(len(replay.events) // 2)
+        replay.seek(3)
+        self.assertEqual(replay.position, 3)
+
+    def test_viewer_steps_backward(self):
+        """Test stepping back redraws the board from the restored state."""
+        viewer = ReplayViewer(self.replay_of(build_players(), checkpoint_interval=4), RecordingUI)
+        viewer.seek_turn(3)
+        viewer.forward()
+        viewer.backward()
+        self.assertEqual(viewer.replay.turn, 3)
+        events = viewer.ui.events
+        redraw = events[len(events) - 1 - events[::-1].index(('clear_marks',)):]
+        self.assertEqual(sum(event[0] in ('mark_hit', 'mark_miss') for event in redraw),
+                         len(viewer.replay.marks))
+        self.assertEqual(redraw[-1], ('announce_turn', 'Player-1'))
+
+
+class TestGameServer(unittest.TestCase):
+
+    def serve(self, client, **server_options):
+        """Runs `client(reader, writer)` against a fresh server on a Unix socket."""
+        async def run():
+            with tempfile.TemporaryDirectory() as directory:
+                server = GameServer(**server_options)
+                listener = await server.start_unix(os.path.join(directory, 'server.sock'))
+                reader, writer = await asyncio.open_unix_connection(os.path.join(directory, 'server.sock'))
+                try:
+                    return await client(reader, writer)
+                finally:
+                    writer.close()
+                    listener.close()
+                    await listener.wait_closed()
+        return asyncio.run(run())
+
+    def test_concurrent_games_follow_the_same_rules(self):
+        """Test games played through the server give the results of the local engine."""
+        async def client(reader, writer):
+            path = writer.get_extra_info('peername')
+            async def play(players):
+                game_reader, game_writer = await asyncio.open_unix_connection(path)
+                result = await play_remote_game(game_reader, game_writer, players)
+                game_writer.close()
+                return result
+            games = [random_players(random.Random(seed), player_count=2 + seed % 3) for seed in range(20)]
+            return await asyncio.gather(play(build_players()), *(play(players) for players in games))
+
+        results = self.serve(client, max_active_games=4)
+        expected = [simulate_game(build_players())]
+        expected += [simulate_game(random_players(random.Random(seed), player_count=2 + seed % 3))
+                     for seed in range(20)]
+        for result, local in zip(results, expected):
+            self.assertEqual((result['winner'], result['turns'], result['shots'], result['hits'],
+                              result['ships_sunk']),
+                             (local.winner, local.turns, local.shots, local.hits, local.ships_sunk))
+
+    def test_game_timeout_and_errors(self):
+        """Test a game that never fills up times out, and bad requests get an error event."""
+        async def client(reader, writer):
+            for message in ({'op': 'fly'}, {'op': 'join', 'game': 99},
+                            {'op': 'create', 'width': 5, 'height': 'E', 'timeout': 0.05}):
+                writer.write(json.dumps(message).encode() + b'\n')
+            return [json.loads(await reader.readline()) for _ in range(4)]
+
+        events = self.serve(client)
+        self.assertEqual([event['event'] for event in events], ['error', 'error', 'created', 'timeout'])
+        self.assertEqual(events[3]['game'], events[2]['game'])
+
+    def test_rejected_placement_leaves_no_ships(self):
+        """Test a placement that fails on a later cell or a later ship leaves the board as it was."""
+        async def client(reader, writer):
+            messages = ({'op': 'create', 'width': 5, 'height': 'E'}, {'op': 'join', 'game': 1},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['P', 3, 1, 'A4']]},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['P', 1, 1, 'C1'], ['P', 1, 1, 'C1']]},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['P', 2, 1, 'A4'], ['P', 1, 1, 'C1']]})
+            for message in messages:
+                writer.write(json.dumps(message).encode() + b'\n')
+            return [json.loads(await reader.readline()) for _ in messages]
+
+        events = self.serve(client)
+        self.assertEqual([event['event'] for event in events], ['created', 'joined', 'error', 'error', 'placed'])
+        self.assertEqual(events[4]['ships'], 2)
+
+    def test_shapeless_ships_and_huge_boards_are_rejected(self):
+        """Test ships without cells or with an unknown type, and boards over the size limits, get an error."""
+        async def client(reader, writer):
+            messages = ({'op': 'create', 'width': 5, 'height': 'E'}, {'op': 'join', 'game': 1},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['P', -1, -1, 'A1']]},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['P', 0, 3, 'A1']]},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['X', 1, 1, 'A1']]},
+                        {'op': 'place', 'game': 1, 'player': 0, 'ships': [['Q', 1, 1, 'A1']]},
+                        {'op': 'create', 'width': 10 ** 9, 'height': 'E'},
+                        {'op': 'create', 'width': 5, 'height': 'ZZZZZZ'},
+                        {'op': 'create', 'width': MAX_WIDTH, 'height': row_label(MAX_ROWS + 1)},
+                        {'op': 'create', 'width': MAX_WIDTH, 'height': row_label(MAX_ROWS)})
+            for message in messages:
+                writer.write(json.dumps(message).encode() + b'\n')
+            return [json.loads(await reader.readline()) for _ in messages]
+
+        events = self.serve(client)
+        self.assertEqual([event['event'] for event in events],
+                         ['created', 'joined', 'error', 'error', 'error', 'placed', 'error', 'error', 'error',
+                          'created'])
+        self.assertEqual(events[5]['ships'], 1)
+
+    def test_seats_are_played_only_by_their_connection(self):
+        """Test a client cannot place, fire, finish or get ready for another client's player."""
+        async def client(reader, writer):
+            for message in ({'op': 'create', 'width': 5, 'height': 'E'}, {'op': 'join', 'game': 1}):
+                writer.write(json.dumps(message).encode() + b'\n')
+            await reader.readline()
+            await reader.readline()
+            other_reader, other_writer = await asyncio.open_unix_connection(writer.get_extra_info('peername'))
+            messages = ({'op': 'place', 'game': 1, 'player': 0, 'ships': [['P', 1, 1, 'A1']]},
+                        {'op': 'fire', 'game': 1, 'player': 0, 'at': ['A1']},
+                        {'op': 'done', 'game': 1, 'player': 0}, {'op': 'ready', 'game': 1, 'player': 0})
+            for message in messages:
+                other_writer.write(json.dumps(message).encode() + b'\n')
+            events = [json.loads(await other_reader.readline()) for _ in messages]
+            other_writer.close()
+            return events
+
+        events = self.serve(client)
+        self.assertEqual([(event['event'], event['op']) for event in events],
+                         [('error', 'place'), ('error', 'fire'), ('error', 'done'), ('error', 'ready')])
+
+
+class TestProbabilityTargeting(unittest.TestCase):
+    def test_ai_sinks_fleet_without_wasted_shots(self):
+        """Test the AI sinks every ship and never fires at a cell known to be empty or dead."""
+        players = build_players()
+        players[0].set_targeting(ProbabilityTargeting.for_player(players[0]))
+        players[1].set_firing_sequence([])
+        fired = []
+        controller = GameController.headless()
+        fire_missile = controller.fire_missile
+        controller.fire_missile = lambda player, target, next_player: (
+            fired.append(str(target)) or fire_missile(player, target, next_player))
+
+        result = controller.start_game(players)
+        self.assertEqual(result.winner, 'Player-1')
+        # B2 is the only Q cell: it may be fired at twice, any other cell once
+        self.assertLessEqual(fired.count('B2'), 2)
+        self.assertEqual(len(fired) - fired.count('B2'), len(set(fired) - {'B2'}))
+        self.assertEqual(result.ships_sunk['Player-1'], 2)
+
+    def test_ai_player_numbers_are_checked(self):
+        """Test --ai rejects a player number the game does not have, before reading any input."""
+        self.assertEqual(main.parse_args(['--players', '3', '--ai', '1', '3']).ai, [1, 3])
+        with patch('sys.stderr', io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            main.parse_args(['--ai', '3'])
+        self.assertIn("--ai takes player numbers from 1 to 2, not 3", stderr.getvalue())
+
+    def test_ai_drops_target_eliminated_by_another_player(self):
+        """Test the AI stops aiming at an opponent that someone else eliminated."""
+        players = build_players()
+        targeting = ProbabilityTargeting.for_player(players[0], players=players)
+        targeting.observe('Player-2', Position('A', 1), True, False)
+        players[1].ship_count = 0
+        fresh = ProbabilityTargeting.for_player(players[0])
+        self.assertEqual(targeting.popleft(), fresh.popleft())
+        self.assertIsNone(targeting.current)
+
+
+class TestSearchState(unittest.TestCase):
+
+    def test_apply_follows_the_game_and_undo_restores_it(self):
+        """Test shots change boards like fire_missile does, and undoing them restores every byte."""
+        for seed in range(10):
+            rng = random.Random(seed)
+            players = random_players(rng, battle_area_class=PackedBattleArea)
+            state = SearchState.from_players(players)
+            before = (list(map(bytes, state.health)), [list(sizes) for sizes in state.ship_sizes],
+                      list(state.ship_counts), state.current)
+            clone = state.clone()
+            controller = GameController.headless()
+            for _ in range(40):
+                target = state.target()
+                if target is None:
+                    break
+                shooter = players[state.current]
+                position = Position(rng.choice('ABCDEFG'), rng.randint(0, 7))
+                self.assertEqual(state.apply(position), controller.fire_missile(shooter, position, players[target]))
+                self.assertEqual(state.ship_counts, [player.ship_count for player in players])
+            self.assertEqual(list(map(bytes, clone.health)), before[0])
+            state.undo_to(0)
+            self.assertEqual((list(map(bytes, state.health)), [list(sizes) for sizes in state.ship_sizes],
+                              list(state.ship_counts), state.current), before)
+
+    def test_positions_survive_copy_and_pickle(self):
+        position = Position('AA', 7)
+        self.assertEqual(copy.deepcopy(position), position)
+        self.assertEqual(pickle.loads(pickle.dumps(position)), position)
+
+
+class TestFleetGenerator(unittest.TestCase):
+    SHAPES = [('Q', 2, 2), ('P', 3, 1), ('P', 1, 3), ('Q', 1, 1), ('P', 2, 1)]
+
+    def test_fleets_are_valid_and_reproducible(self):
+        """Test every sampled fleet places without errors on any backend and a seed repeats the fleets."""
+        for uniform in (True, False):
+            generator = FleetGenerator(6, 'F', self.SHAPES, seed=3, uniform=uniform)
+            placements = [generator.sample() for _ in range(200)]
+            again = FleetGenerator(6, 'F', self.SHAPES, seed=3, uniform=uniform)
+            self.assertEqual(placements, [again.sample() for _ in range(200)])
+            for area_class in (BattleArea, PackedBattleArea):
+                for placement in placements[:50]:
+                    player = generator.place(Player('Player-1'), placement, area_class)
+                    self.assertEqual(player.ship_count, len(self.SHAPES))
+                    self.assertEqual(sum(1 for _ in player.battle_area.cells()), 13)
+
+    def test_uniform_over_whole_fleets(self):
+        """Test every fleet is equally likely, although placing ship by ship favours some."""
+        counts = {}
+        generator = FleetGenerator(5, 'A', [('P', 2, 1), ('P', 2, 1)], seed=1)
+        for _ in range(6000):
+            placement = tuple(generator.sample())
+            counts[placement] = counts.get(placement, 0) + 1
+        self.assertEqual(len(counts), 6)
+        for count in counts.values():
+            self.assertTrue(850 < count < 1150, counts)
+        sequential = FleetGenerator(5, 'A', [('P', 2, 1), ('P', 2, 1)], seed=1, uniform=False)
+        counts = {}
+        for _ in range(6000):
+            placement = tuple(sequential.sample())
+            counts[placement] = counts.get(placement, 0) + 1
+        self.assertGreater(max(counts.values()), 1300)
+
+    def test_arrays_and_invalid_fleets(self):
+        """Test the flat anchor array and the errors for fleets that cannot fit."""
+        generator = FleetGenerator(6, 'F', self.SHAPES, seed=5)
+        anchors = generator.sample_array(10)
+        self.assertEqual(len(anchors), 10 * len(self.SHAPES) * 2)
+        self.assertTrue(all(1 <= value <= 6 for value in anchors))
+        with self.assertRaises(InputValidationError):
+            FleetGenerator(3, 'C', [('Q', 4, 1)])
+        with self.assertRaises(InputValidationError):
+            FleetGenerator(3, 'C', [('X', 1, 1)])
+        with self.assertRaises(InputValidationError):
+            FleetGenerator(3, 'C', [('P', 2, 2)] * 3)
+
+
+def transformed(players, transform, names=None):
+    """Copies of `players` with every ship cell and on-board shot moved by transform(row, col) -> (row, col)."""
+    copies = []
+    for index, player in enumerate(players):
+        battle_area = player.battle_area
+        copy_player = Player(names[index] if names else player.name)
+        copy_player.set_battle_area(battle_area.width, battle_area.height)
+        for ship in battle_area.ships:
+            cells = [transform(row_number(ship.position.x) + i, ship.position.y + j)
+                     for i in range(ship.height) for j in range(ship.width)]
+            rows, cols = [row for row, _ in cells], [col for _, col in cells]
+            copy_player.place_ships(max(cols) - min(cols) + 1, max(rows) - min(rows) + 1,
+                                    Position(row_label(min(rows)), min(cols)), ship.ship_type)
+        copy_player.set_ship_count(player.ship_count)
+        shots = []
+        for target in player.firing_sequence:
+            row = row_number(target.x)
+            if 1 <= row <= battle_area.rows and 1 <= target.y <= battle_area.width:
+                row, col = transform(row, target.y)
+                target = Position(row_label(row), col)
+            shots.append(target)
+        copy_player.set_firing_sequence(shots)
+        copies.append(copy_player)
+    return copies
+
+
+class TestGameCache(unittest.TestCase):
+    SIZE = 6
+
+    def random_game(self, seed):
+        rng = random.Random(seed)
+        generator = FleetGenerator(self.SIZE, 'F', [('Q', 2, 1), ('P', 1, 3), ('P', 2, 2)], seed=seed)
+        players = generator.players(['Player-1', 'Player-2'])
+        for player in players:
+            player.set_firing_sequence([Position(row_label(rng.randint(1, 7)), rng.randint(0, 7))
+                                        for _ in range(rng.randint(0, 40))])
+        return players
+
+    def test_symmetric_games_share_a_key(self):
+        """Test mirrored, rotated and renamed games get the key of the original and other games do not."""
+        size = self.SIZE
+        symmetries = [lambda r, c: (r, size + 1 - c), lambda r, c: (size + 1 - r, c),
+                      lambda r, c: (c, r), lambda r, c: (c, size + 1 - r)]
+        keys = set()
+        for seed in range(20):
+            key = game_key(self.random_game(seed))
+            keys.add(key)
+            for symmetry in symmetries:
+                self.assertEqual(game_key(transformed(self.random_game(seed), symmetry, ['A', 'B'])), key)
+        self.assertEqual(len(keys), 20)
+        players = self.random_game(0)
+        players[0].set_targeting(ProbabilityTargeting.for_player(players[0]))
+        self.assertIsNone(game_key(players))
+
+    def test_symmetric_boards_compare_firing_sequences(self):
+        """Test a board that every symmetry maps to itself still gives all transformed games one key."""
+        size = self.SIZE
+        symmetries = [lambda r, c: (r, size + 1 - c), lambda r, c: (size + 1 - r, c),
+                      lambda r, c: (c, r), lambda r, c: (c, size + 1 - r)]
+
+        def centred_game(seed):
+            rng = random.Random(seed)
+            players = [Player('Player-1'), Player('Player-2')]
+            for player in players:
+                player.set_battle_area(size, 'F')
+                player.place_ships(2, 2, Position('C', 3), 'Q')
+                player.set_ship_count(1)
+                player.set_firing_sequence([Position(row_label(rng.randint(2, 5)), rng.randint(2, 5))
+                                            for _ in range(12)])
+            return players
+
+        for seed in range(20):
+            key = game_key(centred_game(seed))
+            for symmetry in symmetries:
+                self.assertEqual(game_key(transformed(centred_game(seed), symmetry)), key)
+
+    def test_cached_results_match_simulation(self):
+        """Test results served for equivalent games are those simulate_game gives, under the asking names."""
+        cache = GameCache()
+        for seed in range(30):
+            result = cache.play(self.random_game(seed))
+            self.assertEqual(result, simulate_game(self.random_game(seed)))
+            mirror = lambda r, c: (c, self.SIZE + 1 - r)
+            result = cache.play(transformed(self.random_game(seed), mirror, ['Alice', 'Bob']))
+            self.assertEqual(result, simulate_game(transformed(self.random_game(seed), mirror, ['Alice', 'Bob'])))
+        self.assertEqual((cache.hits, cache.misses), (30, 30))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_lru_eviction_and_disk_entries(self):
+        """Test the memory LRU drops the oldest entry and a reopened directory still serves it."""
+        with tempfile.TemporaryDirectory() as directory:
+            cache = GameCache(directory, capacity=1)
+            cache.play(build_players())
+            cache.play(self.random_game(1))
+            self.assertEqual((len(cache), cache.evictions), (1, 1))
+            self.assertEqual(cache.play(build_players()).winner, 'Player-2')
+            self.assertEqual(cache.hits, 1)
+            reopened = GameCache(directory)
+            self.assertEqual(reopened.play(build_players(player_names=('X', 'Y'))).winner, 'Y')
+            self.assertEqual(reopened.hits, 1)
+
+
+class TestOutcomeResolver(unittest.TestCase):
+    def test_matches_simulation(self):
+        """Test resolved results equal simulate_game for random games, players, backends and first turns."""
+        for seed in range(300):
+            rng = random.Random(seed)
+            player_count, shots = rng.choice((2, 3, 4)), rng.choice((5, 30, 300))
+            battle_area_class = rng.choice((BattleArea, PackedBattleArea, SparseBattleArea))
+            first_turn = rng.randrange(player_count)
+            players = random_players(random.Random(seed), player_count, shots=shots,
+                                     battle_area_class=battle_area_class)
+            if seed % 2:
+                for player in players:
+                    player.set_firing_sequence(parse_firing_sequence(' '.join(map(str, player.firing_sequence))))
+            result = resolve_game(players, first_turn)
+            expected = simulate_game(random_players(random.Random(seed), player_count, shots=shots,
+                                                    battle_area_class=battle_area_class), first_turn)
+            self.assertEqual(result, expected, seed)
+
+    def test_eliminated_player_finishes_the_round(self):
+        """Test a player sunk mid-round still fires its turn, here sinking the winner for a draw."""
+        game = "3 B\n2\nP 1 1 A1 A2\nP 1 1 B1 B2\nA2 B2\nA1 B1"
+        result = resolve_game(build_players(game))
+        self.assertEqual(result, simulate_game(build_players(game)))
+        self.assertTrue(result.is_draw)
+        players = build_players()
+        self.assertEqual(resolve_game(players), simulate_game(build_players()))
+        self.assertEqual(len(players[0].firing_sequence), 4)  # The players are left untouched
+
+    def test_rejects_players_choosing_shots(self):
+        """Test players with targeting are refused, as their shots are not known before the game."""
+        players = build_players()
+        players[0].set_targeting(ProbabilityTargeting.for_player(players[0]))
+        with self.assertRaises(ValueError):
+            resolve_game(players)
+
+
+class TestWinProbability(unittest.TestCase):
+    def test_known_shots_give_the_exact_outcome(self):
+        """Test a game without random shots is decided by one completion that matches simulate_game."""
+        for seed in range(20):
+            estimate = estimate_win_probability(random_players(random.Random(seed)), random_shots=False)
+            result = simulate_game(random_players(random.Random(seed)))
+            self.assertTrue(estimate.exact)
+            self.assertEqual(estimate.samples, 1)
+            if result.winner is None:
+                self.assertEqual(estimate.draw_probability, 1.0)
+            else:
+                self.assertEqual(estimate.probability(result.winner), 1.0)
+
+    def test_estimate_is_reproducible_and_tight(self):
+        """Test the estimate of a game in progress depends only on the seed and meets the tolerance."""
+        players = build_players()
+        controller = GameController.headless()
+        controller.fire_missile(players[0], Position('B', 2), players[1])
+        estimates = [estimate_win_probability(players, next_player=None, tolerance=0.05, workers=1, seed=7)
+                     for _ in range(2)]
+        self.assertEqual(estimates[0].wins, estimates[1].wins)
+        estimate = estimates[0]
+        self.assertLessEqual(estimate.half_width, 0.05)
+        total = sum(estimate.probability(player.name) for player in players) + estimate.draw_probability
+        self.assertAlmostEqual(total, 1.0)
+        # The original players are left untouched
+        self.assertEqual(len(players[0].firing_sequence), 4)
+
+    def test_pool_matches_one_worker_under_spawn(self):
+        """Test workers started with spawn, the default on macOS and Windows, give the single-worker estimate."""
+        players = build_players()
+        options = dict(next_player=None, tolerance=0.05, max_samples=2000, batch_size=200, seed=3)
+        serial = estimate_win_probability(players, workers=1, **options)
+        with patch('win_probability.Pool', multiprocessing.get_context('spawn').Pool):
+            pooled = estimate_win_probability(players, workers=2, **options)
+        self.assertEqual((pooled.samples, pooled.wins, pooled.draws), (serial.samples, serial.wins, serial.draws))
+
+    def test_wilson_interval(self):
+        low, high = wilson_interval(50, 100, 1.96)
+        self.assertAlmostEqual(low, 0.4038, places=3)
+        self.assertAlmostEqual(high, 0.5962, places=3)
+        self.assertEqual(wilson_interval(0, 0, 1.96), (0.0, 1.0))
+
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = (root.handlers[:], root.level)
+
+    def tearDown(self):
+        # Put back the handlers the tests started with, without opening game.log or a console
+        stop_writer()
+        root = logging.getLogger()
+        for handler in root.handlers:
+            if handler not in self.saved[0]:
+                handler.close()
+        root.handlers[:], level = self.saved
+        root.setLevel(level)
+
+    def test_queue_mode_writes_structured_events(self):
+        """Test queued events reach the file as JSON lines once the writer is stopped."""
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'events.log')
+            configure_logging(mode='queue', structured=True, filename=log_file, console=False)
+            controller = GameController(ui_class=RecordingUI, sleep_time=0, wait_for_close=False)
+            controller.fire_missile(Player('Player-1'), Position('Z', 9), build_players()[1])
+            stop_writer()
+            with open(log_file) as events:
+                entry = json.loads(events.readline())
+        self.assertEqual(entry['event'], 'shot')
+        self.assertEqual(entry['message'], "Player-1 fires a missile at Z9 which missed.")
+        self.assertEqual((entry['player'], entry['target'], entry['hit']), ('Player-1', 'Z9', False))
+
+    def test_disabled_level_skips_formatting(self):
+        """Test arguments are never formatted when the level is disabled."""
+        formatted = []
+
+        class Target:
+            def __str__(self):
+                formatted.append(True)
+                return 'A1'
+
+        configure_logging(filename=None, console=False, level=logging.WARNING)
+        log_event('shot', "%s", Target())
+        self.assertEqual(formatted, [])
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_results_and_regressions(self):
+        """Test a case is timed and only slowdowns beyond the threshold are flagged."""
+        report = run_suite([Case('noop', lambda: ((lambda: None), 10))], repeat=1, verbose=False)
+        self.assertEqual(report['results']['noop']['operations'], 10)
+
+        current = {'results': {'a': {'ops_per_second': 80.0}, 'b': {'ops_per_second': 95.0},
+                               'new': {'ops_per_second': 1.0}}}
+        baseline = {'results': {'a': {'ops_per_second': 100.0}, 'b': {'ops_per_second': 100.0}}}
+        regressions = compare(current, baseline, threshold=0.1)
+        self.assertEqual([name for name, _ in regressions], ['a'])
+        self.assertAlmostEqual(regressions[0][1], -0.2)
+
+    def test_comparison_with_a_zero_baseline(self):
+        """Test a case that ran at 0 ops/s in the baseline is reported as n/a, not a crash."""
+        current = {'results': {'a': {'ops_per_second': 80.0}, 'b': {'ops_per_second': 50.0}}}
+        baseline = {'results': {'a': {'ops_per_second': 100.0}, 'b': {'ops_per_second': 0.0}}}
+        lines = format_comparison(current, baseline).splitlines()
+        self.assertTrue(lines[1].endswith('-20.0%'))
+        self.assertTrue(lines[2].endswith('n/a'))
+        self.assertEqual([name for name, _ in compare(current, baseline, threshold=0.1)], ['a'])
+
+
+class TestBattleshipUI(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('battleship_ui.turtle')
+        mock_turtle = patcher.start()
+        mock_turtle.Turtle.side_effect = lambda: MagicMock()
+        self.addCleanup(patcher.stop)
+
+    def make_ui(self, **kwargs):
+        ui = BattleshipUI(['Player-1', 'Player-2'], (5, 5), **kwargs)
+        ui.screen.update.reset_mock()
+        return ui
+
+    def test_draw_calls_wait_for_flush(self):
+        """Test queued operations are drawn with a single screen update."""
+        ui = self.make_ui()
+        ui.draw_ship(0, Ship('P', 2, 1, Position('A', 1)))
+        ui.mark_hit(1, Position('A', 1))
+        ui.mark_miss(1, Position('B', 2))
+        ui.screen.update.assert_not_called()
+        ui.flush(force=True)
+        ui.screen.update.assert_called_once()
+        ui.pen.dot.assert_called_once()
+
+    def test_only_latest_message_is_drawn(self):
+        """Test messages queued within a frame replace each other."""
+        ui = self.make_ui()
+        ui.announce_turn('Player-1')
+        ui.announce_turn('Player-2')
+        ui.flush()
+        ui.message_pen.write.assert_called_once()
+        self.assertEqual(ui.message_pen.write.call_args[0][0], 'Player-2 Turn')
+
+    def test_frame_rate_cap(self):
+        """Test unforced flushes within one frame interval share one screen update."""
+        ui = self.make_ui(max_fps=1)
+        ui.mark_miss(0, Position('A', 1))
+        ui.flush()
+        ui.mark_miss(0, Position('A', 2))
+        ui.flush()
+        ui.screen.update.assert_called_once()
+        ui.flush(force=True)
+        self.assertEqual(ui.screen.update.call_count, 2)
@@ -0,0 +1,229 @@
+"""
+Plays many games headlessly across a process pool and prints an aggregated report.
+
+    python tournament.py games/ --workers 8 --chunk-size 256 --cache cache/
+
+Each PATH is a game file or a directory of game files. A file may hold several
+games separated by blank lines (see game_reader). Each game uses the same input
+format as main.py.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from game_cache import DEFAULT_CAPACITY, GameCache
+from game_reader import PLAYER_NAMES, iter_records, parse_record
+from logger import configure_logging, logging
+from outcome_resolver import resolve_game
+from results_store import GameOutcome, ResultsStore, play_and_describe
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+@dataclass
+class GameSummary:
+    """Outcome of one tournament game; `error` is set when the input was invalid."""
+    index: int
+    source: str
+    winner: Optional[str] = None
+    shots: int = 0
+    turns: int = 0
+    error: Optional[str] = None
+    outcome: Optional[GameOutcome] = None  # Full outcome, when results are stored
+    cached: bool = False  # Result taken from the game cache
+
+
+@dataclass
+class TournamentReport:
+    games: int = 0
+    draws: int = 0
+    errors: int = 0
+    wins: Dict[str, int] = field(default_factory=dict)
+    total_shots: int = 0
+    total_turns: int = 0
+    cache_lookups: int = 0
+    cache_hits: int = 0
+    elapsed: float = 0.0
+
+    def add(self, summary: GameSummary):
+        if summary.error is not None:
+            self.errors += 1
+            return
+        self.games += 1
+        self.total_shots += summary.shots
+        self.total_turns += summary.turns
+        self.cache_hits += summary.cached
+        if summary.winner is None:
+            self.draws += 1
+        else:
+            self.wins[summary.winner] = self.wins.get(summary.winner, 0) + 1
+
+    @property
+    def mean_shots(self) -> float:
+        return self.total_shots / self.games if self.games else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        return (self.games + self.errors) / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        lines = [f"games: {self.games}", f"errors: {self.errors}", f"draws: {self.draws}"]
+        lines += [f"wins {name}: {count}" for name, count in sorted(self.wins.items())]
+        lines += [f"mean shots: {self.mean_shots:.2f}",
+                  f"games/s: {self.games_per_second:.1f}"]
+        if self.cache_lookups:
+            lines.append(f"cache hit rate: {self.cache_hit_rate:.1%} ({self.cache_hits}/{self.cache_lookups})")
+        return "\n".join(lines)
+
+
+def iter_games(path: str) -> Iterator[Tuple[str, int, List[str]]]:
+    """Yields (file, first line, lines) for every game under `path`, streaming each file."""
+    if os.path.isdir(path):
+        file_paths = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        file_paths = [file_path for file_path in file_paths if os.path.isfile(file_path)]
+    else:
+        file_paths = [path]
+
+    for file_path in file_paths:
+        with open(file_path) as game_file:
+            for first_line, lines in iter_records(game_file):
+                yield file_path, first_line, lines
+
+
+def play_game(index: int, file_path: str, first_line: int, lines: List[str],
+              describe: bool = False, cache: Optional[GameCache] = None) -> GameSummary:
+    """
+    Parses and resolves a single game without a display (see outcome_resolver); `describe` plays it
+    through the controller and also returns its full outcome. With a `cache`, equivalent games already
+    played are not resolved again, unless described: the outcome's hit cells are not cached.
+    """
+    source = f"{file_path}:{first_line}"
+    try:
+        players = parse_record(lines, first_line, PLAYER_NAMES)
+        if describe:
+            outcome = play_and_describe(players)
+            winner = None if outcome.winner < 0 else players[outcome.winner].name
+            return GameSummary(index, source, winner, outcome.shots, outcome.turns, outcome=outcome)
+        if cache is not None:
+            hits = cache.hits
+            result = cache.play(players)
+            cached = cache.hits > hits
+        else:
+            result, cached = resolve_game(players), False
+    except Exception as e:
+        return GameSummary(index, source, error=str(e))
+    return GameSummary(index, source, result.winner, sum(result.shots.values()), result.turns, cached=cached)
+
+
+_worker_cache: Optional[GameCache] = None  # Each pool worker's cache, opened by _init_worker
+
+
+def _init_worker(cache_config: Optional[Tuple[Optional[str], int, int]]):
+    global _worker_cache
+    _worker_cache = GameCache(*cache_config) if cache_config is not None else None
+
+
+def play_chunk(chunk: List[Tuple[int, str, int, List[str]]], describe: bool = False,
+               cache: Optional[GameCache] = None) -> List[GameSummary]:
+    cache = cache if cache is not None else _worker_cache
+    return [play_game(*game, describe=describe, cache=cache) for game in chunk]
+
+
+def chunked(games: Iterable[Tuple[str, int, List[str]]],
+            chunk_size: int) -> Iterator[List[Tuple[int, str, int, List[str]]]]:
+    """Groups games into work units, numbering them in input order."""
+    numbered = ((index,) + game for index, game in enumerate(games))
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_tournament(paths: List[str], workers: Optional[int] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, store: Optional[ResultsStore] = None,
+                   cache: Optional[GameCache] = None) -> TournamentReport:
+    """
+    Plays every game found in `paths` and aggregates the results, adding each
+    outcome to `store` when given. Summaries are consumed in input order,
+    whatever the number of workers. With a `cache`, pool workers each open one
+    with the same settings, sharing its directory if it has one.
+    """
+    report = TournamentReport()
+    describe = store is not None
+    cache_config = None if cache is None else (cache.directory, cache.capacity, cache.disk_capacity)
+
+    def add(summary: GameSummary):
+        report.add(summary)
+        if cache is not None and not describe and summary.error is None:
+            report.cache_lookups += 1
+        if summary.outcome is not None:
+            store.add(summary.outcome)
+    games = (game for path in paths for game in iter_games(path))
+    chunks = chunked(games, chunk_size)
+    start = time.perf_counter()
+
+    if workers == 1:
+        for chunk in chunks:
+            for summary in play_chunk(chunk, describe, cache):
+                add(summary)
+    else:
+        with Pool(processes=workers, initializer=_init_worker, initargs=(cache_config,)) as pool:
+            # Keep a bounded number of chunks in flight so large inputs are never read ahead
+            max_pending = 2 * (workers or os.cpu_count() or 1)
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(play_chunk, (chunk, describe)))
+                if len(pending) >= max_pending:
+                    for summary in pending.popleft().get():
+                        add(summary)
+            while pending:
+                for summary in pending.popleft().get():
+                    add(summary)
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play many battleship games headlessly")
+    parser.add_argument('paths', nargs='+', help="Game files or directories of game files")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU; 1 runs in-process)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Games per work unit sent to a worker")
+    parser.add_argument('--results', metavar='DIR',
+                        help="Append every game's outcome to a columnar results store (see results_store.py)")
+    parser.add_argument('--cache', metavar='DIR',
+                        help="Reuse the results of games equivalent up to board symmetry, kept in DIR "
+                             "(see game_cache.py); not used with --results")
+    parser.add_argument('--cache-size', type=int, default=None, metavar='N',
+                        help="Results kept in memory by each worker; with this option alone nothing is written to disk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+    store = ResultsStore(args.results) if args.results else None
+    cache = None
+    if args.cache or args.cache_size:
+        cache = GameCache(args.cache, args.cache_size or DEFAULT_CAPACITY)
+    report = run_tournament(args.paths, workers=args.workers, chunk_size=args.chunk_size, store=store, cache=cache)
+    if store is not None:
+        store.close()
+    logging.info("Tournament finished")
+    print(report.format())
+
+
+if __name__ == '__main__':
+    main()
@@ -8,16 +8,47 @@ class ShipType(Enum):
     P = 1
 
 class InputValidationError(Exception):
-    pass
+    def __init__(self, message: str = '', line: int = None):
+        super().__init__(message)
+        self.line = line  # Input line the error refers to, when known
 
-def throw_error(msg:str) -> None:
+def throw_error(msg:str, line:int = None) -> None:
+    if line is not None:
+        msg = f"Line {line}: {msg}"
     logging.error(msg)  # Log the error
-    raise InputValidationError(msg)
+    raise InputValidationError(msg, line)
 
-@dataclass
+@dataclass(frozen=True)
 class Position:
+    """Immutable, hashable board coordinate; slotted so each instance has no __dict__."""
+    __slots__ = ('x', 'y')
     x:str
     y:int
 
     def __str__(self):
-        return f'{self.x}{self.y}'
\ No newline at end of file
+        return f'{self.x}{self.y}'
+
+    def __reduce__(self):
+        # Frozen slots cannot be restored by setattr, so pickle and deepcopy go through __init__
+        return Position, (self.x, self.y)
+
+def row_number(label: str) -> int:
+    """
+    Converts a row label to its 1-based row number: A=1, ..., Z=26, AA=27, AB=28, ...
+    Returns 0 for anything that is not an upper-case row label.
+    """
+    number = 0
+    for char in label:
+        if not 'A' <= char <= 'Z':
+            return 0
+        number = number * 26 + ord(char) - ord('A') + 1
+    return number
+
+
+def row_label(number: int) -> str:
+    """Converts a 1-based row number back to its label (the inverse of row_number)."""
+    label = ''
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
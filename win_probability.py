@@ -0,0 +1,268 @@
+"""
+Monte Carlo estimate of each player's chance to win a game in progress.
+
+    estimate = estimate_win_probability(players)
+    print(estimate.summary())
+
+The game is completed many times from the current state of the players
+(damaged ships, ship counts and remaining firing sequences) with the same turn
+rules as GameController, which plays every completion. Shots nobody knows yet
+are random: a player that runs out of known shots, or that chooses its shots
+as it goes (e.g. an AI), fires at every cell of the board in a random order,
+twice, so Q cells can be sunk too.
+
+Completions run in batches over a process pool and stop early once the Wilson
+confidence interval of every player's win probability, and of a draw, is
+narrower than `tolerance` on each side. When the next player is not known,
+every batch starts an equal share of its completions from each live player,
+so no player's turn order is over- or under-sampled.
+"""
+import os
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from math import sqrt
+from multiprocessing import Pool
+from statistics import NormalDist
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from game_controller import simulate_game
+from packed_battle_area import PackedBattleArea
+from player import Player
+from ship import Ship
+from utils import Position, row_label, row_number
+
+DEFAULT_BATCH_SIZE = 200
+
+
+class PlayerState(NamedTuple):
+    """Picklable state of one player: live cells as (row, col, health, ship id) and ship shapes."""
+    name: str
+    cells: List[Tuple[int, int, int, int]]
+    ships: List[Tuple[str, int, int, Optional[Position], int]]  # type, width, height, position, live cells
+    ship_count: int
+    shots: Optional[List[Position]]  # Remaining known shots; None when they are unknown
+
+
+class GameState(NamedTuple):
+    width: int
+    rows: int
+    players: List[PlayerState]
+    random_shots: bool  # Whether known shots are followed by random ones
+
+
+def snapshot(players: Sequence[Player], random_shots: bool = True) -> GameState:
+    """Captures the current state of `players` in a form that can be sent to worker processes."""
+    states = []
+    for player in players:
+        ship_ids: Dict[int, int] = {}
+        ships = []
+        cells = []
+        for x, y, health, ship in player.battle_area.cells():
+            ship_id = ship_ids.get(id(ship))
+            if ship_id is None:
+                ship_id = ship_ids[id(ship)] = len(ships)
+                ships.append([ship.ship_type, ship.width, ship.height, ship.position, 0])
+            ships[ship_id][4] += 1
+            cells.append((row_number(x) - 1, y, health, ship_id))
+        shots = None if player.targeting is not None else list(player.firing_sequence)
+        states.append(PlayerState(player.name, cells, [tuple(ship) for ship in ships], player.ship_count, shots))
+    battle_area = players[0].battle_area
+    return GameState(battle_area.width, battle_area.rows, states, random_shots)
+
+
+class _Completion:
+    """Rebuilds the players of a GameState once and resets them before every completion."""
+
+    def __init__(self, state: GameState):
+        self.state = state
+        self.players = []
+        self.health = []
+        for player_state in state.players:
+            player = Player(player_state.name)
+            player.set_battle_area(state.width, row_label(state.rows), PackedBattleArea)
+            battle_area = player.battle_area
+            battle_area.ships = [Ship(ship_type, width, height, position)
+                                 for ship_type, width, height, position, _ in player_state.ships]
+            for row, col, health, ship_id in player_state.cells:
+                index = row * battle_area.stride + col
+                battle_area.health[index] = health
+                battle_area.ship_ids[index] = ship_id
+            self.players.append(player)
+            self.health.append(bytes(battle_area.health))
+        self.board = [Position(row_label(row + 1), col + 1) for row in range(state.rows) for col in range(state.width)]
+
+    def _random_shots(self, rng: random.Random) -> List[Position]:
+        first = rng.sample(self.board, len(self.board))
+        return first + rng.sample(self.board, len(self.board))
+
+    def play(self, first_turn: int, rng: random.Random) -> Optional[int]:
+        """Plays one completion and returns the index of the winner, or None for a draw."""
+        for player, player_state, health in zip(self.players, self.state.players, self.health):
+            player.battle_area.health[:] = health
+            for ship, (_, _, _, _, size) in zip(player.battle_area.ships, player_state.ships):
+                ship.size = size
+            player.ship_count = player_state.ship_count
+            shots = player_state.shots or []
+            if player_state.shots is None or self.state.random_shots:
+                shots = shots + self._random_shots(rng)
+            player.firing_sequence = deque(shots)
+        winner = simulate_game(self.players, first_turn).winner
+        if winner is None:
+            return None
+        return next(index for index, player in enumerate(self.players) if player.name == winner)
+
+
+_completion: Optional[_Completion] = None  # Per worker process
+
+
+def _init_worker(state: GameState):
+    global _completion
+    _completion = _Completion(state)
+
+
+def _play_batch(first_turns: Sequence[int], seed: str) -> List[int]:
+    """Plays one completion per entry of `first_turns`; returns win counts per player, then draws."""
+    rng = random.Random(seed)
+    counts = [0] * (len(_completion.players) + 1)
+    for first_turn in first_turns:
+        winner = _completion.play(first_turn, rng)
+        counts[-1 if winner is None else winner] += 1
+    return counts
+
+
+def wilson_interval(successes: int, samples: int, z: float) -> Tuple[float, float]:
+    """Wilson score interval of a binomial proportion."""
+    if not samples:
+        return 0.0, 1.0
+    p = successes / samples
+    denominator = 1 + z * z / samples
+    centre = (p + z * z / (2 * samples)) / denominator
+    half_width = z * sqrt(p * (1 - p) / samples + z * z / (4 * samples * samples)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+@dataclass
+class WinProbability:
+    """Outcome counts of the completions played so far and their confidence intervals."""
+    players: List[str]
+    confidence: float = 0.95
+    wins: Dict[str, int] = field(default_factory=dict)
+    draws: int = 0
+    samples: int = 0
+    exact: bool = False  # No randomness was involved, so one completion decided the outcome
+
+    @property
+    def z(self) -> float:
+        return NormalDist().inv_cdf((1 + self.confidence) / 2)
+
+    def add(self, counts: Sequence[int]):
+        for name, count in zip(self.players, counts):
+            self.wins[name] = self.wins.get(name, 0) + count
+        self.draws += counts[-1]
+        self.samples += sum(counts)
+
+    def _interval(self, count: int) -> Tuple[float, float]:
+        if self.exact:
+            p = count / self.samples
+            return p, p
+        return wilson_interval(count, self.samples, self.z)
+
+    def probability(self, name: str) -> float:
+        return self.wins.get(name, 0) / self.samples if self.samples else 0.0
+
+    def interval(self, name: str) -> Tuple[float, float]:
+        return self._interval(self.wins.get(name, 0))
+
+    @property
+    def draw_probability(self) -> float:
+        return self.draws / self.samples if self.samples else 0.0
+
+    @property
+    def draw_interval(self) -> Tuple[float, float]:
+        return self._interval(self.draws)
+
+    @property
+    def half_width(self) -> float:
+        """Widest half-width over all outcomes."""
+        intervals = [self.interval(name) for name in self.players] + [self.draw_interval]
+        return max((high - low) / 2 for low, high in intervals)
+
+    def summary(self) -> str:
+        parts = []
+        for name, p, (low, high) in [(name, self.probability(name), self.interval(name)) for name in self.players] + \
+                [('draw', self.draw_probability, self.draw_interval)]:
+            parts.append(f"{name} {p:.1%} ({low:.1%}-{high:.1%})")
+        return ", ".join(parts) + f" after {self.samples} games"
+
+
+def _first_turns(state: GameState, next_player: Optional[int]) -> List[int]:
+    if next_player is not None:
+        return [next_player]
+    live = [index for index, player in enumerate(state.players) if player.ship_count > 0]
+    return live or [0]
+
+
+def estimate_win_probability(players: Sequence[Player], next_player: Optional[int] = 0,
+                             random_shots: bool = True, confidence: float = 0.95, tolerance: float = 0.01,
+                             min_samples: int = 400, max_samples: int = 100_000,
+                             batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = None,
+                             seed: int = 0,
+                             on_update: Optional[Callable[[WinProbability], None]] = None) -> WinProbability:
+    """
+    Estimates each player's chance to win the game from the current state of `players`.
+
+    `next_player` is the index of the player whose turn is next in the current round
+    (None when unknown, to average over every live player). With `random_shots`
+    False, players whose shots are known fire only those. `on_update` is called with
+    the estimate after every batch, e.g. to show the live odds on a UI. Results
+    depend only on `seed`, not on the number of workers.
+    """
+    state = snapshot(players, random_shots)
+    estimate = WinProbability([player.name for player in state.players], confidence)
+    first_turns = _first_turns(state, next_player)
+
+    if len(first_turns) == 1 and not random_shots and all(player.shots is not None for player in state.players):
+        # Nothing is random: the one possible completion is the answer
+        _init_worker(state)
+        estimate.add(_play_batch(first_turns, str(seed)))
+        estimate.exact = True
+        if on_update is not None:
+            on_update(estimate)
+        return estimate
+
+    batch_size = max(batch_size, len(first_turns))
+    batch_turns = [first_turns[i % len(first_turns)] for i in range(batch_size)]
+    seeds = (f"{seed}:{batch}" for batch in range(-(-max_samples // batch_size)))
+
+    def done() -> bool:
+        return estimate.samples >= max_samples or \
+            (estimate.samples >= min_samples and estimate.half_width <= tolerance)
+
+    def add(counts):
+        estimate.add(counts)
+        if on_update is not None:
+            on_update(estimate)
+
+    if workers == 1:
+        _init_worker(state)
+        for batch_seed in seeds:
+            add(_play_batch(batch_turns, batch_seed))
+            if done():
+                break
+        return estimate
+
+    with Pool(processes=workers, initializer=_init_worker, initargs=(state,)) as pool:
+        # Batches are consumed in order, so the result does not depend on scheduling
+        max_pending = 2 * (workers or os.cpu_count() or 1)
+        pending = deque()
+        for batch_seed in seeds:
+            pending.append(pool.apply_async(_play_batch, (batch_turns, batch_seed)))
+            if len(pending) >= max_pending:
+                add(pending.popleft().get())
+                if done():
+                    break
+        else:
+            while pending and not done():
+                add(pending.popleft().get())
+    return estimate